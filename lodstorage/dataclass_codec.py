@@ -0,0 +1,448 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+import dataclasses
+import datetime
+import decimal
+import enum
+import logging
+import types
+import typing
+import uuid
+from collections.abc import Collection, Iterable, Mapping
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# the origins of Union[X, Y] and of the PEP 604 form X | Y (python >= 3.10)
+unionOrigins = (typing.Union, getattr(types, "UnionType", typing.Union))
+
+
+class DataclassCodec:
+    """
+    a compiled codec for a dataclass
+
+    the fields and their type hints are analyzed once per class and turned into
+    a converter function per field so that converting dicts to instances and back
+    does not need to introspect the types on every call. Nested dataclasses,
+    lists, sets, tuples, dicts and Optional values are supported.
+
+    The codec is the shared per-class introspection cache: YamlAble, LinkMLGen
+    and RDFDumper use its fields, resolved type hints, parsed docstring and
+    named plans instead of introspecting the class per object.
+
+    :ivar clazz(type): the dataclass
+    :ivar fields(tuple): the dataclasses.Field of all fields
+    :ivar hints(dict): the resolved type hints by field name
+    :ivar fieldNames(tuple): the names of all fields
+    :ivar initFields(tuple): (name,converter) tuples for the fields of the constructor
+    :ivar plans(dict): the plans derived from the dataclass by name - see getPlan
+    """
+
+    codecs = {}
+    scalarTypes = (str, int, float, bool, bytes)
+    # the shared DocstringParser - created on first use
+    docstringParser = None
+
+    def __init__(self, clazz: type):
+        """
+        construct the codec for the given dataclass
+
+        Args:
+            clazz(type): the dataclass to create the codec for
+        """
+        self.clazz = clazz
+        fields = dataclasses.fields(clazz)
+        try:
+            hints = typing.get_type_hints(clazz)
+        except Exception as ex:
+            # e.g. unresolvable forward references of local classes
+            hints = {
+                field.name: field.type
+                for field in fields
+                if not isinstance(field.type, str)
+            }
+            unresolved = [field.name for field in fields if field.name not in hints]
+            logging.warning(
+                f"type hints of {clazz.__name__} could not be resolved ({ex}) - the fields {unresolved} are decoded as is"
+            )
+        self.fields = fields
+        self.hints = hints
+        self.plans = {}
+        self.documentation = None
+        self.fieldNames = tuple(field.name for field in fields)
+        self.initFields = tuple(
+            (field.name, self.getConverter(hints.get(field.name, Any)))
+            for field in fields
+            if field.init
+        )
+        self.hasDefault = {
+            field.name
+            for field in fields
+            if field.default is not dataclasses.MISSING
+            or field.default_factory is not dataclasses.MISSING
+        }
+
+    @classmethod
+    def forClass(cls, clazz: type) -> "DataclassCodec":
+        """
+        get the cached codec for the given dataclass
+        """
+        codec = cls.codecs.get(clazz)
+        if codec is None:
+            codec = DataclassCodec(clazz)
+            cls.codecs[clazz] = codec
+        return codec
+
+    def getHint(self, field: dataclasses.Field):
+        """
+        get the resolved type hint of the given field of my dataclass
+
+        Args:
+            field(dataclasses.Field): the field
+
+        Returns:
+            the type hint - the declared type if the hints could not be resolved
+        """
+        return self.hints.get(field.name, field.type)
+
+    def getDocumentation(self) -> Tuple[str, Dict[str, Dict[str, str]]]:
+        """
+        get the class description and the attribute documentation parsed from the
+        docstring of my dataclass - the docstring is parsed only once
+
+        Returns:
+            Tuple[str, Dict[str, Dict[str, str]]]: the class description and the type and description by attribute name
+        """
+        if self.documentation is None:
+            from lodstorage.docstring_parser import DocstringParser
+
+            if DataclassCodec.docstringParser is None:
+                DataclassCodec.docstringParser = DocstringParser()
+            self.documentation = DataclassCodec.docstringParser.parse(
+                self.clazz.__doc__
+            )
+        return self.documentation
+
+    def getPlan(self, name: str, factory: Callable[["DataclassCodec"], Any]) -> Any:
+        """
+        get the plan with the given name that is derived from my dataclass
+        e.g. the LinkML slots - the plan is created on first use
+
+        Args:
+            name(str): the name of the plan
+            factory(Callable): the function creating the plan from this codec
+
+        Returns:
+            the cached plan
+        """
+        plan = self.plans.get(name)
+        if plan is None:
+            plan = factory(self)
+            self.plans[name] = plan
+        return plan
+
+    @staticmethod
+    def toDatetime(value):
+        """
+        convert the given JSON value to a datetime
+        """
+        if isinstance(value, datetime.datetime):
+            return value
+        if isinstance(value, str):
+            return datetime.datetime.fromisoformat(value)
+        # timestamps as written by dataclasses_json
+        tz = datetime.datetime.now(datetime.timezone.utc).astimezone().tzinfo
+        return datetime.datetime.fromtimestamp(value, tz=tz)
+
+    @staticmethod
+    def toDate(value):
+        """
+        convert the given JSON value to a date
+        """
+        if isinstance(value, datetime.date):
+            return value
+        return datetime.date.fromisoformat(value)
+
+    @staticmethod
+    def isInstance(value, hint) -> bool:
+        """
+        check whether the given value is an instance of the given type hint
+        - the items of collections are not checked
+        """
+        origin = typing.get_origin(hint)
+        if origin in unionOrigins:
+            return any(
+                DataclassCodec.isInstance(value, arg) for arg in typing.get_args(hint)
+            )
+        if origin is not None:
+            hint = origin
+        if not isinstance(hint, type):
+            # e.g. Any or a TypeVar
+            return True
+        return isinstance(value, hint)
+
+    @classmethod
+    def toUnion(cls, value, members: list):
+        """
+        convert the given value to the first member type of a Union that fits
+        like dacite does
+
+        Args:
+            value: the decoded YAML/JSON value
+            members(list): (type,converter) tuples of the non None member types
+
+        Returns:
+            the converted value - the value as is if no member type fits
+        """
+        if value is None:
+            return None
+        for hint, converter in members:
+            if converter is None:
+                if cls.isInstance(value, hint):
+                    return value
+                continue
+            if isinstance(value, (str, bytes)) and typing.get_origin(hint):
+                # a string is never decoded as a collection
+                continue
+            try:
+                converted = converter(value)
+            except Exception:
+                continue
+            if cls.isInstance(converted, hint):
+                return converted
+        return value
+
+    @classmethod
+    def getConverter(cls, hint) -> Optional[Callable]:
+        """
+        get the function converting a decoded YAML/JSON value to the given type
+
+        Args:
+            hint: the type hint
+
+        Returns:
+            Callable: the converter or None if values can be used as is
+        """
+        origin = typing.get_origin(hint)
+        args = typing.get_args(hint)
+        if origin in unionOrigins:
+            nonNone = [arg for arg in args if arg is not type(None)]
+            if len(nonNone) == 1:
+                converter = cls.getConverter(nonNone[0])
+                if converter is None:
+                    return None
+                return lambda value: None if value is None else converter(value)
+            members = [(arg, cls.getConverter(arg)) for arg in nonNone]
+            if all(converter is None for _arg, converter in members):
+                return None
+            return lambda value: cls.toUnion(value, members)
+        if origin is tuple and args and not (len(args) == 2 and args[1] is Ellipsis):
+            # a fixed length tuple has a type per position
+            converters = [cls.getConverter(arg) for arg in args]
+            if all(converter is None for converter in converters):
+                return tuple
+            return lambda value: tuple(
+                item
+                if index >= len(converters) or converters[index] is None
+                else converters[index](item)
+                for index, item in enumerate(value)
+            )
+        if origin in (list, set, frozenset, tuple, Collection, Iterable) or (
+            origin is not None
+            and isinstance(origin, type)
+            and issubclass(origin, (typing.Sequence, typing.AbstractSet))
+            and not issubclass(origin, str)
+        ):
+            itemType = args[0] if args else Any
+            converter = cls.getConverter(itemType)
+            container = origin if origin in (list, set, frozenset, tuple) else list
+            if converter is None:
+                if container is list:
+                    return None
+                return container
+            return lambda value: container(converter(item) for item in value)
+        if (
+            origin is not None
+            and isinstance(origin, type)
+            and issubclass(origin, Mapping)
+        ):
+            valueType = args[1] if len(args) == 2 else Any
+            converter = cls.getConverter(valueType)
+            if converter is None:
+                return None
+            return lambda value: {k: converter(v) for k, v in value.items()}
+        if not isinstance(hint, type):
+            return None
+        if dataclasses.is_dataclass(hint):
+            return lambda value: (
+                cls.forClass(hint).fromDict(value)
+                if isinstance(value, Mapping)
+                else value
+            )
+        if issubclass(hint, datetime.datetime):
+            return cls.toDatetime
+        if issubclass(hint, datetime.date):
+            return cls.toDate
+        if issubclass(hint, (enum.Enum, decimal.Decimal, uuid.UUID)):
+            return lambda value: value if isinstance(value, hint) else hint(value)
+        return None
+
+    def fromDict(self, data: dict, inferMissing: bool = False):
+        """
+        create an instance of my dataclass from the given dict
+
+        Args:
+            data(dict): the dict e.g. from a YAML or JSON document - unknown keys are ignored
+            inferMissing(bool): if True missing fields without default are set to None
+
+        Returns:
+            an instance of my dataclass
+        """
+        if isinstance(data, self.clazz):
+            return data
+        kwargs = {}
+        for name, converter in self.initFields:
+            if name in data:
+                value = data[name]
+                if converter is not None and value is not None:
+                    value = converter(value)
+                kwargs[name] = value
+            elif inferMissing and name not in self.hasDefault:
+                kwargs[name] = None
+        instance = self.clazz(**kwargs)
+        return instance
+
+    def toDict(self, instance) -> Dict[str, Any]:
+        """
+        convert the given instance to a dict of plain values recursively
+        like dataclasses_json's to_dict - collections become lists, leaf values
+        such as datetimes are kept as is
+
+        Args:
+            instance: the instance of my dataclass
+
+        Returns:
+            dict: the dict
+        """
+        return {
+            name: DataclassCodec.plain(getattr(instance, name))
+            for name in self.fieldNames
+        }
+
+    @staticmethod
+    def plain(value):
+        """
+        convert the given value to plain dicts and lists recursively
+        """
+        if dataclasses.is_dataclass(value) and not isinstance(value, type):
+            return DataclassCodec.forClass(type(value)).toDict(value)
+        if isinstance(value, (str, bytes)):
+            return value
+        if isinstance(value, Mapping):
+            return {k: DataclassCodec.plain(v) for k, v in value.items()}
+        if isinstance(value, Collection):
+            return [DataclassCodec.plain(item) for item in value]
+        return value
+
+    def toCleanDict(
+        self,
+        instance,
+        ignore_none: bool = True,
+        ignore_underscore: bool = False,
+        ignore_empty: bool = True,
+    ) -> dict:
+        """
+        convert the given instance to a dict in a single pass leaving out
+        ignored values - equivalent to YamlAble.remove_ignored_values(asdict(instance))
+
+        Args:
+            instance: the instance of my dataclass
+            ignore_none: if True None values are removed
+            ignore_underscore: if True keys starting with an underscore are removed
+            ignore_empty: if True empty collections are removed
+
+        Returns:
+            dict: the cleaned dict
+        """
+        flags = (ignore_none, ignore_underscore, ignore_empty)
+        cleanDict = {}
+        for name in self.fieldNames:
+            if ignore_underscore and name.startswith("_"):
+                continue
+            value = getattr(instance, name)
+            if DataclassCodec.isValid(value, ignore_none, ignore_empty):
+                cleanDict[name] = DataclassCodec.clean(value, *flags)
+        return cleanDict
+
+    @staticmethod
+    def isValid(value, ignore_none: bool, ignore_empty: bool) -> bool:
+        """
+        check whether the given value is to be kept
+        """
+        if value is None:
+            return not ignore_none
+        if type(value) in DataclassCodec.scalarTypes:
+            return True
+        if ignore_empty:
+            if dataclasses.is_dataclass(value) and not isinstance(value, type):
+                # asdict would give an empty dict for a dataclass without fields
+                return len(DataclassCodec.forClass(type(value)).fieldNames) > 0
+            if isinstance(value, (str, bytes)):
+                return True
+            if isinstance(value, Iterable) and not value:
+                return False
+        return True
+
+    @staticmethod
+    def clean(
+        value, ignore_none: bool, ignore_underscore: bool, ignore_empty: bool
+    ) -> Any:
+        """
+        convert the given value to plain dicts and lists recursively leaving out ignored values
+        """
+        if type(value) in DataclassCodec.scalarTypes:
+            return value
+        if isinstance(value, (str, bytes)):
+            return value
+        if dataclasses.is_dataclass(value) and not isinstance(value, type):
+            codec = DataclassCodec.forClass(type(value))
+            return codec.toCleanDict(
+                value, ignore_none, ignore_underscore, ignore_empty
+            )
+        if isinstance(value, Mapping):
+            return {
+                k: DataclassCodec.clean(v, ignore_none, ignore_underscore, ignore_empty)
+                for k, v in value.items()
+                if DataclassCodec.isValid(v, ignore_none, ignore_empty)
+                and not (ignore_underscore and k.startswith("_"))
+            }
+        if isinstance(value, Iterable):
+            return [
+                DataclassCodec.clean(v, ignore_none, ignore_underscore, ignore_empty)
+                for v in value
+                if DataclassCodec.isValid(v, ignore_none, ignore_empty)
+            ]
+        return value
+
+    @staticmethod
+    def jsonDefault(value):
+        """
+        encode values json can't handle - compatible with dataclasses_json
+        (datetimes as timestamps)
+        """
+        if isinstance(value, Mapping):
+            return dict(value)
+        if isinstance(value, Collection) and not isinstance(value, str):
+            return list(value)
+        if isinstance(value, datetime.datetime):
+            return value.timestamp()
+        if isinstance(value, datetime.date):
+            return value.isoformat()
+        if isinstance(value, enum.Enum):
+            return value.value
+        if isinstance(value, (uuid.UUID, decimal.Decimal)):
+            return str(value)
+        raise TypeError(
+            f"Object of type {type(value).__name__} is not JSON serializable"
+        )
@@ -10,7 +10,6 @@ import time
 from lodstorage.jsonable import JSONAble, JSONAbleList
 from lodstorage.jsonpicklemixin import JsonPickleMixin
 from lodstorage.lod import LOD
-from lodstorage.sparql import SPARQL
 from lodstorage.sql import SQLDB
 from lodstorage.storageconfig import StorageConfig, StoreMode
 from lodstorage.yamlablemixin import YamlAbleMixin
@@ -78,6 +77,9 @@ class EntityManager(YamlAbleMixin, JsonPickleMixin, JSONAbleList):
             if config.endpoint is None:
                 raise Exception("no endpoint set for mode sparql")
             self.endpoint = config.endpoint
+            # requests and SPARQLWrapper are only needed for SPARQL stores
+            from lodstorage.sparql import SPARQL
+
             self.sparql = SPARQL(
                 config.endpoint, debug=config.debug, profile=config.profile
             )
@@ -116,6 +118,11 @@ class EntityManager(YamlAbleMixin, JsonPickleMixin, JSONAbleList):
         if mode is StoreMode.JSON or mode is StoreMode.JSONPICKLE:
             extension = f".{mode.name.lower()}"
             cachepath = f"{cachedir}/{self.name}-{self.listName}{extension}"
+        elif mode is StoreMode.JSONL:
+            extension = ".jsonl"
+            if config.compression:
+                extension += f".{config.compression}"
+            cachepath = f"{cachedir}/{self.name}-{self.listName}{extension}"
         elif mode is StoreMode.SPARQL:
             cachepath = f"SPAQRL {self.name}:{config.endpoint}"
         elif mode is StoreMode.SQL:
@@ -124,10 +131,59 @@ class EntityManager(YamlAbleMixin, JsonPickleMixin, JSONAbleList):
             cachepath = f"undefined cachepath for StoreMode {mode}"
         return cachepath
 
+    def getKeySketchFile(self, key: str) -> str:
+        """
+        get the file of the HyperLogLog sketch of the given key that is kept next to my cache
+
+        Args:
+            key(str): the name of the key attribute
+
+        Returns:
+            str: the path of the sketch file
+        """
+        cachedir = self.config.getCachePath()
+        return f"{cachedir}/{self.name}-{self.listName}-{key}.hll"
+
+    def getKeySketch(self, key: str, precision: int = 14, update: bool = False):
+        """
+        get the HyperLogLog sketch of the values of the given key of my entities
+        for approximate synchronization statistics
+
+        the sketch is stored next to my cache and loaded from there as long as
+        it is not older than my cache file
+
+        Args:
+            key(str): the name of the key attribute
+            precision(int): the precision of the sketch if it is created
+            update(bool): if True recreate the sketch from my current entities
+
+        Returns:
+            HyperLogLog: the sketch
+        """
+        from lodstorage.sketch import HyperLogLog
+
+        sketchFile = self.getKeySketchFile(key)
+        if not update and os.path.isfile(sketchFile):
+            cacheFile = self.getCacheFile(mode=self.config.mode)
+            isCurrent = not os.path.isfile(cacheFile)
+            if not isCurrent:
+                isCurrent = os.path.getmtime(sketchFile) >= os.path.getmtime(cacheFile)
+            if isCurrent:
+                return HyperLogLog.load(sketchFile)
+        values = (
+            entity.get(key) if isinstance(entity, dict) else getattr(entity, key, None)
+            for entity in self.getList()
+        )
+        sketch = HyperLogLog.of(
+            (value for value in values if value is not None), precision
+        )
+        sketch.store(sketchFile)
+        return sketch
+
     def removeCacheFile(self):
         """remove my cache file"""
         mode = self.config.mode
-        if mode is StoreMode.JSON or mode is StoreMode.JSONPICKLE:
+        if mode in (StoreMode.JSON, StoreMode.JSONPICKLE, StoreMode.JSONL):
             cacheFile = self.getCacheFile(mode=mode)
             if os.path.isfile(cacheFile):
                 os.remove(cacheFile)
@@ -191,7 +247,7 @@ class EntityManager(YamlAbleMixin, JsonPickleMixin, JSONAbleList):
         result = False
         config = self.config
         mode = self.config.mode
-        if mode is StoreMode.JSON or mode is StoreMode.JSONPICKLE:
+        if mode in (StoreMode.JSON, StoreMode.JSONPICKLE, StoreMode.JSONL):
             result = os.path.isfile(self.getCacheFile(config=self.config, mode=mode))
         elif mode is StoreMode.SPARQL:
             # @FIXME - make abstract
@@ -303,6 +359,8 @@ GROUP by ?source
         elif mode is StoreMode.JSON:
             listOfDicts = self.readLodFromJsonFile(cacheFile)
             pass
+        elif mode is StoreMode.JSONL:
+            listOfDicts = list(self.readLodFromJsonLinesFile(cacheFile))
         elif mode is StoreMode.SPARQL:
             # @FIXME make abstract
             eventQuery = (
@@ -358,7 +416,7 @@ SELECT ?eventId ?acronym ?series ?title ?year ?country ?city ?startDate ?endDate
         lod = []
         for entity in self.getList():
             # TODO - optionally filter by samples
-            lod.append(entity.__dict__)
+            lod.append(JSONAble.getAttrs(entity))
         return lod
 
     def store(
@@ -440,6 +498,13 @@ SELECT ?eventId ?acronym ?series ?title ?year ?country ?city ?startDate ?endDate
             if mode is StoreMode.JSON:
                 self.storeToJsonFile(cacheFile)
                 pass
+        elif mode is StoreMode.JSONL:
+            if cacheFile is None:
+                cacheFile = self.getCacheFile(config=self.config, mode=mode)
+            self.showProgress(
+                f"{'appending' if append else 'storing'} {len(listOfDicts)} {self.entityPluralName} for {self.name} to cache {cacheFile}"
+            )
+            self.storeToJsonLinesFile(cacheFile, listOfDicts, append=append)
         elif mode is StoreMode.SPARQL:
             startTime = time.time()
             msg = f"storing {len(listOfDicts)} {self.entityPluralName} to {self.config.mode} ({self.config.endpoint})"
@@ -5,10 +5,12 @@ Created on 2020-09-03
 @author: wf
 """
 import datetime
-import json
 import re
 import sys
+from typing import Callable
 
+from lodstorage.jsonbackend import JsonBackend
+from lodstorage.jsonl import JSONL
 from lodstorage.lod import LOD
 
 
@@ -24,21 +26,73 @@ class JSONAbleSettings:
     see https://stackoverflow.com/a/50257217/1497139
     """
     singleQuoteRegex = re.compile("(?<!\\\\)'")
+    # cache of the slot names by class
+    slotNamesByClass = {}
 
 
-class JSONAble(object):
+class JSONAbleBase(object):
     """
-    mixin to allow classes to be JSON serializable see
-
-    - https://stackoverflow.com/questions/3768895/how-to-make-a-class-json-serializable
+    slotted base class of JSONAble
 
+    subclass it declaring __slots__ for compact records without a per instance __dict__
     """
 
+    __slots__ = ()
+
     def __init__(self):
         """
         Constructor
         """
 
+    @staticmethod
+    def getSlotNames(cls) -> tuple:
+        """
+        get the names of the slots declared by the given class and its base classes
+
+        Args:
+            cls(class): the class to inspect
+
+        Returns:
+            tuple: the slot names
+        """
+        slotNames = JSONAbleSettings.slotNamesByClass.get(cls)
+        if slotNames is None:
+            names = []
+            for base in reversed(cls.__mro__):
+                slots = base.__dict__.get("__slots__", ())
+                if isinstance(slots, str):
+                    slots = (slots,)
+                for name in slots:
+                    if name not in ("__dict__", "__weakref__") and name not in names:
+                        names.append(name)
+            slotNames = tuple(names)
+            JSONAbleSettings.slotNamesByClass[cls] = slotNames
+        return slotNames
+
+    @staticmethod
+    def getAttrs(obj) -> dict:
+        """
+        get the attributes of the given object
+
+        Args:
+            obj(object): the object to get the attributes for
+
+        Returns:
+            dict: the __dict__ of the object itself if it has no slots
+                otherwise a dict of the assigned slots and the __dict__ entries (if any)
+        """
+        slotNames = JSONAble.getSlotNames(type(obj))
+        objDict = getattr(obj, "__dict__", None)
+        if not slotNames and objDict is not None:
+            return objDict
+        attrs = {}
+        for name in slotNames:
+            if hasattr(obj, name):
+                attrs[name] = getattr(obj, name)
+        if objDict is not None:
+            attrs.update(objDict)
+        return attrs
+
     @classmethod
     def getPluralname(cls):
         return "%ss" % cls.__name__
@@ -154,7 +208,7 @@ class JSONAble(object):
         Returns:
             the JSON string read from the file
         """
-        with open(jsonFilePath, "r") as jsonFile:
+        with open(jsonFilePath, "r", encoding="utf-8") as jsonFile:
             jsonStr = jsonFile.read()
         return jsonStr
 
@@ -168,7 +222,7 @@ class JSONAble(object):
             jsonFilePath(string): the path of the file where to store the result
 
         """
-        with open(jsonFilePath, "w") as jsonFile:
+        with open(jsonFilePath, "w", encoding="utf-8") as jsonFile:
             jsonFile.write(jsonStr)
 
     def checkExtension(self, jsonFile: str, extension: str = ".json") -> str:
@@ -217,7 +271,7 @@ class JSONAble(object):
         Args:
             jsonStr(str): the JSON string
         """
-        jsonMap = json.loads(jsonStr)
+        jsonMap = JsonBackend.loads(jsonStr)
         self.fromDict(jsonMap)
 
     def fromDict(self, data: dict):
@@ -238,9 +292,9 @@ class JSONAble(object):
         Args:
             v(object): the value to convert
         """
-        # objects have __dict__ hash tables which can be JSON-converted
-        if hasattr(v, "__dict__"):
-            return v.__dict__
+        # objects have __dict__ hash tables or __slots__ which can be JSON-converted
+        if hasattr(v, "__dict__") or JSONAble.getSlotNames(type(v)):
+            return JSONAble.getAttrs(v)
         elif isinstance(v, datetime.datetime):
             return v.isoformat()
         elif isinstance(v, datetime.date):
@@ -265,18 +319,18 @@ class JSONAble(object):
                 limitedRecords = []
                 for record in self.__dict__[self.listName]:
                     limitedRecord = {}
-                    for key, value in record.__dict__.items():
+                    for key, value in JSONAble.getAttrs(record).items():
                         if key in sampleFields:
                             limitedRecord[key] = value
                     limitedRecords.append(limitedRecord)
                 data[self.listName] = limitedRecords
             else:
-                for key, value in self.__dict__.items():
+                for key, value in JSONAble.getAttrs(self).items():
                     if key in sampleFields:
                         data[key] = value
         else:
             data = self
-        jsonStr = json.dumps(
+        jsonStr = JsonBackend.dumps(
             data,
             default=lambda v: self.toJsonAbleValue(v),
             sort_keys=True,
@@ -336,7 +390,7 @@ class JSONAble(object):
             asString(boolean): if True return my result as a string
         """
         if data is None:
-            data = self.__dict__
+            data = JSONAble.getAttrs(self)
         jsonDict = self.reprDict(data)
         if asString:
             jsonStr = str(jsonDict)
@@ -345,6 +399,15 @@ class JSONAble(object):
         return jsonDict
 
 
+class JSONAble(JSONAbleBase):
+    """
+    mixin to allow classes to be JSON serializable see
+
+    - https://stackoverflow.com/questions/3768895/how-to-make-a-class-json-serializable
+
+    """
+
+
 class JSONAbleList(JSONAble):
     """
     Container class
@@ -424,7 +487,7 @@ class JSONAbleList(JSONAble):
             list: a list of dicts
         """
         # read a data structe from the given JSON string
-        lodOrDict = json.loads(jsonStr)
+        lodOrDict = JsonBackend.loads(jsonStr)
         # it should be a list only of dict with my list
         if not isinstance(lodOrDict, dict) and listName is not None:
             lod = lodOrDict
@@ -458,9 +521,9 @@ class JSONAbleList(JSONAble):
         if self.handleInvalidListTypes:
             LOD.handleListTypes(lod=lod, doFilter=self.filterInvalidListTypes)
 
-        for record in lod:
-            # call the constructor to get a new instance
+        def fromRecord(record):
             try:
+                # call the constructor to get a new instance
                 entity = self.clazz()
                 entity.fromDict(record)
                 entityList.append(entity)
@@ -469,6 +532,9 @@ class JSONAbleList(JSONAble):
                 errors.append(error)
                 if debug:
                     print(error)
+
+        plan = HydrationPlan.forClass(self.clazz)
+        plan.hydrate(lod, entityList, fromRecord)
         return errors
 
     def getLookup(self, attrName: str, withDuplicates: bool = False):
@@ -548,12 +614,12 @@ class JSONAbleList(JSONAble):
         lod = self.readLodFromJsonStr(jsonStr)
         return lod
 
-    def readLodFromJsonStr(self, jsonStr) -> list:
+    def getTypesFromSamples(self):
         """
-        restore me from the given jsonStr
+        get the types of my list as specified by the samples of my class
 
-        Args:
-            storeFilePrefix(string): the prefix for the JSON file name
+        Returns:
+            Types: the types or None if there are no samples
         """
         if self.clazz is None:
             typeSamples = self.getJsonTypeSamples()
@@ -566,9 +632,196 @@ class JSONAbleList(JSONAble):
                 self.listName, warnOnUnsupportedTypes=not self.handleInvalidListTypes
             )
             types.getTypes(self.listName, typeSamples, len(typeSamples))
+        return types
+
+    def readLodFromJsonStr(self, jsonStr) -> list:
+        """
+        restore me from the given jsonStr
+
+        Args:
+            storeFilePrefix(string): the prefix for the JSON file name
+        """
+        types = self.getTypesFromSamples()
         lod = self.getLoDfromJson(jsonStr, types, listName=self.listName)
         return lod
 
+    def storeToJsonLinesFile(
+        self, jsonlFile: str, lod: list = None, append: bool = False
+    ) -> int:
+        """
+        store my list (or the given list of dicts) to the given JSON Lines file
+        one record per line
+
+        Args:
+            jsonlFile(str): the JSON Lines file name - ending with .gz or .zst for compression
+            lod(list): the list of dicts to store - if None my list is stored
+            append(bool): if True append the records to the file
+
+        Returns:
+            int: the number of records written
+        """
+        if lod is None:
+            lod = self.getList()
+        return JSONL.writeLoD(jsonlFile, lod, append=append)
+
+    def readLodFromJsonLinesFile(
+        self, jsonlFile: str, chunkSize: int = 10000, maxWorkers: int = 1
+    ):
+        """
+        read the list of dicts from the given JSON Lines file
+
+        Args:
+            jsonlFile(str): the JSON Lines file to read from
+            chunkSize(int): the number of lines to parse at once
+            maxWorkers(int): the number of processes to parse chunks in parallel
+
+        Returns:
+            generator: a generator of dicts with fixed types
+        """
+        types = self.getTypesFromSamples()
+        fixTypes = None
+        if types is not None:
+            fixTypes = lambda lod: types.fixTypes(lod, self.listName)
+        return JSONL.readLoD(
+            jsonlFile, chunkSize=chunkSize, maxWorkers=maxWorkers, fixTypes=fixTypes
+        )
+
+    def restoreFromJsonLinesFile(self, jsonlFile: str) -> list:
+        """
+        read my list of dicts from the given JSON Lines file and restore it
+        """
+        lod = list(self.readLodFromJsonLinesFile(jsonlFile))
+        return self.setListFromLoD(lod)
+
+
+class HydrationPlan:
+    """
+    a plan for the bulk creation of instances of a class from a list of dicts
+
+    instead of calling fromDict for every record the instance dict is filled
+    directly from the record which is equivalent as long as the class does not
+    customize fromDict or __setattr__ and the record keys are strings that do not
+    refer to properties or other data descriptors of the class. The constructor
+    is skipped if it is the trivial JSONAble/object constructor.
+    The validity of the keys is checked once per record shape.
+
+    The plans are cached per class - at most maxPlans plans and maxShapes
+    record shapes per plan are kept, the oldest ones are dropped first.
+    """
+
+    plans = {}
+    maxPlans = 256
+    maxShapes = 1024
+
+    def __init__(self, clazz):
+        """
+        construct the plan for the given class
+
+        Args:
+            clazz(class): the class to create instances of
+        """
+        self.clazz = clazz
+        self.shapes = {}
+        self.bulk = (
+            getattr(clazz, "fromDict", None) is JSONAble.fromDict
+            and clazz.__setattr__ is object.__setattr__
+        )
+        if self.bulk:
+            self.bulk = self.hasInstanceDict(clazz)
+        self.trivialInit = (
+            clazz.__init__ in (JSONAble.__init__, object.__init__)
+            and clazz.__new__ is object.__new__
+        )
+        self.descriptors = set()
+        for base in clazz.__mro__:
+            for name, value in vars(base).items():
+                if hasattr(value, "__set__") or hasattr(value, "__delete__"):
+                    self.descriptors.add(name)
+
+    @staticmethod
+    def hasInstanceDict(clazz) -> bool:
+        """
+        check whether the instances of the given class have a __dict__
+        without creating an instance
+
+        Args:
+            clazz(class): the class to check
+
+        Returns:
+            bool: True if a class of the MRO does not declare __slots__ or declares a __dict__ slot
+        """
+        for base in clazz.__mro__:
+            slots = base.__dict__.get("__slots__")
+            if slots is None:
+                # classes without __slots__ add a __dict__ - types implemented
+                # in C like object or int only if they have a dict offset
+                if base.__dictoffset__ != 0:
+                    return True
+                continue
+            if isinstance(slots, str):
+                slots = (slots,)
+            if "__dict__" in slots:
+                return True
+        return False
+
+    @classmethod
+    def forClass(cls, clazz) -> "HydrationPlan":
+        """
+        get the cached plan for the given class
+        """
+        plan = cls.plans.get(clazz)
+        if plan is None:
+            plan = HydrationPlan(clazz)
+            while len(cls.plans) >= cls.maxPlans:
+                cls.plans.pop(next(iter(cls.plans)), None)
+            cls.plans[clazz] = plan
+        return plan
+
+    def isValidShape(self, shape: tuple) -> bool:
+        """
+        check whether records with the given keys can be hydrated in bulk
+
+        Args:
+            shape(tuple): the keys of a record
+
+        Returns:
+            bool: True if all keys are strings and no key refers to a data descriptor
+        """
+        valid = self.shapes.get(shape)
+        if valid is None:
+            valid = all(
+                type(key) is str and key not in self.descriptors for key in shape
+            )
+            if len(self.shapes) >= self.maxShapes:
+                self.shapes.pop(next(iter(self.shapes)), None)
+            self.shapes[shape] = valid
+        return valid
+
+    def hydrate(self, lod: list, entityList: list, fromRecord: Callable):
+        """
+        create instances for the given records and append them to the given entityList
+
+        Args:
+            lod(list): the list of dicts to create instances for
+            entityList(list): the list to append the instances to
+            fromRecord(Callable): the generic handling for records that can't be hydrated in bulk
+        """
+        if not self.bulk:
+            for record in lod:
+                fromRecord(record)
+            return
+        clazz = self.clazz
+        for record in lod:
+            if type(record) is not dict or not self.isValidShape(tuple(record)):
+                fromRecord(record)
+                continue
+            if self.trivialInit:
+                entity = clazz.__new__(clazz)
+            else:
+                entity = clazz()
+            entity.__dict__.update(record)
+            entityList.append(entity)
+
 
 class Types(JSONAble):
     """
@@ -0,0 +1,156 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+import enum
+import json
+import re
+from typing import Callable
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class JsonBackend:
+    """
+    JSON encoding and decoding using orjson (https://github.com/ijl/orjson) if installed
+    and the standard library json module otherwise
+
+    orjson serializes dates and datetimes natively and calls the default function
+    for other objects including dataclasses. Its indented output uses two spaces
+    which are widened for other indents. The text differs from the one of the
+    standard library in that non ASCII characters are not escaped and floats
+    with exponents are formatted differently e.g. 1e16 and 1e-7 instead of
+    1e+16 and 1e-07 - the decoded values are the same.
+    The standard library is used as a fallback for content orjson can't handle
+    e.g. integers exceeding 64 bit and for enums which orjson would serialize
+    by value instead of passing them to the default function.
+
+    :ivar useFast(bool): set to False to always use the standard library
+    """
+
+    useFast = orjson is not None
+    indentRegex = re.compile(r"^((?:  )+)", re.MULTILINE)
+
+    @classmethod
+    def name(cls) -> str:
+        """
+        Returns:
+            str: the name of the backend in use
+        """
+        return "orjson" if cls.useFast and orjson is not None else "json"
+
+    @classmethod
+    def reindent(cls, jsonStr: str, indent: int) -> str:
+        """
+        widen the two space indentation of the given JSON text to the given indent
+
+        JSON strings can't contain raw newlines so all leading spaces of a line are indentation
+
+        Args:
+            jsonStr(str): the two space indented JSON text
+            indent(int): the indent to use
+
+        Returns:
+            str: the reindented JSON text
+        """
+        if indent == 2:
+            return jsonStr
+        return cls.indentRegex.sub(
+            lambda match: " " * (len(match.group(1)) // 2 * indent), jsonStr
+        )
+
+    @staticmethod
+    def hasEnum(data) -> bool:
+        """
+        check whether the given data contains an enum that the standard library
+        does not serialize by itself i.e. that is not an int or str enum
+
+        Args:
+            data(object): the data to check
+
+        Returns:
+            bool: True if an enum is contained in the values of the data
+        """
+        stack = [data]
+        while stack:
+            value = stack.pop()
+            if isinstance(value, dict):
+                stack.extend(value.values())
+            elif isinstance(value, (list, tuple)):
+                stack.extend(value)
+            elif isinstance(value, enum.Enum) and not isinstance(value, (int, str)):
+                return True
+        return False
+
+    @classmethod
+    def dumps(
+        cls,
+        data,
+        indent: int = None,
+        sort_keys: bool = False,
+        default: Callable = None,
+        nativeDatetime: bool = True,
+    ) -> str:
+        """
+        encode the given data as JSON
+
+        Args:
+            data(object): the data to encode
+            indent(int): the number of spaces to indent nested structures - None for compact output
+            sort_keys(bool): if True sort the keys of dicts
+            default(Callable): function to get a serializable version of otherwise unsupported objects
+            nativeDatetime(bool): if False datetimes are passed to the default function instead of being encoded in ISO format
+
+        Returns:
+            str: the JSON text
+        """
+        if cls.useFast and orjson is not None and not cls.hasEnum(data):
+            option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATACLASS
+            if sort_keys:
+                option |= orjson.OPT_SORT_KEYS
+            if indent is not None:
+                option |= orjson.OPT_INDENT_2
+            if not nativeDatetime:
+                option |= orjson.OPT_PASSTHROUGH_DATETIME
+
+            def fastDefault(value):
+                result = default(value)
+                if cls.hasEnum(result):
+                    raise TypeError("enums are passed to the default function")
+                return result
+
+            try:
+                jsonStr = orjson.dumps(
+                    data, default=fastDefault if default else None, option=option
+                ).decode()
+                if indent is not None:
+                    jsonStr = cls.reindent(jsonStr, indent)
+                return jsonStr
+            except TypeError:
+                # e.g. integers exceeding 64 bit, keys that can't be sorted or enums
+                pass
+        jsonStr = json.dumps(data, indent=indent, sort_keys=sort_keys, default=default)
+        return jsonStr
+
+    @classmethod
+    def loads(cls, jsonStr):
+        """
+        decode the given JSON text
+
+        Args:
+            jsonStr(str): the JSON text (str or bytes)
+
+        Returns:
+            the decoded data
+        """
+        if cls.useFast and orjson is not None:
+            try:
+                return orjson.loads(jsonStr)
+            except orjson.JSONDecodeError:
+                # e.g. NaN or Infinity which the standard library accepts
+                pass
+        return json.loads(jsonStr)
@@ -0,0 +1,187 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+import datetime
+import gzip
+from collections import deque
+from itertools import islice
+from typing import Callable, Iterable
+
+from lodstorage.jsonbackend import JsonBackend
+
+
+class JSONL:
+    """
+    JSON Lines (https://jsonlines.org/) support: one JSON encoded record per line
+
+    records are written and read one at a time so that memory use does not
+    depend on the number of records. Files ending with .gz are gzip compressed,
+    files ending with .zst are zstd compressed (needs the optional zstandard package).
+    """
+
+    @staticmethod
+    def open(path: str, mode: str = "r"):
+        """
+        open the given JSON Lines file as a text file respecting its compression
+
+        Args:
+            path(str): the path of the file
+            mode(str): r for reading, w for writing or a for appending
+
+        Returns:
+            a text file object
+        """
+        if path.endswith(".gz"):
+            return gzip.open(path, f"{mode}t", encoding="utf-8")
+        if path.endswith(".zst"):
+            try:
+                import zstandard
+            except ImportError:
+                msg = f"zstd compression of {path} needs the zstandard package - pip install zstandard"
+                raise Exception(msg)
+            return zstandard.open(path, f"{mode}t", encoding="utf-8")
+        return open(path, mode, encoding="utf-8")
+
+    @staticmethod
+    def toJsonAbleValue(v):
+        """
+        get the JSON able value of the given value v
+
+        Args:
+            v(object): the value to convert
+        """
+        if isinstance(v, (datetime.datetime, datetime.date)):
+            return v.isoformat()
+        # avoid a circular import - jsonable uses this module
+        from lodstorage.jsonable import JSONAble
+
+        if hasattr(v, "__dict__") or JSONAble.getSlotNames(type(v)):
+            return JSONAble.getAttrs(v)
+        return ""
+
+    @classmethod
+    def dumps(cls, record: dict) -> str:
+        """
+        get the JSON Lines representation of the given record
+
+        Args:
+            record(dict): the record to convert
+
+        Returns:
+            str: a single line of JSON
+        """
+        return JsonBackend.dumps(record, default=cls.toJsonAbleValue, sort_keys=True)
+
+    @classmethod
+    def writeLoD(cls, path: str, lod: Iterable, append: bool = False) -> int:
+        """
+        write the given records to the given JSON Lines file
+
+        Args:
+            path(str): the path of the file
+            lod(Iterable): the records to write - may be a generator
+            append(bool): if True append to an existing file instead of overwriting it
+
+        Returns:
+            int: the number of records written
+        """
+        count = 0
+        with cls.open(path, "a" if append else "w") as jsonlFile:
+            for record in lod:
+                jsonlFile.write(cls.dumps(record))
+                jsonlFile.write("\n")
+                count += 1
+        return count
+
+    @staticmethod
+    def parseLines(lines: list) -> list:
+        """
+        parse the given JSON lines skipping empty lines
+
+        Args:
+            lines(list): the lines to parse
+
+        Returns:
+            list: the list of records
+        """
+        return [JsonBackend.loads(line) for line in lines if line.strip()]
+
+    @classmethod
+    def readChunks(cls, path: str, chunkSize: int = 10000):
+        """
+        read the raw lines of the given JSON Lines file in chunks
+
+        Args:
+            path(str): the path of the file
+            chunkSize(int): the number of lines per chunk
+
+        Returns:
+            generator: a generator of lists of lines
+        """
+        with cls.open(path, "r") as jsonlFile:
+            while True:
+                lines = list(islice(jsonlFile, chunkSize))
+                if not lines:
+                    break
+                yield lines
+
+    @classmethod
+    def readLoD(
+        cls,
+        path: str,
+        chunkSize: int = 10000,
+        maxWorkers: int = 1,
+        fixTypes: Callable = None,
+    ):
+        """
+        read the records of the given JSON Lines file
+
+        Args:
+            path(str): the path of the file
+            chunkSize(int): the number of lines to parse at once
+            maxWorkers(int): the number of processes for parsing chunks in parallel - 1 parses in this process
+            fixTypes(Callable): a function to call with the list of records of each chunk e.g. to fix date types
+
+        Returns:
+            generator: a generator of dicts in file order
+        """
+        chunks = cls.readChunks(path, chunkSize)
+        if maxWorkers > 1:
+            lodChunks = cls.parseParallel(chunks, maxWorkers)
+        else:
+            lodChunks = map(cls.parseLines, chunks)
+        for lod in lodChunks:
+            if fixTypes is not None:
+                fixTypes(lod)
+            yield from lod
+
+    @classmethod
+    def parseParallel(cls, chunks: Iterable, maxWorkers: int):
+        """
+        parse the given chunks of lines in parallel processes
+        keeping at most two chunks per worker in flight
+
+        Args:
+            chunks(Iterable): the chunks of lines to parse
+            maxWorkers(int): the number of processes to use
+
+        Returns:
+            generator: a generator of lists of records in chunk order
+        """
+        # multiprocessing is imported on first use to keep the start-up time low
+        from concurrent.futures import ProcessPoolExecutor
+
+        pending = deque()
+        with ProcessPoolExecutor(max_workers=maxWorkers) as executor:
+            try:
+                for lines in chunks:
+                    pending.append(executor.submit(cls.parseLines, lines))
+                    if len(pending) >= 2 * maxWorkers:
+                        yield pending.popleft().result()
+                while pending:
+                    yield pending.popleft().result()
+            finally:
+                for future in pending:
+                    future.cancel()
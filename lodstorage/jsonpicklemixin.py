@@ -1,8 +1,6 @@
 # Json persistence
 import os
 
-import jsonpickle
-
 
 class JsonPickleMixin(object):
     """
@@ -41,6 +39,8 @@ class JsonPickleMixin(object):
                 print("reading %s" % (jsonFileName))
             with open(jsonFileName) as jsonFile:
                 json = jsonFile.read()
+            import jsonpickle
+
             result = jsonpickle.decode(json)
             if JsonPickleMixin.debug:
                 print(json)
@@ -56,6 +56,8 @@ class JsonPickleMixin(object):
         Returns:
             str: a JSON String with my JSON representation
         """
+        import jsonpickle
+
         json = jsonpickle.encode(self)
         return json
 
@@ -5,13 +5,37 @@ Created on 2024-01-21
 """
 
 from collections.abc import Iterable, Mapping
-from dataclasses import fields, is_dataclass
-from typing import Union
+from dataclasses import dataclass, is_dataclass
+from typing import List, Optional, Union
 
-from lodstorage.docstring_parser import DocstringParser
+from lodstorage.dataclass_codec import DataclassCodec
 from lodstorage.linkml import Class, PythonTypes, Schema, Slot
 
 
+@dataclass
+class SlotPlan:
+    """
+    the LinkML view of a field of a dataclass - derived once per class
+
+    Attributes:
+        name (str): the name of the field
+        range (str): the LinkML range with Optional, List and Dict types unwrapped
+        multivalued (bool): True if the field is a list
+        declared_range (str): the LinkML range of the declared type as is
+        description (str): the description from the docstring of the class
+        content_class (Optional[type]): the dataclass of the list items or dict values
+        item_class (Optional[type]): the dataclass of the first type argument
+    """
+
+    name: str
+    range: str
+    multivalued: bool
+    declared_range: str
+    description: str
+    content_class: Optional[type] = None
+    item_class: Optional[type] = None
+
+
 class LinkMLGen:
     """
     Class for generating LinkML YAML schema from Python data models using dataclasses.
@@ -26,26 +50,36 @@ class LinkMLGen:
         """
         self.schema = schema
 
-    def gen_schema(self, data_model_class) -> Schema:
-        # Use DocstringParser to extract class description
-        parser = DocstringParser()
-        class_description, doc_attributes = parser.parse(data_model_class.__doc__)
+    @classmethod
+    def get_slot_plans(cls, codec: DataclassCodec) -> List[SlotPlan]:
+        """
+        analyze the fields of the dataclass of the given codec
 
-        class_name = data_model_class.__name__
-        new_class = Class(description=class_description, slots=[])
+        Args:
+            codec (DataclassCodec): the codec of the dataclass
 
+        Returns:
+            List[SlotPlan]: the LinkML view of the fields
+        """
+        # Use DocstringParser to extract the attribute descriptions
+        _class_description, doc_attributes = codec.getDocumentation()
+        slot_plans = []
         # Iterate over the fields of the dataclass
-        for field_info in fields(data_model_class):
+        for field_info in codec.fields:
             attr_name = field_info.name
-            attr_type = field_info.type
+            attr_type = codec.getHint(field_info)
+            declared_range = PythonTypes.get_linkml_range(attr_type)
+            # the declared content type of multivalued values
+            type_args = getattr(attr_type, "__args__", None)
+            item_class = None
+            if type_args and is_dataclass(type_args[0]):
+                item_class = type_args[0]
 
             # Handle Optional and List types
-            is_optional = False
             is_list = False
             content_type = None
             if hasattr(attr_type, "__origin__"):
                 if attr_type.__origin__ is Union and type(None) in attr_type.__args__:
-                    is_optional = True
                     attr_type = [t for t in attr_type.__args__ if t is not type(None)][
                         0
                     ]  # unwrap Optional type
@@ -58,33 +92,56 @@ class LinkMLGen:
                         1
                     ]  # unwrap Dict type, focusing on value type
 
-            # Check and handle nested dataclasses for lists or dicts
+            content_class = None
             if is_dataclass(content_type):
-                # Recursive call to handle nested dataclass
-                self.gen_schema(content_type)
-                # Set the range to the name of the dataclass
-                linkml_range = (
-                    content_type.__name__
-                )  # Use the name of the dataclass as the range
+                content_class = content_type
+                # Use the name of the dataclass as the range
+                linkml_range = content_type.__name__
             elif is_list:
                 # If it's a list, get the LinkML range for the base type
-                # Use self.get_linkml_range to ensure consistent type mapping
                 linkml_range = PythonTypes.get_linkml_range(content_type)
             else:
-                # For non-list and non-dataclass types, use self.get_linkml_range for consistent type mapping
+                # For non-list and non-dataclass types, use consistent type mapping
                 linkml_range = PythonTypes.get_linkml_range(attr_type)
 
             # Extract description from doc_attributes
             description = doc_attributes.get(attr_name, {}).get(
                 "description", f"{attr_name} - missing description"
             )
+            slot_plans.append(
+                SlotPlan(
+                    name=attr_name,
+                    range=linkml_range,
+                    multivalued=is_list,
+                    declared_range=declared_range,
+                    description=description,
+                    content_class=content_class,
+                    item_class=item_class,
+                )
+            )
+        return slot_plans
+
+    def gen_schema(self, data_model_class) -> Schema:
+        codec = DataclassCodec.forClass(data_model_class)
+        class_description, _doc_attributes = codec.getDocumentation()
+
+        class_name = data_model_class.__name__
+        new_class = Class(description=class_description, slots=[])
+
+        for slot_plan in codec.getPlan("linkml", self.get_slot_plans):
+            # Check and handle nested dataclasses for lists or dicts
+            if slot_plan.content_class:
+                # Recursive call to handle nested dataclass
+                self.gen_schema(slot_plan.content_class)
 
             # Create a new slot for the field
             new_slot = Slot(
-                description=description, range=linkml_range, multivalued=is_list
+                description=slot_plan.description,
+                range=slot_plan.range,
+                multivalued=slot_plan.multivalued,
             )
-            self.schema.slots[attr_name] = new_slot
-            new_class.slots.append(attr_name)
+            self.schema.slots[slot_plan.name] = new_slot
+            new_class.slots.append(slot_plan.name)
 
         self.schema.classes[class_name] = new_class
         return self.schema
@@ -99,19 +156,16 @@ class LinkMLGen:
         Returns:
             Schema: The LinkML schema generated from the data model.
         """
-        # Use DocstringParser to extract class description and attributes
-        parser = DocstringParser()
-        class_description, doc_attributes = parser.parse(data_model_instance.__doc__)
+        codec = DataclassCodec.forClass(type(data_model_instance))
+        class_description, doc_attributes = codec.getDocumentation()
 
         class_name = data_model_instance.__class__.__name__
         new_class = Class(description=class_description, slots=[])
 
-        for field_info in fields(data_model_instance):
-            attr_name = field_info.name
-            attr_type = field_info.type
-
+        for slot_plan in codec.getPlan("linkml", self.get_slot_plans):
+            attr_name = slot_plan.name
             # Extract field type/range
-            linkml_range = PythonTypes.get_linkml_range(attr_type)
+            linkml_range = slot_plan.declared_range
 
             # Check values for multivalued and type consistency
             attr_value = getattr(data_model_instance, attr_name)
@@ -123,24 +177,18 @@ class LinkMLGen:
             )
 
             # Prepare slot
-            description = doc_attributes.get(attr_name, {}).get(
-                "description", f"{attr_name} - missing description"
-            )
             if attr_name not in self.schema.slots:
                 new_slot = Slot(
-                    description=description, range=linkml_range, multivalued=multivalued
+                    description=slot_plan.description,
+                    range=linkml_range,
+                    multivalued=multivalued,
                 )
                 self.schema.slots[attr_name] = new_slot
                 new_class.slots.append(attr_name)
 
-            if multivalued:
+            if multivalued and slot_plan.item_class:
                 # recursive call if type of list or dict is a dataclass
-                if hasattr(attr_type, "__args__"):
-                    content_type = attr_type.__args__[
-                        0
-                    ]  # Get the declared content type
-                    if is_dataclass(content_type):
-                        self.gen_schema(content_type)
+                self.gen_schema(slot_plan.item_class)
 
         self.schema.classes[class_name] = new_class
         return self.schema
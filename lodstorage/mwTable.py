@@ -33,10 +33,29 @@ class MediaWikiTable(object):
 
         self.start = '{|class="%s%s%s"\n' % (cWikiTable, cssDelim, cSortable)
         self.header = None
-        self.content = ""
+        # the rows are buffered in a list and only joined on demand
+        self.rows = []
         self.end = "\n|}\n"
         self.withNewLines = withNewLines
-        pass
+        if self.withNewLines:
+            self.rowStart = "\n|-"
+            self.colDelim = "\n|"
+        else:
+            self.rowStart = "\n|-\n"
+            self.colDelim = "||"
+        # row templates by the tuple of keys of the records
+        self.rowTemplates = {}
+
+    @property
+    def content(self) -> str:
+        """
+        the markup of the rows
+        """
+        return "".join(self.rows)
+
+    @content.setter
+    def content(self, content: str):
+        self.rows = [content] if content else []
 
     def addHeader(self, record):
         """
@@ -50,7 +69,7 @@ class MediaWikiTable(object):
             headerStart = "|+\n"
             firstColDelim = "!"
             colDelim = "!!"
-        self.header = headerStart
+        parts = [headerStart]
         first = True
         for key in record.keys():
             if first:
@@ -58,25 +77,52 @@ class MediaWikiTable(object):
                 first = False
             else:
                 delim = colDelim
-            self.header += "%s%s" % (delim, key)
+            parts.append("%s%s" % (delim, key))
+        self.header = "".join(parts)
 
-    def addRow4Dict(self, record):
+    def getRowTemplate(self, keys: tuple) -> str:
+        """
+        get the %-format template for a row with the given keys
+        the column formats are resolved once per distinct tuple of keys
+
+        Args:
+            keys(tuple): the keys of the record
+
+        Returns:
+            str: the template to apply to the tuple of values
+        """
+        template = self.rowTemplates.get(keys)
+        if template is None:
+            colDelim = self.colDelim.replace("%", "%%")
+            parts = [self.rowStart.replace("%", "%%")]
+            for key in keys:
+                if self.colFormats is not None and key in self.colFormats:
+                    colFormat = self.colFormats[key]
+                else:
+                    colFormat = "%s"
+                parts.append(colDelim + colFormat)
+            template = "".join(parts)
+            self.rowTemplates[keys] = template
+        return template
+
+    def getRow4Dict(self, record) -> str:
+        """
+        get the markup for the given record
+
+        Args:
+            record(dict): the record
+
+        Returns:
+            str: the markup of the row
+        """
         if self.header is None:
             self.addHeader(record)
-        if self.withNewLines:
-            rowStart = "\n|-"
-            colDelim = "\n|"
-        else:
-            rowStart = "\n|-\n"
-            colDelim = "||"
-        self.content += rowStart
-        for key in record.keys():
-            value = record[key]
-            if self.colFormats is not None and key in self.colFormats:
-                colFormat = self.colFormats[key]
-            else:
-                colFormat = "%s"
-            self.content += ("%s" + colFormat) % (colDelim, value)
+        template = self.getRowTemplate(tuple(record.keys()))
+        row = template % tuple(record.values())
+        return row
+
+    def addRow4Dict(self, record):
+        self.rows.append(self.getRow4Dict(record))
 
     def fromListOfDicts(self, listOfDicts):
         for record in listOfDicts:
@@ -86,6 +132,54 @@ class MediaWikiTable(object):
     def noneReplace(self, value):
         return "" if value is None else value
 
+    def iterWikiMarkup(self, listOfDicts=None):
+        """
+        get my MediaWiki markup piece by piece
+
+        Args:
+            listOfDicts(Iterable): records to add as rows while iterating - may be a generator.
+                The rows are not buffered - if None my buffered rows are used
+
+        Returns:
+            generator: a generator of markup strings
+        """
+        if listOfDicts is None:
+            yield self.noneReplace(self.start)
+            yield self.noneReplace(self.header)
+            yield from self.rows
+        else:
+            first = True
+            for record in listOfDicts:
+                row = self.getRow4Dict(record)
+                if first:
+                    yield self.noneReplace(self.start)
+                    yield self.noneReplace(self.header)
+                    yield from self.rows
+                    first = False
+                yield row
+            if first:
+                yield self.noneReplace(self.start)
+                yield self.noneReplace(self.header)
+                yield from self.rows
+        yield self.noneReplace(self.end)
+
+    def writeWikiMarkup(self, stream, listOfDicts=None) -> int:
+        """
+        write my MediaWiki markup to the given stream
+
+        Args:
+            stream(TextIO): the text stream to write to
+            listOfDicts(Iterable): records to write as rows without buffering them - may be a generator
+
+        Returns:
+            int: the number of characters written
+        """
+        count = 0
+        for markup in self.iterWikiMarkup(listOfDicts):
+            stream.write(markup)
+            count += len(markup)
+        return count
+
     def asWikiMarkup(self):
         """
         convert me to MediaWiki markup
@@ -93,10 +187,5 @@ class MediaWikiTable(object):
         Returns:
             string: the MediWiki Markup for this table
         """
-        markup = (
-            self.noneReplace(self.start)
-            + self.noneReplace(self.header)
-            + self.noneReplace(self.content)
-            + self.noneReplace(self.end)
-        )
+        markup = "".join(self.iterWikiMarkup())
         return markup
@@ -6,9 +6,6 @@ Created on 2020-07-05
 import os
 from collections import Counter
 
-import matplotlib.pyplot as plt
-import numpy as np
-
 
 class Plot(object):
     """
@@ -47,6 +44,8 @@ class Plot(object):
 
     def titleMe(self):
         """set my title and labels"""
+        import matplotlib.pyplot as plt
+
         plt.title(self.title, fontsize=self.fontsize)
         if self.xlabel is not None:
             plt.xlabel(self.xlabel)
@@ -55,6 +54,8 @@ class Plot(object):
 
     def showMe(self, mode="show", close=True):
         """show me in the given mode"""
+        import matplotlib.pyplot as plt
+
         if mode == "show":
             plt.show()
         else:
@@ -64,6 +65,9 @@ class Plot(object):
 
     def barchart(self, mode="show"):
         """barchart based histogram for the given counter"""
+        import matplotlib.pyplot as plt
+        import numpy as np
+
         labels, values = zip(*self.counter.items())
         indexes = np.arange(len(labels))
         width = 1
@@ -83,6 +87,8 @@ class Plot(object):
         """create histogram for the given counter"""
         if self.debug:
             self.showDebug()
+        import matplotlib.pyplot as plt
+
         self.titleMe()
         # see https://stackoverflow.com/a/2162045/1497139
         plt.hist(self.valueList, bins=len(self.counter.keys()))
@@ -4,27 +4,21 @@ Created on 2020-08-22
 @author: wf
 """
 
-import copy
 import os
 import re
 import sys
 import urllib
 from enum import Enum
+from itertools import islice
 from pathlib import Path
-
-import yaml
-from pygments import highlight
-from pygments.formatters.html import HtmlFormatter
-from pygments.formatters.latex import LatexFormatter
-from pygments.lexers import get_lexer_by_name
-from pylatexenc.latexencode import unicode_to_latex
-from tabulate import tabulate
+from typing import Iterable, Iterator
 
 # from wikibot.mwTable import MediaWikiTable
 # redundant copy in this library to avoid dependency issues
 # original is at
 from lodstorage.jsonable import JSONAble
 from lodstorage.mwTable import MediaWikiTable
+from lodstorage.yamlbackend import YamlFileCache
 
 
 class Format(Enum):
@@ -34,6 +28,7 @@ class Format(Enum):
 
     csv = "csv"
     json = "json"
+    jsonl = "jsonl"
     xml = "xml"
     tsv = "tsv"
     latex = "latex"
@@ -67,6 +62,10 @@ class ValueFormatter:
     # additional endpoints from users endpoint configuration
     formatsPath = f"{os.path.dirname(__file__)}/../sampledata/formats.yaml"
     valueFormats = None
+    # the maximum number of memoized formatted values per formatter - 0 disables memoization
+    memoSize = 100000
+    # the result formats for which links are created
+    linkFormats = ("github", "mediawiki", "latex")
 
     def __init__(
         self,
@@ -82,8 +81,63 @@ class ValueFormatter:
             regexps(list): the regular expressions to apply
         """
         self.name = name
-        self.regexps = regexps
+        self.regexps = regexps if regexps is not None else []
         self.formatString = formatString
+        self.compiledRegexps = self.compileRegexps(self.regexps)
+        self.quickReject = self.getQuickReject(self.regexps)
+        self.memo = {}
+
+    def compileRegexps(self, regexps: list) -> list:
+        """
+        compile the given regular expressions - invalid ones and ones without
+        a value group are reported and skipped
+
+        Args:
+            regexps(list): the regular expressions
+
+        Returns:
+            list: the compiled patterns
+        """
+        compiledRegexps = []
+        for regexp in regexps:
+            try:
+                pattern = re.compile(regexp)
+                if "value" not in pattern.groupindex:
+                    raise ValueError("missing group (?P<value>...)")
+                compiledRegexps.append(pattern)
+            except Exception as ex:
+                print(
+                    f"ValueFormatter: {self.name}\nInvalid regular expression:{regexp}\n{str(ex)}",
+                    file=sys.stderr,
+                )
+        return compiledRegexps
+
+    @classmethod
+    def getQuickReject(cls, regexps: list):
+        """
+        get a single alternation pattern that matches if any of the given regular expressions matches
+
+        the regular expressions are applied one after the other to the value extracted
+        by the previous match so the alternation can't replace them - but if it doesn't
+        match the value is not formatted at all
+
+        Args:
+            regexps(list): the regular expressions
+
+        Returns:
+            Pattern: the compiled alternation or None if there is none or it can't be built safely
+        """
+        if len(regexps) < 2:
+            return None
+        for regexp in regexps:
+            # back references and inline flags depend on the single pattern
+            if re.search(r"\\[0-9]|\(\?P=|\(\?[aiLmsux]", regexp):
+                return None
+        alternatives = [regexp.replace("(?P<value>", "(?:") for regexp in regexps]
+        try:
+            return re.compile("|".join(f"(?:{alt})" for alt in alternatives))
+        except Exception:
+            return None
 
     @classmethod
     def fromDict(cls, name: str, record: dict):
@@ -111,15 +165,57 @@ class ValueFormatter:
             valueFormats = {}
             formatPaths = YamlPath.getPaths("formats.yaml", formatsPath)
             for formatPath in formatPaths:
-                with open(formatPath, "r") as stream:
-                    valueFormatRecords = yaml.safe_load(stream)
-                    for valueFormatKey, valueFormatRecord in valueFormatRecords.items():
-                        valueFormats[valueFormatKey] = ValueFormatter.fromDict(
-                            name=valueFormatKey, record=valueFormatRecord
-                        )
+                valueFormatRecords = YamlFileCache.load(formatPath)
+                for valueFormatKey, valueFormatRecord in valueFormatRecords.items():
+                    valueFormats[valueFormatKey] = ValueFormatter.fromDict(
+                        name=valueFormatKey, record=valueFormatRecord
+                    )
             cls.valueFormats = valueFormats
         return cls.valueFormats
 
+    def formatValue(self, value: str, resultFormat: str) -> str:
+        """
+        format the given value with the given resultFormat Style
+
+        Args:
+            value(str): the value to format
+            resultFormat(str): the resultFormat Style to apply
+
+        Returns:
+            str: the formatted value or None if the value is not to be formatted
+        """
+        if self.memoSize:
+            memoKey = (resultFormat, value)
+            if memoKey in self.memo:
+                return self.memo[memoKey]
+        newValue = None
+        if self.quickReject is not None and not self.quickReject.match(value):
+            doformat = False
+        else:
+            # if there are no regular expressions specified always format
+            doformat = len(self.regexps) == 0
+            for pattern in self.compiledRegexps:
+                vmatch = pattern.match(value)
+                if vmatch:
+                    # we found a match and will format it if the value is not none
+                    doformat = True
+                    value = vmatch.group("value")
+                    if value is None:
+                        break
+        if value is not None and doformat:
+            link = self.formatString.format(value=value)
+            if resultFormat == "github":
+                newValue = f"[{value}]({link})"
+            elif resultFormat == "mediawiki":
+                newValue = f"[{link} {value}]"
+            elif resultFormat == "latex":
+                newValue = f"\\href{{{link}}}{{{value}}}"
+        if self.memoSize:
+            if len(self.memo) >= self.memoSize:
+                self.memo.clear()
+            self.memo[memoKey] = newValue
+        return newValue
+
     def applyFormat(self, record, key, resultFormat: Format):
         """
         apply the given format to the given record
@@ -129,34 +225,13 @@ class ValueFormatter:
             key(str): the property key
             resultFormat(str): the resultFormat Style to apply
         """
-        if key in record:
-            value = record[key]
-            if value is not None and isinstance(value, str):
-                # if there are no regular expressions specified always format
-                doformat = len(self.regexps) == 0
-                for regexp in self.regexps:
-                    try:
-                        vmatch = re.match(regexp, value)
-                        if vmatch:
-                            # we found a match and will format it if the value is not none
-                            doformat = True
-                            value = vmatch.group("value")
-                    except Exception as ex:
-                        print(
-                            f"ValueFormatter: {self.name}\nInvalid regular expression:{regexp}\n{str(ex)}",
-                            file=sys.stderr,
-                        )
-                if value is not None and doformat:
-                    link = self.formatString.format(value=value)
-                    newValue = None
-                    if resultFormat == "github":
-                        newValue = f"[{value}]({link})"
-                    elif resultFormat == "mediawiki":
-                        newValue = f"[{link} {value}]"
-                    elif resultFormat == "latex":
-                        newValue = f"\href{{{link}}}{{{value}}}"
-                    if newValue is not None:
-                        record[key] = newValue
+        if resultFormat not in self.linkFormats:
+            return
+        value = record.get(key)
+        if value is not None and isinstance(value, str):
+            newValue = self.formatValue(value, resultFormat)
+            if newValue is not None:
+                record[key] = newValue
 
 
 class QuerySyntaxHighlight:
@@ -172,6 +247,11 @@ class QuerySyntaxHighlight:
             query(Query): the query to do the syntax highlighting for
             highlightFormat(str): the highlight format to be used
         """
+        # pygments is imported on first use to keep the start-up time low
+        from pygments.formatters.html import HtmlFormatter
+        from pygments.formatters.latex import LatexFormatter
+        from pygments.lexers import get_lexer_by_name
+
         self.query = query
         self.highlightFormat = highlightFormat
         self.lexer = get_lexer_by_name(self.query.lang)
@@ -185,6 +265,8 @@ class QuerySyntaxHighlight:
         Returns:
             str: the result of the syntax highlighting with pygments
         """
+        from pygments import highlight
+
         syntaxResult = highlight(self.query.query, self.lexer, self.formatter)
         return syntaxResult
 
@@ -247,6 +329,8 @@ class QueryResultDocumentation:
         for code in range(8320, 8330):
             text = text.replace(chr(code), f"$_{code-8320}$")
         if withConvert:
+            from pylatexenc.latexencode import unicode_to_latex
+
             latex = unicode_to_latex(text)
             # workaround {\textbackslash} being returned
             # latex=latex.replace("{\\textbackslash}",'\\')
@@ -344,24 +428,42 @@ class Query(object):
             tablefmt(str): the table format (according to tabulate) to apply
 
         """
+        for _record in self.iterPreFormatWithCallBacks(lod, tablefmt):
+            pass
+
+    def iterPreFormatWithCallBacks(self, lod: Iterable, tablefmt: str) -> Iterator:
+        """
+        run the configured call backs on the given records one at a time
+
+        Args:
+            lod(Iterable): the records to handle - may be a generator
+            tablefmt(str): the table format (according to tabulate) to apply
+
+        Returns:
+            Iterator: a generator of the pre-formatted records
+        """
         for record in lod:
             for key in record.keys():
                 value = record[key]
                 if value is not None:
                     for formatCallBack in self.formatCallBacks:
                         formatCallBack(record, key, value, tablefmt)
+            yield record
 
-    def formatWithValueFormatters(self, lod, tablefmt: str):
+    def getValueFormatsToApply(self) -> dict:
         """
-        format the given list of Dicts with the ValueFormatters
+        get the ValueFormatters to apply by key to format - "*" is for all keys
+
+        Returns:
+            dict: the ValueFormatters by key
         """
+        formatsToApply = {}
         # is there anything to do?
         if self.formats is None:
             # no
-            return
+            return formatsToApply
         # get the value Formatters that might apply here
         valueFormatters = ValueFormatter.getFormats()
-        formatsToApply = {}
         for valueFormatSpec in self.formats:
             parts = valueFormatSpec.split(":")
             # e.g. president:wikidata
@@ -369,18 +471,87 @@ class Query(object):
             formatName = parts[1]
             if formatName in valueFormatters:
                 formatsToApply[keytoformat] = valueFormatters[formatName]
-        for record in lod:
-            for keytoformat in formatsToApply:
-                valueFormatter = formatsToApply[keytoformat]
-                # format all key values
-                if keytoformat == "*":
-                    for key in record:
-                        valueFormatter.applyFormat(record, key, tablefmt)
-                # or just a selected one
-                elif keytoformat in record:
-                    valueFormatter.applyFormat(record, keytoformat, tablefmt)
+        return formatsToApply
+
+    def formatWithValueFormatters(self, lod, tablefmt: str):
+        """
+        format the given list of Dicts with the ValueFormatters
+        """
+        for _record in self.iterFormatWithValueFormatters(lod, tablefmt):
             pass
 
+    def iterFormatWithValueFormatters(self, lod: Iterable, tablefmt: str) -> Iterator:
+        """
+        format the given records with the ValueFormatters one at a time
+
+        Args:
+            lod(Iterable): the records to format - may be a generator
+            tablefmt(str): the table format (according to tabulate) to apply
+
+        Returns:
+            Iterator: a generator of the formatted records
+        """
+        formatsToApply = self.getValueFormatsToApply()
+        if not formatsToApply or tablefmt not in ValueFormatter.linkFormats:
+            yield from lod
+            return
+        # the (key, valueFormatter) pairs to apply by the keys of the records
+        plans = {}
+        for record in lod:
+            keys = tuple(record.keys())
+            plan = plans.get(keys)
+            if plan is None:
+                plan = []
+                for keytoformat, valueFormatter in formatsToApply.items():
+                    # format all key values
+                    if keytoformat == "*":
+                        for key in keys:
+                            plan.append((key, valueFormatter))
+                    # or just a selected one
+                    elif keytoformat in record:
+                        plan.append((keytoformat, valueFormatter))
+                plans[keys] = plan
+            for key, valueFormatter in plan:
+                value = record[key]
+                if value is not None and isinstance(value, str):
+                    newValue = valueFormatter.formatValue(value, tablefmt)
+                    if newValue is not None:
+                        record[key] = newValue
+            yield record
+
+    def formatRows(self, qlod: Iterable, tablefmt: str, limit: int = None) -> Iterator:
+        """
+        get the formatted rows for the given query result lazily
+
+        the original records are not modified: each record that needs formatting
+        is overlaid by a shallow copy that the call backs and ValueFormatters
+        assign the formatted values to - call backs must therefore not modify
+        nested values in place. If there is nothing to format the original
+        records are returned as is.
+
+        Args:
+            qlod(Iterable): the list of dicts result - may be a generator
+            tablefmt(str): the table format (according to tabulate) to apply
+            limit(int): the maximum number of rows
+
+        Returns:
+            Iterator: a generator of the formatted rows
+        """
+        rows = iter(qlod)
+        if limit is not None:
+            rows = islice(rows, limit)
+        withFormats = (
+            self.getValueFormatsToApply() and tablefmt in ValueFormatter.linkFormats
+        )
+        if not self.formatCallBacks and not withFormats:
+            return rows
+        rows = (dict(record) for record in rows)
+        if self.formatCallBacks:
+            rows = self.iterPreFormatWithCallBacks(rows, tablefmt)
+        if withFormats:
+            rows = self.iterFormatWithValueFormatters(rows, tablefmt)
+        return rows
+
     def getTryItUrl(self, baseurl: str, database: str = "blazegraph"):
         """
         return the "try it!" url for the given baseurl
@@ -449,6 +620,8 @@ class Query(object):
                     record[key] = link
 
     def asYaml(self):
+        import yaml
+
         yamlMarkup = yaml.dump(self)
         return yamlMarkup
 
@@ -490,7 +663,7 @@ class Query(object):
         **kwArgs,
     ):
         """
-        document the given query results - note that a copy of the whole list is going to be created for being able to format
+        document the given query results - the given records are formatted lazily and not modified
 
         Args:
             qlod: the list of dicts result
@@ -507,13 +680,12 @@ class Query(object):
         sourceCodeHeader = ""
         resultHeader = ""
         title = self.title
-        if limit is not None:
-            lod = copy.deepcopy(qlod[:limit])
-        else:
-            lod = copy.deepcopy(qlod)
-        self.preFormatWithCallBacks(lod, tablefmt=tablefmt)
-        self.formatWithValueFormatters(lod, tablefmt=tablefmt)
-        result = tabulate(lod, headers="keys", tablefmt=tablefmt, **kwArgs)
+        rows = self.formatRows(qlod, tablefmt=tablefmt, limit=limit)
+        from lodstorage.table_renderer import TableRenderer
+
+        result = TableRenderer.tabulate(
+            rows, headers="keys", tablefmt=tablefmt, **kwArgs
+        )
         if tryItUrl is None and hasattr(self, "tryItUrl"):
             tryItUrl = self.tryItUrl
         if tablefmt == "github":
@@ -626,14 +798,16 @@ class QueryManager(object):
     def getQueries(queriesPath=None):
         """
         get the queries for the given queries Path
+
+        the YAML files are only parsed once per process (see YamlFileCache)
+        the query dicts returned are copies that may be modified
         """
         queriesPaths = YamlPath.getPaths("queries.yaml", queriesPath)
         queries = {}
         for queriesPath in queriesPaths:
-            with open(queriesPath, "r") as stream:
-                lqueries = yaml.safe_load(stream)
-                for key in lqueries:
-                    queries[key] = lqueries[key]
+            lqueries = YamlFileCache.load(queriesPath)
+            for key in lqueries:
+                queries[key] = dict(lqueries[key])
         return queries
 
 
@@ -654,16 +828,15 @@ class EndpointManager(object):
         endpointPaths = YamlPath.getPaths("endpoints.yaml", endpointPath)
         endpoints = {}
         for lEndpointPath in endpointPaths:
-            with open(lEndpointPath, "r") as stream:
-                endpointRecords = yaml.safe_load(stream)
-                for name, record in endpointRecords.items():
-                    select = True
-                    if lang is not None:
-                        select = record["lang"] == lang
-                    if select:
-                        endpoint = Endpoint()
-                        endpoint.fromDict({"name": name, **record})
-                        endpoints[name] = endpoint
+            endpointRecords = YamlFileCache.load(lEndpointPath)
+            for name, record in endpointRecords.items():
+                select = True
+                if lang is not None:
+                    select = record["lang"] == lang
+                if select:
+                    endpoint = Endpoint()
+                    endpoint.fromDict({"name": name, **record})
+                    endpoints[name] = endpoint
         return endpoints
 
     @staticmethod
@@ -0,0 +1,291 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+import hashlib
+import pickle
+import threading
+import time
+from typing import Callable
+
+from lodstorage.sql import SQLDB
+from lodstorage.storageconfig import StorageConfig
+
+
+class QueryResultCache:
+    """
+    a persistent cache for query results (lists of dicts) stored in a sqlite database
+
+    the entries are content addressed by a hash of the endpoint, the normalized
+    query text and the HTTP method. The list of dicts is stored in pickled form
+    so that the python types (int, float, date, datetime ...) survive the round trip.
+
+    :ivar ttl(float): the default time to live of an entry in seconds
+    :ivar staleTTL(float): the time in seconds after expiry during which a stale entry is still returned while being refreshed in the background
+    :ivar maxEntries(int): the maximum number of entries to keep - the least recently used entries are evicted first
+    :ivar hits(int): the number of fresh cache hits
+    :ivar staleHits(int): the number of stale cache hits
+    :ivar misses(int): the number of cache misses
+    """
+
+    tableName = "querycache"
+
+    def __init__(
+        self,
+        dbname: str = None,
+        ttl: float = 3600,
+        staleTTL: float = 0,
+        maxEntries: int = 10000,
+        debug: bool = False,
+    ):
+        """
+        constructor
+
+        Args:
+            dbname(str): the path of the sqlite database - if None querycache.db in the default cache directory is used
+            ttl(float): the default time to live of an entry in seconds
+            staleTTL(float): the stale-while-revalidate period in seconds
+            maxEntries(int): the maximum number of entries to keep
+            debug(bool): if True show debug information
+        """
+        if dbname is None:
+            cachePath = StorageConfig.getDefault().getCachePath()
+            dbname = f"{cachePath}/querycache.db"
+        self.dbname = dbname
+        self.ttl = ttl
+        self.staleTTL = staleTTL
+        self.maxEntries = maxEntries
+        self.debug = debug
+        self.hits = 0
+        self.staleHits = 0
+        self.misses = 0
+        self.lock = threading.RLock()
+        self.refreshing = set()
+        self.sqlDB = SQLDB(dbname, check_same_thread=False, debug=debug)
+        self.sqlDB.execute(
+            f"""CREATE TABLE IF NOT EXISTS {self.tableName}(
+  key TEXT PRIMARY KEY,
+  endpoint TEXT,
+  method TEXT,
+  query TEXT,
+  created FLOAT,
+  accessed FLOAT,
+  ttl FLOAT,
+  records INTEGER,
+  lod BLOB
+)"""
+        )
+        self.sqlDB.c.commit()
+
+    @staticmethod
+    def normalizeQuery(query: str) -> str:
+        """
+        normalize the given query text by stripping the leading and trailing
+        whitespace of the whole query - the lines are kept as they are since
+        e.g. multi-line literals are whitespace sensitive
+
+        Args:
+            query(str): the query to normalize
+
+        Returns:
+            str: the normalized query
+        """
+        normalized = query.strip()
+        return normalized
+
+    @classmethod
+    def getKey(cls, endpoint: str, query: str, method: str = "POST") -> str:
+        """
+        get the content addressed key for the given endpoint, query and method
+
+        Args:
+            endpoint(str): the endpoint url
+            query(str): the query text
+            method(str): the HTTP method
+
+        Returns:
+            str: the sha256 hex digest identifying the query result
+        """
+        text = f"{endpoint}\n{method}\n{cls.normalizeQuery(query)}"
+        key = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        return key
+
+    def get(self, key: str):
+        """
+        get the cached entry for the given key
+
+        Args:
+            key(str): the key of the entry
+
+        Returns:
+            tuple: (lod, age, ttl) or None if there is no entry for the given key
+        """
+        with self.lock:
+            cursor = self.sqlDB.c.execute(
+                f"SELECT lod,created,ttl FROM {self.tableName} WHERE key=?", (key,)
+            )
+            row = cursor.fetchone()
+            if row is None:
+                return None
+            blob, created, ttl = row
+            now = time.time()
+            self.sqlDB.c.execute(
+                f"UPDATE {self.tableName} SET accessed=? WHERE key=?", (now, key)
+            )
+            self.sqlDB.c.commit()
+        lod = pickle.loads(blob)
+        return lod, now - created, ttl
+
+    def put(
+        self,
+        key: str,
+        lod: list,
+        endpoint: str = None,
+        query: str = None,
+        method: str = None,
+        ttl: float = None,
+    ):
+        """
+        store the given list of dicts for the given key
+
+        Args:
+            key(str): the key of the entry
+            lod(list): the list of dicts to store
+            endpoint(str): the endpoint url
+            query(str): the query text
+            method(str): the HTTP method
+            ttl(float): the time to live in seconds - if None my default ttl is used
+        """
+        if ttl is None:
+            ttl = self.ttl
+        now = time.time()
+        blob = pickle.dumps(lod, protocol=pickle.HIGHEST_PROTOCOL)
+        with self.lock:
+            self.sqlDB.c.execute(
+                f"INSERT OR REPLACE INTO {self.tableName} VALUES (?,?,?,?,?,?,?,?,?)",
+                (key, endpoint, method, query, now, now, ttl, len(lod), blob),
+            )
+            self.sqlDB.c.commit()
+            self.evict()
+
+    def evict(self):
+        """
+        evict the least recently used entries exceeding maxEntries
+        """
+        with self.lock:
+            self.sqlDB.c.execute(
+                f"""DELETE FROM {self.tableName} WHERE key IN (
+  SELECT key FROM {self.tableName} ORDER BY accessed DESC LIMIT -1 OFFSET ?
+)""",
+                (self.maxEntries,),
+            )
+            self.sqlDB.c.commit()
+
+    def clear(self):
+        """
+        remove all entries
+        """
+        with self.lock:
+            self.sqlDB.c.execute(f"DELETE FROM {self.tableName}")
+            self.sqlDB.c.commit()
+
+    def size(self) -> int:
+        """
+        Returns:
+            int: the number of entries
+        """
+        with self.lock:
+            cursor = self.sqlDB.c.execute(f"SELECT COUNT(*) FROM {self.tableName}")
+            return cursor.fetchone()[0]
+
+    def getStats(self) -> dict:
+        """
+        Returns:
+            dict: the hit/miss counters and the number of entries
+        """
+        with self.lock:
+            stats = {
+                "hits": self.hits,
+                "staleHits": self.staleHits,
+                "misses": self.misses,
+                "entries": self.size(),
+            }
+        return stats
+
+    def refresh(self, key: str, queryFunc: Callable, ttl: float = None, **kwArgs):
+        """
+        refresh the entry for the given key in a background thread
+
+        Args:
+            key(str): the key of the entry
+            queryFunc(Callable): the function to call for getting the list of dicts
+            ttl(float): the time to live in seconds
+        """
+        with self.lock:
+            if key in self.refreshing:
+                return
+            self.refreshing.add(key)
+
+        def doRefresh():
+            try:
+                lod = queryFunc()
+                self.put(key, lod, ttl=ttl, **kwArgs)
+            except Exception as ex:
+                if self.debug:
+                    print(f"refresh of {key} failed: {ex}")
+            finally:
+                with self.lock:
+                    self.refreshing.discard(key)
+
+        thread = threading.Thread(target=doRefresh, daemon=True)
+        thread.start()
+
+    def getOrQuery(
+        self,
+        endpoint: str,
+        query: str,
+        queryFunc: Callable,
+        method: str = "POST",
+        ttl: float = None,
+    ) -> list:
+        """
+        get the list of dicts for the given query from the cache or via the given queryFunc
+
+        Args:
+            endpoint(str): the endpoint url
+            query(str): the query text
+            queryFunc(Callable): the function to call for getting the list of dicts on a cache miss
+            method(str): the HTTP method
+            ttl(float): the time to live for this query - if None my default ttl is used
+
+        Returns:
+            list: the list of dicts
+        """
+        key = self.getKey(endpoint, query, method)
+        entry = self.get(key)
+        meta = {"endpoint": endpoint, "query": query, "method": method}
+        if entry is not None:
+            lod, age, entryTTL = entry
+            if ttl is None:
+                ttl = entryTTL
+            if age <= ttl:
+                with self.lock:
+                    self.hits += 1
+                return lod
+            if age <= ttl + self.staleTTL:
+                with self.lock:
+                    self.staleHits += 1
+                self.refresh(key, queryFunc, ttl=ttl, **meta)
+                return lod
+        with self.lock:
+            self.misses += 1
+        lod = queryFunc()
+        self.put(key, lod, ttl=ttl, **meta)
+        return lod
+
+    def close(self):
+        """
+        close my database
+        """
+        self.sqlDB.close()
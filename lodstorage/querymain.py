@@ -13,16 +13,14 @@ __updated__ = Version.updated
 
 DEBUG = 0
 
-import json
 import os
 import re
 import sys
 import traceback
 from argparse import ArgumentParser, RawDescriptionHelpFormatter
 
-import requests
-
 from lodstorage.csv import CSV
+from lodstorage.jsonbackend import JsonBackend
 from lodstorage.query import (
     Endpoint,
     EndpointManager,
@@ -31,9 +29,9 @@ from lodstorage.query import (
     QueryManager,
     ValueFormatter,
 )
-from lodstorage.sparql import SPARQL
 from lodstorage.sql import SQLDB
-from lodstorage.xml import Lod2Xml
+from lodstorage.writers import LoDWriter
+from lodstorage.yamlbackend import YamlFileCache
 
 
 class QueryMain:
@@ -107,7 +105,14 @@ class QueryMain:
                 else:
                     queryCode += f"\nLIMIT {query.limit}"
             if args.language == "sparql":
-                sparql = SPARQL.fromEndpointConf(endpointConf)
+                # the SPARQL dependencies are only imported when needed
+                from lodstorage.query_cache import QueryResultCache
+                from lodstorage.sparql import SPARQL
+
+                cache = None
+                if args.cacheTTL is not None:
+                    cache = QueryResultCache(ttl=args.cacheTTL, debug=debug)
+                sparql = SPARQL.fromEndpointConf(endpointConf, cache=cache)
                 if args.prefixes and endpointConf is not None:
                     queryCode = f"{endpointConf.prefixes}\n{queryCode}"
                 if args.raw:
@@ -121,31 +126,84 @@ class QueryMain:
                     return
                 if "wikidata" in args.endpointName and formats is None:
                     formats = ["*:wikidata"]
-                qlod = sparql.queryAsListOfDicts(queryCode)
+                if args.pageSize:
+                    qlod = sparql.queryGen(
+                        queryCode,
+                        pageSize=args.pageSize,
+                        keyVar=args.keyVar,
+                        maxWorkers=args.pageWorkers,
+                    )
+                else:
+                    qlod = sparql.queryAsListOfDicts(queryCode)
+                if cache is not None and debug:
+                    print(f"query cache {cache.getStats()}")
             elif args.language == "sql":
                 sqlDB = SQLDB(endpointConf.endpoint)
-                qlod = sqlDB.query(queryCode)
+                qlod = sqlDB.queryGen(queryCode)
             else:
                 raise Exception(f"language {args.language} not known/supported")
-            if args.format is Format.csv:
-                csv = CSV.toCSV(qlod)
-                print(csv)
-            elif args.format in [Format.latex, Format.github, Format.mediawiki]:
-                doc = query.documentQueryResult(
-                    qlod, tablefmt=str(args.format), floatfmt=".0f"
-                )
-                docstr = doc.asText()
-                print(docstr)
-            elif args.format in [Format.json] or args.format is None:  # set as default
-                # https://stackoverflow.com/a/36142844/1497139
-                print(json.dumps(qlod, indent=2, sort_keys=True, default=str))
-            elif args.format in [Format.xml]:
-                lod2xml = Lod2Xml(qlod)
-                xml = lod2xml.asXml()
-                print(xml)
+            output = sys.stdout
+            if args.outputFile:
+                # newline="" keeps the CSV line terminators as written
+                output = open(args.outputFile, "w", encoding="utf-8", newline="")
+            try:
+                cls.showResult(args, query, qlod, output)
+            finally:
+                if output is not sys.stdout:
+                    output.close()
 
-            else:
-                raise Exception(f"format {args.format} not supported yet")
+    @classmethod
+    def showResult(cls, args, query: Query, qlod, output):
+        """
+        show the given query result in the format given by the command line arguments
+
+        Args:
+            args(Namespace): the command line arguments
+            query(Query): the query
+            qlod(Iterable): the list of dicts or generator of dicts of the query result
+            output(TextIO): the stream to write to
+        """
+        resultFormat = Format.json if args.format is None else args.format  # default
+        if resultFormat is Format.jsonl or (
+            args.stream and resultFormat is not Format.latex
+        ):
+            if resultFormat in [Format.github, Format.mediawiki]:
+                # the value formatters are applied record by record
+                qlod = query.formatRows(qlod, tablefmt=str(resultFormat))
+            writer = LoDWriter.getWriter(str(resultFormat), output)
+            writer.write(qlod)
+            return
+        qlod = list(qlod)
+        if resultFormat in [Format.csv, Format.tsv]:
+            delimiter = "\t" if resultFormat is Format.tsv else ","
+            csv = CSV.toCSV(qlod, delimiter=delimiter)
+            print(csv, file=output)
+        elif resultFormat in [Format.latex, Format.github, Format.mediawiki]:
+            doc = query.documentQueryResult(
+                qlod, tablefmt=str(resultFormat), floatfmt=".0f"
+            )
+            docstr = doc.asText()
+            print(docstr, file=output)
+        elif resultFormat in [Format.json]:
+            # https://stackoverflow.com/a/36142844/1497139
+            print(
+                JsonBackend.dumps(
+                    qlod,
+                    indent=2,
+                    sort_keys=True,
+                    default=str,
+                    nativeDatetime=False,
+                ),
+                file=output,
+            )
+        elif resultFormat in [Format.xml]:
+            from lodstorage.xml import Lod2Xml
+
+            lod2xml = Lod2Xml(qlod)
+            xml = lod2xml.asXml()
+            print(xml, file=output)
+        else:
+            raise Exception(f"format {resultFormat} not supported yet")
 
     @staticmethod
     def rawQuery(endpointConf, query, resultFormat, mimeType):
@@ -169,7 +227,10 @@ class QueryMain:
             headers = {}
         endpoint = endpointConf.endpoint
         method = endpointConf.method
-        response = requests.request(
+        from lodstorage.sparql import SPARQL
+
+        session = SPARQL.getSession(endpoint)
+        response = session.request(
             method, endpoint, headers=headers, data=payload, params=params
         )
         return response.text
@@ -251,6 +312,37 @@ USAGE
             default=ValueFormatter.formatsPath,
             help="path to yaml file to configure formats to use for querie result documentation",
         )
+        parser.add_argument(
+            "--yamlCache",
+            action="store_true",
+            help="keep the parsed query, endpoint and format YAML files in a disk cache to avoid parsing them on every start-up [default: %(default)s]",
+        )
+        parser.add_argument(
+            "-ct",
+            "--cacheTTL",
+            type=float,
+            default=None,
+            help="cache SPARQL query results locally for the given number of seconds [default: %(default)s]",
+        )
+        parser.add_argument(
+            "-ps",
+            "--pageSize",
+            type=int,
+            default=None,
+            help="fetch SPARQL query results in pages of the given size - the query needs an ORDER BY unless --keyVar is used [default: %(default)s]",
+        )
+        parser.add_argument(
+            "--keyVar",
+            default=None,
+            help="unique variable to use for keyset pagination instead of LIMIT/OFFSET [default: %(default)s]",
+        )
+        parser.add_argument(
+            "-pw",
+            "--pageWorkers",
+            type=int,
+            default=1,
+            help="number of pages to fetch concurrently [default: %(default)s]",
+        )
         parser.add_argument(
             "-en",
             "--endpointName",
@@ -259,6 +351,17 @@ USAGE
         )
         parser.add_argument("--method", help="method to be used for SPARQL queries")
         parser.add_argument("-f", "--format", type=Format, choices=list(Format))
+        parser.add_argument(
+            "-o",
+            "--outputFile",
+            default=None,
+            help="write the query result to the given file instead of stdout",
+        )
+        parser.add_argument(
+            "--stream",
+            action="store_true",
+            help="write the query result record by record while it is retrieved - tables are not padded and have no title and query source [default: %(default)s]",
+        )
         parser.add_argument(
             "-li",
             "--list",
@@ -307,6 +410,8 @@ USAGE
         args = parser.parse_args(argv)
         if lang is not None:
             args.language = lang
+        if args.yamlCache:
+            YamlFileCache.enableDiskCache()
         QueryMain.main(args)
 
     except KeyboardInterrupt:
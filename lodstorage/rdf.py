@@ -3,21 +3,29 @@ Created on 2024-01-27
 
 @author: wf, using ChatGPT-4 prompting
 """
+import math
 from collections.abc import Iterable, Mapping
-from dataclasses import fields
-from typing import Any
+from typing import Any, List, TextIO, Tuple
 
 from rdflib import BNode, Graph, Literal, Namespace, URIRef
 from rdflib.namespace import RDF
 
+from lodstorage.dataclass_codec import DataclassCodec
 from lodstorage.linkml_gen import PythonTypes, Schema
 
 
 class RDFDumper:
     """
     A class to convert instances of data models (based on a LinkML schema) into an RDF graph.
+
+    convert_to_rdf/serialize build an in-memory rdflib Graph which is
+    convenient for small outputs. For large instance trees use write which
+    streams N-Triples or Turtle to a file handle without building a Graph.
     """
 
+    # escapes for string literals in N-Triples and Turtle
+    escapes = str.maketrans({"\\": "\\\\", '"': '\\"', "\n": "\\n", "\r": "\\r"})
+
     def __init__(self, schema: Schema, instance: object):
         """
         Initialize the RDFDumper.
@@ -32,6 +40,10 @@ class RDFDumper:
         self.namespaces = {
             prefix: Namespace(uri) for prefix, uri in schema.prefixes.items()
         }
+        # Get the base namespace URI
+        self.base_uri = self.namespaces[self.schema.default_prefix]
+        # the class IRI and the slots of each dataclass
+        self.class_plans = {}
 
     def convert_to_rdf(self):
         """
@@ -71,13 +83,42 @@ class RDFDumper:
         else:
             yield (None, value)
 
+    def get_class_plan(
+        self, clazz: type
+    ) -> Tuple[URIRef, List[Tuple[str, Any, URIRef]]]:
+        """
+        get the class IRI and the (slot name, slot, field IRI) plan of
+        the fields of the given dataclass that are defined in the schema
+
+        the plan is computed once per class from the fields of the
+        shared DataclassCodec
+
+        Args:
+            clazz(type): the dataclass
+
+        Returns:
+            Tuple[URIRef, List[Tuple[str, Any, URIRef]]]: the class IRI and the slot plan
+        """
+        plan = self.class_plans.get(clazz)
+        if plan is None:
+            # Construct class_uri using the namespace and class_name with a separator
+            class_uri = URIRef(f"{self.base_uri}:{clazz.__name__}")
+            slot_plan = []
+            for field_info in DataclassCodec.forClass(clazz).fields:
+                slot_name = field_info.name
+                # assure we only work on fields defined
+                # in our schema
+                slot_obj = self.schema.slots.get(slot_name)
+                if slot_obj:
+                    # Combine the namespace with the slot name to form the field URI
+                    field_uri = URIRef(f"{self.base_uri}:{slot_name}")
+                    slot_plan.append((slot_name, slot_obj, field_uri))
+            plan = (class_uri, slot_plan)
+            self.class_plans[clazz] = plan
+        return plan
+
     def process_class(self, class_name: str, instance_data: object):
-        # Get the base namespace URI
-        self.base_uri = self.namespaces[self.schema.default_prefix]
-        # get the class object
-        # class_obj = self.schema.classes[class_name]
-        # Construct class_uri using the namespace and class_name with a separator
-        class_uri = URIRef(f"{self.base_uri}:{class_name}")
+        class_uri, slot_plan = self.get_class_plan(instance_data.__class__)
 
         # Create a unique URI or a Blank Node for the instance
         instance_uri = self.get_instance_uri(instance_data)
@@ -85,24 +126,15 @@ class RDFDumper:
         # Type the instance with its class
         self.graph.add((instance_uri, RDF.type, class_uri))
 
-        # loop over all fieds of the instance data
-        for field_info in fields(instance_data):
-            slot_name = field_info.name
-            # assure we only work on fields defined
-            # in our schema
-            slot_obj = self.schema.slots.get(slot_name)
-            if not slot_obj:
-                continue
-
-            # Combine the namespace with the slot name to form the field URI
-            field_uri = URIRef(f"{self.base_uri}:{slot_name}")
+        # loop over all slots of the instance data
+        for slot_name, slot_obj, field_uri in slot_plan:
             field_value = getattr(instance_data, slot_name, None)
 
             # Use value_iterator to handle different types of values
             for key, item in self.value_iterator(field_value):
                 if key is not None:
                     # Handle as a mapping
-                    key_uri = URIRef(self.namespaces[self.schema.default_prefix][key])
+                    key_uri = URIRef(self.base_uri[key])
                     self.graph.add((instance_uri, field_uri, key_uri))
                     self.graph.add(
                         (key_uri, RDF.value, self.convert_to_literal(item, slot_obj))
@@ -153,3 +185,123 @@ class RDFDumper:
 
         # Create and return the literal
         return Literal(value, datatype=datatype)
+
+    def to_n3_literal(self, value) -> str:
+        """
+        get the N-Triples/Turtle form of the literal for the given value
+
+        the lexical form and datatype are the same as the ones of convert_to_literal
+
+        Args:
+            value: the value to be converted
+
+        Returns:
+            str: the quoted literal with its datatype
+        """
+        value_type = type(value)
+        if value_type is str:
+            lexical = value.translate(self.escapes)
+        elif value_type is bool:
+            lexical = "true" if value else "false"
+        elif value_type is int or (value_type is float and math.isfinite(value)):
+            lexical = repr(value)
+        else:
+            literal = self.convert_to_literal(value, None)
+            lexical = str(literal).translate(self.escapes)
+            if literal.language:
+                return f'"{lexical}"@{literal.language}'
+            if literal.datatype is None:
+                return f'"{lexical}"'
+            return f'"{lexical}"^^<{literal.datatype}>'
+        return f'"{lexical}"^^<{PythonTypes.to_rdf_datatypes[value_type]}>'
+
+    def write(
+        self,
+        stream: TextIO,
+        rdf_format: str = "nt",
+        instances: Iterable[object] = None,
+    ) -> int:
+        """
+        stream the triples of my instance - or the given instances - to the
+        given file handle without building an rdflib Graph
+
+        the triples are the same as the ones of convert_to_rdf. Only the
+        instances still to be written are kept in memory.
+
+        Args:
+            stream(TextIO): the file handle to write to
+            rdf_format(str): "nt" for N-Triples or "turtle"
+            instances(Iterable[object]): the instances to write - if None my instance is written
+
+        Returns:
+            int: the number of triples written
+        """
+        if rdf_format in ("nt", "ntriples", "n-triples"):
+            turtle = False
+        elif rdf_format in ("turtle", "ttl"):
+            turtle = True
+        else:
+            raise ValueError(f"unsupported streaming rdf format {rdf_format}")
+        if instances is None:
+            instance_class = self.instance.__class__.__name__
+            instances = [self.instance] if instance_class in self.schema.classes else []
+        rdf_type = "a" if turtle else f"<{RDF.type}>"
+        rdf_value = f"<{RDF.value}>"
+        base_uri = str(self.base_uri)
+        literal_types = (str, int, float, bool, type(None))
+        to_n3_literal = self.to_n3_literal
+        value_iterator = self.value_iterator
+        write = stream.write
+        if turtle:
+            for prefix, namespace in self.namespaces.items():
+                write(f"@prefix {prefix}: <{namespace}> .\n")
+            write("\n")
+        bnode_count = 0
+        triple_count = 0
+        for instance in instances:
+            pending = [instance]
+            while pending:
+                instance_data = pending.pop()
+                class_uri, slot_plan = self.get_class_plan(instance_data.__class__)
+                identifier = getattr(instance_data, "identifier", None)
+                if identifier:
+                    subject = f"<{base_uri}:{identifier}>"
+                else:
+                    bnode_count += 1
+                    subject = f"_:b{bnode_count}"
+                # the predicate/object pairs of the subject
+                pairs = [(rdf_type, f"<{class_uri}>")]
+                # the (key IRI, literal) pairs of mapping values
+                values = []
+                nested = []
+                for slot_name, _slot_obj, field_uri in slot_plan:
+                    predicate = f"<{field_uri}>"
+                    field_value = getattr(instance_data, slot_name, None)
+                    if type(field_value) in literal_types:
+                        pairs.append((predicate, to_n3_literal(field_value)))
+                        continue
+                    for key, item in value_iterator(field_value):
+                        if key is not None:
+                            key_iri = f"<{base_uri}{key}>"
+                            pairs.append((predicate, key_iri))
+                            values.append((key_iri, to_n3_literal(item)))
+                        elif type(item) not in literal_types and getattr(
+                            item, "identifier", None
+                        ):
+                            pairs.append((predicate, f"<{base_uri}:{item.identifier}>"))
+                            nested.append(item)
+                        else:
+                            pairs.append((predicate, to_n3_literal(item)))
+                if turtle:
+                    po_list = " ;\n    ".join(f"{p} {o}" for p, o in pairs)
+                    write(f"{subject} {po_list} .\n\n")
+                    for key_iri, literal in values:
+                        write(f"{key_iri} {rdf_value} {literal} .\n\n")
+                else:
+                    write("".join(f"{subject} {p} {o} .\n" for p, o in pairs))
+                    for key_iri, literal in values:
+                        write(f"{key_iri} {rdf_value} {literal} .\n")
+                triple_count += len(pairs) + len(values)
+                # keep the document order of the nested instances
+                pending.extend(reversed(nested))
+        return triple_count
@@ -0,0 +1,254 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional
+
+from lodstorage.sparql_pager import SPARQLPager
+from lodstorage.sync import ChangeSet, Sync, SyncPair
+
+
+class SPARQLKeyProbe:
+    """
+    checks which of the given keys exist at a SPARQL endpoint
+
+    the keys are probed in batches with VALUES clause queries via
+    SPARQL.queryAsListOfDicts - so the query result cache of the SPARQL
+    instance (if any) is used - and only the existing keys are transferred.
+    The result of each key is remembered so that a key is probed only once.
+
+    :ivar queries(int): the number of SPARQL queries that have been run
+    """
+
+    def __init__(
+        self,
+        sparql,
+        pattern: str,
+        key_var: str = "key",
+        prefix: str = None,
+        chunk_size: int = 200,
+        max_workers: int = 4,
+        debug: bool = False,
+    ):
+        """
+        constructor
+
+        Args:
+            sparql(SPARQL): the SPARQL endpoint to probe - queries are only run concurrently if it is pooled
+            pattern(str): the graph pattern that matches for existing keys e.g. "?key wdt:P31 wd:Q5." or "?item wdt:P496 ?key." - the wd: and wdt: prefixes are declared
+            key_var(str): the variable of the keys in the pattern
+            prefix(str): if set the keys are IRIs with the given prefix e.g. "http://www.wikidata.org/entity/" for Q-ids - otherwise the keys are literals
+            chunk_size(int): the maximum number of keys per query
+            max_workers(int): the maximum number of concurrent queries
+            debug(bool): if True show the queries
+        """
+        self.sparql = sparql
+        self.pattern = pattern
+        self.key_var = key_var
+        self.prefix = prefix
+        self.chunk_size = chunk_size
+        self.max_workers = max_workers
+        self.debug = debug
+        self.queries = 0
+        # known existence by key
+        self.known = {}
+
+    def get_term(self, key) -> str:
+        """
+        get the SPARQL term for the given key
+        """
+        if self.prefix is not None:
+            return f"<{self.prefix}{key}>"
+        return SPARQLPager.asTerm(key)
+
+    def get_query(self, terms: List[str]) -> str:
+        """
+        get the probe query for the given terms
+
+        Args:
+            terms(List[str]): the SPARQL terms of the keys
+
+        Returns:
+            str: the SELECT query for the existing keys
+        """
+        values_clause = "".join(f"    {term}\n" for term in terms)
+        query = f"""# probe the existence of {len(terms)} keys
+PREFIX wd: <http://www.wikidata.org/entity/>
+PREFIX wdt: <http://www.wikidata.org/prop/direct/>
+SELECT DISTINCT ?{self.key_var} WHERE {{
+  VALUES ?{self.key_var} {{
+{values_clause}  }}
+  {self.pattern}
+}}"""
+        return query
+
+    def probe_chunk(self, chunk: List[Any]) -> set:
+        """
+        probe the given keys with a single query
+
+        Args:
+            chunk(List[Any]): the keys to probe
+
+        Returns:
+            set: the keys that exist
+        """
+        key_by_term = {self.get_term(key): key for key in chunk}
+        query = self.get_query(list(key_by_term.keys()))
+        if self.debug:
+            print(query)
+        existing = set()
+        for row in self.sparql.queryAsListOfDicts(query):
+            value = row.get(self.key_var)
+            if self.prefix is not None:
+                term = f"<{value}>"
+            else:
+                term = SPARQLPager.asTerm(value)
+            key = key_by_term.get(term)
+            if key is not None:
+                existing.add(key)
+        return existing
+
+    def probe(self, keys: Iterable) -> set:
+        """
+        check which of the given keys exist
+
+        Args:
+            keys(Iterable): the keys to check
+
+        Returns:
+            set: the keys that exist at the endpoint
+        """
+        keys = list(dict.fromkeys(keys))
+        missing = [key for key in keys if key not in self.known]
+        chunks = [
+            missing[index : index + self.chunk_size]
+            for index in range(0, len(missing), self.chunk_size)
+        ]
+        # the SPARQLWrapper of an unpooled SPARQL instance can't be shared by threads
+        pooled = self.sparql.session is not None
+        max_workers = min(self.max_workers, len(chunks))
+        if max_workers > 1 and pooled:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                results = list(executor.map(self.probe_chunk, chunks))
+        else:
+            results = [self.probe_chunk(chunk) for chunk in chunks]
+        self.queries += len(chunks)
+        for chunk, existing in zip(chunks, results):
+            for key in chunk:
+                self.known[key] = key in existing
+        existing = {key for key in keys if self.known[key]}
+        return existing
+
+
+class RemoteSync(Sync):
+    """
+    synchronization of local records against a remote SPARQL endpoint
+    that only probes the existence of the local keys instead of
+    downloading the remote records
+
+    the ↔ and → partitions are complete - the ← partition stays empty
+    since keys that only exist remotely are never transferred. The remote
+    records are not available so only the inserts of the → change set can
+    be derived.
+    """
+
+    def __init__(
+        self,
+        title: str,
+        l_name: str,
+        r_name: str,
+        l_data: List[Dict[str, Any]],
+        l_key: str,
+        probe: SPARQLKeyProbe,
+        l_pkey: Optional[str] = None,
+        field_map: Optional[Dict[str, str]] = None,
+    ):
+        """
+        constructor
+
+        Args:
+            title(str): the title of the synchronization
+            l_name(str): the name of the local side
+            r_name(str): the name of the remote side
+            l_data(List[Dict[str, Any]]): the local records
+            l_key(str): the sync key field of the local records
+            probe(SPARQLKeyProbe): the probe for the remote keys
+            l_pkey(str): the primary key field of the local records
+            field_map(Dict[str, str]): maps the local fields to the remote fields of the inserts - if None only the key is mapped
+        """
+        pair = SyncPair(
+            title=title,
+            l_name=l_name,
+            r_name=r_name,
+            l_data=l_data,
+            r_data=[],
+            l_key=l_key,
+            r_key=probe.key_var,
+            l_pkey=l_pkey,
+            field_map=field_map,
+        )
+        self.probe = probe
+        super().__init__(pair)
+
+    def _create_sync_dict(self) -> dict:
+        """
+        Create the synchronization state by probing the left keys at the remote endpoint.
+        """
+        l_keys = set(self.pair.l_by_key.keys())
+        existing = self.probe.probe(self.pair.l_by_key.keys())
+        sync_dict = {
+            "←": set(),
+            "↔": existing,
+            "→": l_keys - existing,
+        }
+        return sync_dict
+
+    def get_record_by_pkey(self, side: str, pkey: str) -> Optional[Dict[str, Any]]:
+        if self.get_side(side) == "right":
+            self.handle_records_error("get_record_by_pkey")
+        return super().get_record_by_pkey(side, pkey)
+
+    def get_record_by_key(self, side: str, key: str) -> dict:
+        if self.get_side(side) == "right":
+            self.handle_records_error("get_record_by_key")
+        return super().get_record_by_key(side, key)
+
+    def get_hashes(self, side: str) -> Dict[Any, int]:
+        if self.get_side(side) == "right":
+            self.handle_records_error("get_hashes")
+        return super().get_hashes(side)
+
+    def get_diff_keys(self) -> set:
+        self.handle_records_error("get_diff_keys")
+
+    def get_field_diff(self, key: Any) -> Dict[str, Any]:
+        self.handle_records_error("get_field_diff")
+
+    def get_change_set(
+        self, direction: str, with_update: bool = False, with_delete: bool = False
+    ) -> ChangeSet:
+        """
+        get the inserts of the local records whose keys do not exist remotely
+
+        Args:
+            direction (str): "→" - the remote side can not be the source
+            with_update (bool): updates need the remote records - must be False
+            with_delete (bool): deletes need the remote keys - must be False
+
+        Returns:
+            ChangeSet: the inserts in terms of the remote fields
+        """
+        if direction not in ("←", "→"):
+            self.handle_direction_error(direction)
+        if direction != "→" or with_update or with_delete:
+            self.handle_records_error(
+                f"get_change_set('{direction}', with_update={with_update}, with_delete={with_delete})"
+            )
+        change_set = super().get_change_set(direction, with_update=False)
+        missing = self.sync_dict["→"]
+        change_set.changes = [
+            change for change in change_set.changes if change.key in missing
+        ]
+        return change_set
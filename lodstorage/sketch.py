@@ -0,0 +1,301 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+import base64
+import hashlib
+import math
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Tuple
+
+from lodstorage.sync import KeySync, Sync, SyncPair
+
+
+class HyperLogLog:
+    """
+    HyperLogLog sketch for estimating the number of distinct keys
+
+    see Flajolet et al. "HyperLogLog: the analysis of a near-optimal
+    cardinality estimation algorithm" (2007)
+
+    the keys are hashed with a stable 64 bit hash of their repr so that
+    sketches can be stored, loaded and merged across processes. A sketch
+    with precision p has 2^p one byte registers and a standard error
+    of 1.04/sqrt(2^p) e.g. 0.81% for the default precision 14 with 16 KB.
+    """
+
+    def __init__(self, precision: int = 14, registers: bytes = None):
+        """
+        constructor
+
+        Args:
+            precision(int): the number of hash bits used to select a register - 4 to 18
+            registers(bytes): the registers of a stored sketch - if None the sketch is empty
+        """
+        if not 4 <= precision <= 18:
+            raise ValueError(f"invalid precision {precision} - use 4 to 18")
+        self.precision = precision
+        self.m = 1 << precision
+        if registers is None:
+            self.registers = bytearray(self.m)
+        else:
+            if len(registers) != self.m:
+                raise ValueError(
+                    f"{len(registers)} registers do not match precision {precision}"
+                )
+            self.registers = bytearray(registers)
+
+    @classmethod
+    def of(cls, keys: Iterable, precision: int = 14) -> "HyperLogLog":
+        """
+        create a sketch of the given keys
+
+        Args:
+            keys(Iterable): the keys
+            precision(int): the precision of the sketch
+
+        Returns:
+            HyperLogLog: the sketch
+        """
+        sketch = cls(precision)
+        sketch.update(keys)
+        return sketch
+
+    @staticmethod
+    def hash_key(key: Any) -> int:
+        """
+        get the stable 64 bit hash of the given key
+        """
+        digest = hashlib.blake2b(repr(key).encode(), digest_size=8).digest()
+        return int.from_bytes(digest, "big")
+
+    def add(self, key: Any):
+        """
+        add the given key
+        """
+        self.update((key,))
+
+    def update(self, keys: Iterable):
+        """
+        add the given keys
+
+        Args:
+            keys(Iterable): the keys to add
+        """
+        registers = self.registers
+        q = 64 - self.precision
+        mask = (1 << q) - 1
+        blake2b = hashlib.blake2b
+        from_bytes = int.from_bytes
+        for key in keys:
+            h = from_bytes(blake2b(repr(key).encode(), digest_size=8).digest(), "big")
+            index = h >> q
+            # the position of the leftmost 1 bit of the remaining q bits
+            rank = q - (h & mask).bit_length() + 1
+            if rank > registers[index]:
+                registers[index] = rank
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        """
+        get the sketch of the union of my keys and the keys of the other sketch
+
+        Args:
+            other(HyperLogLog): the sketch to merge with - must have the same precision
+
+        Returns:
+            HyperLogLog: the merged sketch
+        """
+        if other.precision != self.precision:
+            raise ValueError(
+                f"can't merge sketches with precision {self.precision} and {other.precision}"
+            )
+        registers = bytes(map(max, self.registers, other.registers))
+        return HyperLogLog(self.precision, registers)
+
+    @property
+    def standard_error(self) -> float:
+        """
+        the relative standard error of my estimates
+        """
+        return 1.04 / math.sqrt(self.m)
+
+    def count(self) -> float:
+        """
+        estimate the number of distinct keys
+
+        Returns:
+            float: the estimated number of distinct keys
+        """
+        m = self.m
+        histogram = Counter(self.registers)
+        harmonic = sum(count * 2.0**-rank for rank, count in histogram.items())
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / harmonic
+        zeros = histogram.get(0, 0)
+        if estimate <= 2.5 * m and zeros > 0:
+            # linear counting for small cardinalities
+            estimate = m * math.log(m / zeros)
+        return estimate
+
+    def __len__(self) -> int:
+        return round(self.count())
+
+    def __eq__(self, other) -> bool:
+        return (
+            isinstance(other, HyperLogLog)
+            and self.precision == other.precision
+            and self.registers == other.registers
+        )
+
+    def to_bytes(self) -> bytes:
+        """
+        serialize me to bytes - the precision followed by the registers
+        """
+        return bytes([self.precision]) + bytes(self.registers)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "HyperLogLog":
+        """
+        deserialize a sketch from the given bytes
+        """
+        return cls(data[0], data[1:])
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        get a JSON or YAML compatible dict of me
+        """
+        registers = base64.b64encode(bytes(self.registers)).decode("ascii")
+        return {"precision": self.precision, "registers": registers}
+
+    @classmethod
+    def from_dict(cls, record: Dict[str, Any]) -> "HyperLogLog":
+        """
+        create a sketch from the given dict
+        """
+        return cls(record["precision"], base64.b64decode(record["registers"]))
+
+    def store(self, path: str):
+        """
+        store me to the given file
+        """
+        with open(path, "wb") as sketchFile:
+            sketchFile.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path: str) -> "HyperLogLog":
+        """
+        load a sketch from the given file
+        """
+        with open(path, "rb") as sketchFile:
+            return cls.from_bytes(sketchFile.read())
+
+
+class SketchSync(KeySync):
+    """
+    approximate synchronization statistics from the HyperLogLog sketches of the keys of both sides
+
+    the sizes of the partitions are estimated by inclusion-exclusion:
+    → = |L ∪ R| - |R|, ← = |L ∪ R| - |L| and ↔ = |L| + |R| - |L ∪ R|.
+    The estimates are available in milliseconds for any number of keys but
+    the keys themselves are not - the key and record level methods raise
+    a NotImplementedError - use Sync for exact results.
+    """
+
+    def __init__(
+        self,
+        title: str,
+        l_name: str,
+        r_name: str,
+        l_sketch: HyperLogLog,
+        r_sketch: HyperLogLog,
+    ):
+        """
+        constructor
+
+        Args:
+            title(str): the title of the synchronization
+            l_name(str): the name of the left side
+            r_name(str): the name of the right side
+            l_sketch(HyperLogLog): the sketch of the keys of the left side
+            r_sketch(HyperLogLog): the sketch of the keys of the right side
+        """
+        pair = SyncPair(title, l_name, r_name, [], [], "key", "key")
+        super().__init__(pair)
+        self.l_sketch = l_sketch
+        self.r_sketch = r_sketch
+
+    @classmethod
+    def of_sync(cls, sync: Sync, precision: int = 14) -> "SketchSync":
+        """
+        get the approximate synchronization for the keys of the given exact synchronization
+        """
+        l_sketch = HyperLogLog.of(sync.pair.l_by_key.keys(), precision)
+        r_sketch = HyperLogLog.of(sync.pair.r_by_key.keys(), precision)
+        sketch_sync = cls(
+            sync.pair.title, sync.pair.l_name, sync.pair.r_name, l_sketch, r_sketch
+        )
+        return sketch_sync
+
+    def handle_keys_error(self, method_name: str):
+        keys_msg = f"{method_name} needs the keys which are not available in {self.__class__.__name__}"
+        raise NotImplementedError(keys_msg)
+
+    def get_keys(self, direction: str) -> set:
+        self.handle_keys_error("get_keys")
+
+    def get_diff_keys(self) -> set:
+        self.handle_keys_error("get_diff_keys")
+
+    def resync(self, side: str, data: List[Dict[str, Any]]):
+        self.handle_keys_error("resync")
+
+    def get_estimates(self) -> Dict[str, Tuple[float, float]]:
+        """
+        get the estimated number of keys and its standard error for each direction of synchronization
+
+        the errors of the three sketch estimates are combined as if they were independent
+
+        Returns:
+            Dict[str, Tuple[float, float]]: the estimate and the standard error by direction
+        """
+        l_count = self.l_sketch.count()
+        r_count = self.r_sketch.count()
+        union_count = self.l_sketch.merge(self.r_sketch).count()
+        se = self.l_sketch.standard_error
+        estimates = {
+            "←": (
+                max(union_count - l_count, 0.0),
+                se * math.hypot(union_count, l_count),
+            ),
+            "↔": (
+                max(l_count + r_count - union_count, 0.0),
+                se * math.sqrt(l_count**2 + r_count**2 + union_count**2),
+            ),
+            "→": (
+                max(union_count - r_count, 0.0),
+                se * math.hypot(union_count, r_count),
+            ),
+        }
+        return estimates
+
+    def get_counts(self) -> Dict[str, int]:
+        """
+        get the estimated number of keys for each direction of synchronization
+        """
+        counts = {
+            direction: round(estimate)
+            for direction, (estimate, _error) in self.get_estimates().items()
+        }
+        return counts
+
+    def get_status_rows(self) -> List[Dict[str, Any]]:
+        """
+        get the rows of the synchronization status table with the standard errors of the estimates
+        """
+        estimates = self.get_estimates()
+        table_data = super().get_status_rows()
+        for row in table_data:
+            _estimate, error = estimates[row["↔"]]
+            row["±"] = round(error)
+        return table_data
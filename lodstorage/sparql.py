@@ -4,12 +4,18 @@ Created on 2020-08-14
 @author: wf
 """
 import datetime
+import re
+import threading
 import time
 from sys import stderr
 from typing import Union
 
+import requests
+from requests.adapters import HTTPAdapter
+from requests.auth import HTTPBasicAuth, HTTPDigestAuth
 from SPARQLWrapper import SPARQLWrapper2
-from SPARQLWrapper.Wrapper import BASIC, DIGEST, POST, POSTDIRECTLY
+from SPARQLWrapper.SmartWrapper import Value
+from SPARQLWrapper.Wrapper import BASIC, DIGEST, POST, POSTDIRECTLY, SELECT
 
 from lodstorage.lod import LOD
 
@@ -25,8 +31,23 @@ class SPARQL(object):
     :ivar profile(boolean): True if profiling / timing information should be displayed
     :ivar sparql: the SPARQLWrapper2 instance to be used
     :ivar method(str): the HTTP method to be used 'POST' or 'GET'
+    :ivar session(requests.Session): the pooled keep-alive HTTP session for SELECT queries (if any)
+    :ivar cache(QueryResultCache): the query result cache to use (if any)
     """
 
+    # the keyword of the query form following the optional comments and prologue
+    queryTypeRegex = re.compile(
+        r"^(?:\s|#[^\n]*|BASE\s*<[^>]*>|PREFIX\s+[^:\s]*:\s*<[^>]*>)*([A-Za-z]+)",
+        re.IGNORECASE,
+    )
+    # pooled keep-alive HTTP sessions by endpoint url
+    sessions = {}
+    sessionsLock = threading.Lock()
+    # maximum number of connections to keep alive per endpoint
+    poolSize = 10
+    # maximum number of endpoints to keep sessions for - the oldest session is closed first
+    maxSessions = 32
+
     def __init__(
         self,
         url,
@@ -37,6 +58,8 @@ class SPARQL(object):
         profile=False,
         agent="PyLodStorage",
         method="POST",
+        pooled: bool = False,
+        cache=None,
     ):
         """
         Constructor a SPARQL wrapper
@@ -49,6 +72,8 @@ class SPARQL(object):
             profile(boolean): True if profiling / timing information should be displayed
             agent(string): the User agent to use
             method(string): the HTTP method to be used 'POST' or 'GET'
+            pooled(bool): if True run SELECT queries via a keep-alive HTTP session shared by all pooled instances for the same endpoint
+            cache(QueryResultCache): the query result cache to use for queryAsListOfDicts (if any)
         """
         if isFuseki:
             self.url = f"{url}/{mode}"
@@ -61,16 +86,73 @@ class SPARQL(object):
         self.sparql = SPARQLWrapper2(url)
         self.method = method
         self.sparql.agent = agent
+        self.auth = None
+        self.session = SPARQL.getSession(url) if pooled else None
+        self.cache = cache
+
+    @classmethod
+    def getSession(cls, url: str) -> requests.Session:
+        """
+        get the pooled keep-alive HTTP session for the given endpoint url
+
+        Args:
+            url(str): the url of the endpoint
+
+        Returns:
+            requests.Session: the session shared by all pooled SPARQL instances for this url
+        """
+        with cls.sessionsLock:
+            session = cls.sessions.get(url)
+            if session is None:
+                session = requests.Session()
+                # gzip/deflate (and br if available) response compression
+                # is negotiated by requests/urllib3 automatically
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=cls.poolSize)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                while len(cls.sessions) >= cls.maxSessions:
+                    # a closed session reconnects if it is still used
+                    cls.sessions.pop(next(iter(cls.sessions))).close()
+                cls.sessions[url] = session
+        return session
 
     @classmethod
-    def fromEndpointConf(cls, endpointConf) -> "SPARQL":
+    def closeSessions(cls, url: str = None):
+        """
+        close the pooled keep-alive HTTP sessions and their connections
+
+        Args:
+            url(str): the url of the endpoint whose session to close - if None all sessions are closed
+        """
+        with cls.sessionsLock:
+            urls = list(cls.sessions) if url is None else [url]
+            for sessionUrl in urls:
+                session = cls.sessions.pop(sessionUrl, None)
+                if session is not None:
+                    session.close()
+
+    @classmethod
+    def fromEndpointConf(
+        cls, endpointConf, pooled: bool = True, cache=None
+    ) -> "SPARQL":
         """
         create a SPARQL endpoint from the given EndpointConfiguration
 
+        the instances share a keep-alive HTTP session per endpoint by default -
+        SELECT queries are then run via requests instead of SPARQLWrapper's urllib
+        transport - use pooled=False to get the unpooled behavior of SPARQL()
+
         Args:
             endpointConf(Endpoint): the endpoint configuration to be used
-        """
-        sparql = SPARQL(url=endpointConf.endpoint, method=endpointConf.method)
+            pooled(bool): if True run SELECT queries via a keep-alive HTTP session shared per endpoint
+            cache(QueryResultCache): the query result cache to use (if any)
+        """
+        sparql = SPARQL(
+            url=endpointConf.endpoint,
+            method=endpointConf.method,
+            pooled=pooled,
+            cache=cache,
+        )
         if hasattr(endpointConf, "auth"):
             authMethod = None
             if endpointConf.auth == "BASIC":
@@ -94,6 +176,10 @@ class SPARQL(object):
         """
         self.sparql.setHTTPAuth(method)
         self.sparql.setCredentials(username, password)
+        if method == DIGEST:
+            self.auth = HTTPDigestAuth(username, password)
+        else:
+            self.auth = HTTPBasicAuth(username, password)
 
     def rawQuery(self, queryString, method=POST):
         """
@@ -111,6 +197,60 @@ class SPARQL(object):
         queryResult = self.sparql.query()
         return queryResult
 
+    @classmethod
+    def getQueryType(cls, queryString: str) -> str:
+        """
+        get the type of the given query
+
+        Args:
+            queryString(str): the SPARQL query
+
+        Returns:
+            str: the upper case keyword of the query form e.g. SELECT, CONSTRUCT, ASK, DESCRIBE or INSERT - None if not found
+        """
+        match = cls.queryTypeRegex.match(queryString)
+        return match.group(1).upper() if match else None
+
+    def pooledQuery(self, queryString, method=POST) -> list:
+        """
+        run the given SELECT query via my pooled keep-alive HTTP session
+
+        Args:
+            queryString(string): the SPARQL query to be performed
+            method(string): POST or GET
+
+        Returns:
+            list: the list of bindings
+        """
+        headers = {
+            "Accept": "application/sparql-results+json,application/json",
+            "User-Agent": self.sparql.agent,
+        }
+        endpoint = self.sparql.endpoint
+        timeout = self.sparql.timeout
+        if method == POST:
+            response = self.session.post(
+                endpoint,
+                data={"query": queryString},
+                headers=headers,
+                auth=self.auth,
+                timeout=timeout,
+            )
+        else:
+            response = self.session.get(
+                endpoint,
+                params={"query": queryString},
+                headers=headers,
+                auth=self.auth,
+                timeout=timeout,
+            )
+        response.raise_for_status()
+        jsonResult = response.json()
+        bindings = []
+        for binding in jsonResult.get("results", {}).get("bindings", []):
+            bindings.append({var: Value(var, value) for var, value in binding.items()})
+        return bindings
+
     def fix_comments(self, query_string: str) -> str:
         """
         make sure broken SPARQLWrapper will find comments
@@ -442,6 +582,12 @@ class SPARQL(object):
         Returns:
             list: list of bindings
         """
+        if self.session is not None:
+            # only SELECT queries return JSON bindings
+            if self.getQueryType(queryString) == SELECT:
+                if self.debug:
+                    print(queryString)
+                return self.pooledQuery(self.fix_comments(queryString), method=method)
         queryResult = self.rawQuery(queryString, method=method)
         if self.debug:
             print(queryString)
@@ -457,7 +603,11 @@ class SPARQL(object):
         return self.getResults(jsonResult)
 
     def queryAsListOfDicts(
-        self, queryString, fixNone: bool = False, sampleCount: int = None
+        self,
+        queryString,
+        fixNone: bool = False,
+        sampleCount: int = None,
+        ttl: float = None,
     ):
         """
         get a list of dicts for the given query (to allow round-trip results for insertListOfDicts)
@@ -466,16 +616,65 @@ class SPARQL(object):
             queryString(string): the SPARQL query to execute
             fixNone(bool): if True add None values for empty columns in Dict
             sampleCount(int): the number of samples to check
+            ttl(float): the time to live of the result in my cache (if any) - if None the cache default is used
 
         Returns:
             list: a list ofDicts
         """
-        records = self.query(queryString, method=self.method)
-        listOfDicts = self.asListOfDicts(
-            records, fixNone=fixNone, sampleCount=sampleCount
-        )
+        if self.cache is None:
+            records = self.query(queryString, method=self.method)
+            listOfDicts = self.asListOfDicts(
+                records, fixNone=fixNone, sampleCount=sampleCount
+            )
+        else:
+
+            def queryFunc():
+                records = self.query(queryString, method=self.method)
+                return self.asListOfDicts(records)
+
+            listOfDicts = self.cache.getOrQuery(
+                self.sparql.endpoint,
+                queryString,
+                queryFunc,
+                method=self.method,
+                ttl=ttl,
+            )
+            if fixNone:
+                fields = LOD.getFields(listOfDicts, sampleCount)
+                LOD.setNone4List(listOfDicts, fields)
         return listOfDicts
 
+    def queryGen(
+        self,
+        queryString,
+        pageSize: int = 1000,
+        keyVar: str = None,
+        maxWorkers: int = 1,
+    ):
+        """
+        run the given SELECT query page by page as a generator for dicts
+
+        Args:
+            queryString(string): the SPARQL query to execute
+            pageSize(int): the number of records per page
+            keyVar(str): a unique variable for keyset pagination - if None LIMIT/OFFSET pagination is used
+            maxWorkers(int): the maximum number of pages to fetch concurrently
+
+        Returns:
+            a generator of dicts
+        """
+        from lodstorage.sparql_pager import SPARQLPager
+
+        pager = SPARQLPager(
+            self,
+            queryString,
+            pageSize=pageSize,
+            keyVar=keyVar,
+            maxWorkers=maxWorkers,
+            debug=self.debug,
+        )
+        yield from pager.generate()
+
     @staticmethod
     def strToDatetime(value, debug=False):
         """
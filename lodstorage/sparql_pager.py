@@ -0,0 +1,373 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+import copy
+import datetime
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+class SPARQLPager:
+    """
+    paginated execution of a SPARQL SELECT query
+
+    the query is split into pages either by LIMIT/OFFSET or by keyset pagination
+    over a unique variable the results are ordered by. LIMIT/OFFSET pagination needs
+    a query with an ORDER BY clause to get stable pages. Keyset pagination orders
+    every page by the same key expression: numeric keys by their value, all other
+    keys (e.g. IRIs) by their string value - the key values must be of one kind.
+    The key filter and ORDER BY are added to the WHERE clause of the query itself so
+    that the endpoint only evaluates the remaining part of the results per page. This
+    needs a plain SELECT of variables (or *) including the key variable with at most a
+    trailing ORDER BY - queries with expressions in the projection, GROUP BY, HAVING
+    or a trailing VALUES clause are paged by LIMIT/OFFSET ordered by the key variable
+    instead, which the endpoint evaluates in full for every page.
+    LIMIT/OFFSET pages may be fetched concurrently. The pager keeps track of its position so that calling
+    generate() again after an error resumes after the last successful page.
+
+    :ivar offset(int): the offset of the next page to fetch in LIMIT/OFFSET mode
+    :ivar lastKey(object): the last value of the key variable seen in keyset mode
+    :ivar count(int): the number of records delivered so far
+    :ivar pages(int): the number of pages fetched so far
+    """
+
+    modifierRegex = re.compile(r"\s(LIMIT|OFFSET)\s+(\d+)\s*$", re.IGNORECASE)
+    prologueRegex = re.compile(r"^\s*(#.*|PREFIX\s.*|BASE\s.*)?$", re.IGNORECASE)
+    orderByRegex = re.compile(r"\bORDER\s+BY\b", re.IGNORECASE)
+    selectRegex = re.compile(
+        r"^\s*SELECT\s+(?P<modifier>(?:DISTINCT|REDUCED)\s+)?"
+        r"(?P<projection>\*|(?:\?\w+\s+)*\?\w+)\s*WHERE\s*\{(?P<where>.*)\}"
+        r"\s*(?:ORDER\s+BY\b[^{}]*)?$",
+        re.IGNORECASE | re.DOTALL,
+    )
+    # string literals and IRIs may contain braces
+    termRegex = re.compile(r'"(?:[^"\\]|\\.)*"|\'(?:[^\'\\]|\\.)*\'|<[^<>\s]*>')
+    # the variable the key expression of keyset pagination is bound to
+    pagerKeyVar = "pagerKey"
+
+    def __init__(
+        self,
+        sparql,
+        queryString: str,
+        pageSize: int = 1000,
+        keyVar: str = None,
+        maxWorkers: int = 1,
+        retries: int = 2,
+        retryDelay: float = 1.0,
+        debug: bool = False,
+    ):
+        """
+        constructor
+
+        Args:
+            sparql(SPARQL): the SPARQL endpoint to use
+            queryString(str): the SPARQL SELECT query to paginate
+            pageSize(int): the number of records per page
+            keyVar(str): the name of a unique variable for keyset pagination - if None LIMIT/OFFSET pagination is used
+            maxWorkers(int): the maximum number of pages to fetch concurrently (LIMIT/OFFSET mode only)
+            retries(int): the number of retries per page
+            retryDelay(float): the delay in seconds before the first retry - doubled on each retry
+            debug(bool): if True show debug information
+
+        Raises:
+            ValueError: if LIMIT/OFFSET pagination is used for a query without ORDER BY
+        """
+        self.sparql = sparql
+        self.pageSize = pageSize
+        self.keyVar = keyVar.lstrip("?") if keyVar else None
+        self.maxWorkers = max(1, maxWorkers)
+        self.retries = retries
+        self.retryDelay = retryDelay
+        self.debug = debug
+        self.query, self.limit, startOffset = self.splitQuery(queryString)
+        self.keysetParts = None
+        if self.keyVar is not None:
+            self.keysetParts = self.splitSelect(self.query, self.keyVar)
+            if self.keysetParts is None and not self.orderByRegex.search(self.query):
+                # LIMIT/OFFSET pagination ordered by the key variable
+                self.query += f"\nORDER BY ?{self.keyVar}"
+        if self.keyVar is None and not self.orderByRegex.search(self.query):
+            raise ValueError(
+                "LIMIT/OFFSET pagination needs a query with ORDER BY - add one or use a keyVar"
+            )
+        self.offset = startOffset
+        self.startOffset = startOffset
+        self.lastKey = None
+        self.count = 0
+        self.pages = 0
+        self.local = threading.local()
+
+    @classmethod
+    def splitQuery(cls, queryString: str):
+        """
+        split trailing LIMIT and OFFSET modifiers off the given query
+
+        Args:
+            queryString(str): the query to split
+
+        Returns:
+            tuple: the query without modifiers, the limit (or None) and the offset
+        """
+        limit = None
+        offset = 0
+        query = queryString.rstrip()
+        while True:
+            match = cls.modifierRegex.search(query)
+            if not match:
+                break
+            value = int(match.group(2))
+            if match.group(1).upper() == "LIMIT":
+                limit = value
+            else:
+                offset = value
+            query = query[: match.start()].rstrip()
+        return query, limit, offset
+
+    @classmethod
+    def splitPrologue(cls, queryString: str):
+        """
+        split the PREFIX/BASE prologue (including comments) off the given query
+
+        Args:
+            queryString(str): the query to split
+
+        Returns:
+            tuple: the prologue and the body of the query
+        """
+        lines = queryString.splitlines()
+        index = 0
+        while index < len(lines) and cls.prologueRegex.match(lines[index]):
+            index += 1
+        prologue = "\n".join(lines[:index])
+        body = "\n".join(lines[index:])
+        return prologue, body
+
+    @classmethod
+    def splitSelect(cls, queryString: str, keyVar: str):
+        """
+        split the given query into the parts needed to add a key filter and ORDER BY
+        to its WHERE clause
+
+        Args:
+            queryString(str): the query without LIMIT and OFFSET modifiers
+            keyVar(str): the name of the key variable
+
+        Returns:
+            tuple: the prologue, the SELECT clause and the body of the WHERE clause
+            or None if the shape of the query does not allow keyset pagination
+        """
+        prologue, body = cls.splitPrologue(queryString)
+        match = cls.selectRegex.match(body)
+        if not match:
+            return None
+        projection = match.group("projection")
+        if projection != "*" and f"?{keyVar}" not in projection.split():
+            return None
+        where = match.group("where")
+        # the braces of the WHERE clause must enclose the whole body
+        depth = 0
+        for char in cls.termRegex.sub("", where):
+            if char == "{":
+                depth += 1
+            elif char == "}":
+                depth -= 1
+                if depth < 0:
+                    return None
+        if depth != 0:
+            return None
+        modifier = match.group("modifier") or ""
+        select = f"SELECT {modifier.upper()}{projection}"
+        return prologue, select, where
+
+    def remaining(self) -> int:
+        """
+        Returns:
+            int: the number of records still to be fetched or None if unlimited
+        """
+        if self.limit is None:
+            return None
+        return self.limit - (self.offset - self.startOffset)
+
+    def pageQuery(self, offset: int, size: int) -> str:
+        """
+        get the LIMIT/OFFSET query for the page at the given offset
+
+        Args:
+            offset(int): the offset of the page
+            size(int): the size of the page
+
+        Returns:
+            str: the query for the page
+        """
+        return f"{self.query}\nLIMIT {size}\nOFFSET {offset}"
+
+    @staticmethod
+    def asTerm(value) -> str:
+        """
+        convert the given python value to a SPARQL term for comparison
+
+        Args:
+            value(object): the value to convert
+
+        Returns:
+            str: the SPARQL term
+        """
+        if isinstance(value, bool):
+            return "true" if value else "false"
+        if isinstance(value, (int, float)):
+            return repr(value)
+        if isinstance(value, datetime.datetime):
+            return f'"{value.isoformat()}"^^<http://www.w3.org/2001/XMLSchema#dateTime>'
+        if isinstance(value, datetime.date):
+            return f'"{value.isoformat()}"^^<http://www.w3.org/2001/XMLSchema#date>'
+        escaped = str(value).replace("\\", "\\\\").replace('"', '\\"')
+        return f'"{escaped}"'
+
+    def keysetQuery(self, lastKey, size: int) -> str:
+        """
+        get the keyset query for the page following the given lastKey
+
+        Args:
+            lastKey(object): the last key value of the previous page or None for the first page
+            size(int): the size of the page
+
+        Returns:
+            str: the query for the page
+        """
+        var = f"?{self.keyVar}"
+        key = f"?{self.pagerKeyVar}"
+        keyFilter = ""
+        if lastKey is not None:
+            keyFilter = f"\n  FILTER({key} > {self.asTerm(lastKey)})"
+        prologue, select, where = self.keysetParts
+        if not select.endswith("*"):
+            select += f" {key}"
+        query = f"""{prologue}
+{select} WHERE {{{where}
+  BIND(IF(isNumeric({var}), {var}, STR({var})) AS {key}){keyFilter}
+}}
+ORDER BY {key}
+LIMIT {size}"""
+        if lastKey is None and self.startOffset > 0:
+            query += f"\nOFFSET {self.startOffset}"
+        return query
+
+    def getSPARQL(self):
+        """
+        get the SPARQL instance to use for the current thread
+
+        pooled instances are thread safe - the SPARQLWrapper of unpooled
+        instances is copied per thread
+        """
+        if self.maxWorkers == 1 or self.sparql.session is not None:
+            return self.sparql
+        sparql = getattr(self.local, "sparql", None)
+        if sparql is None:
+            sparql = copy.copy(self.sparql)
+            sparql.sparql = copy.copy(self.sparql.sparql)
+            self.local.sparql = sparql
+        return sparql
+
+    def fetchPage(self, pageQuery: str) -> list:
+        """
+        fetch a single page with retries
+
+        Args:
+            pageQuery(str): the query for the page
+
+        Returns:
+            list: the list of dicts of the page
+        """
+        delay = self.retryDelay
+        for attempt in range(self.retries + 1):
+            try:
+                if self.debug:
+                    print(pageQuery)
+                lod = self.getSPARQL().queryAsListOfDicts(pageQuery)
+                return lod
+            except Exception as ex:
+                if attempt >= self.retries:
+                    raise ex
+                if self.debug:
+                    print(f"page query failed ({ex}) - retrying in {delay:.1f} s")
+                time.sleep(delay)
+                delay *= 2
+
+    def generate(self):
+        """
+        generate the records of all pages - may be called again after an error to resume
+
+        Returns:
+            generator: a generator of dicts
+        """
+        if self.keysetParts is None:
+            yield from self.generateByOffset()
+        else:
+            yield from self.generateByKeyset()
+
+    def generateByKeyset(self):
+        """
+        generate the records of all pages using keyset pagination
+        """
+        while True:
+            size = self.pageSize
+            remaining = self.remaining()
+            if remaining is not None:
+                if remaining <= 0:
+                    break
+                size = min(size, remaining)
+            lod = self.fetchPage(self.keysetQuery(self.lastKey, size))
+            self.pages += 1
+            lastKey = None
+            for record in lod:
+                lastKey = record.pop(self.pagerKeyVar, None)
+                yield record
+            self.count += len(lod)
+            self.offset += len(lod)
+            if lod:
+                self.lastKey = lastKey
+            if len(lod) < size:
+                break
+
+    def generateByOffset(self):
+        """
+        generate the records of all pages using LIMIT/OFFSET pagination
+        fetching up to maxWorkers pages concurrently
+        """
+        executor = ThreadPoolExecutor(max_workers=self.maxWorkers)
+        futures = deque()
+        nextOffset = self.offset
+        exhausted = False
+        try:
+            while True:
+                while not exhausted and len(futures) < self.maxWorkers:
+                    size = self.pageSize
+                    if self.limit is not None:
+                        size = min(size, self.startOffset + self.limit - nextOffset)
+                        if size <= 0:
+                            exhausted = True
+                            break
+                    pageQuery = self.pageQuery(nextOffset, size)
+                    future = executor.submit(self.fetchPage, pageQuery)
+                    futures.append((nextOffset, size, future))
+                    nextOffset += size
+                if not futures:
+                    break
+                offset, size, future = futures.popleft()
+                lod = future.result()
+                self.pages += 1
+                for record in lod:
+                    yield record
+                self.count += len(lod)
+                self.offset = offset + len(lod)
+                if len(lod) < size:
+                    break
+        finally:
+            for _offset, _size, future in futures:
+                future.cancel()
+            executor.shutdown(wait=True)
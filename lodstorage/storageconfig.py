@@ -18,6 +18,7 @@ class StoreMode(Enum):
     SQL = 3
     SPARQL = 4
     YAML = 5
+    JSONL = 6  # JSON Lines - one record per line
 
 
 class StorageConfig(object):
@@ -50,6 +51,7 @@ class StorageConfig(object):
         profile=True,
         debug=False,
         errorDebug=True,
+        compression: str = None,
     ):
         """
         Constructor
@@ -62,6 +64,7 @@ class StorageConfig(object):
             profile(boolean): True if timing / profiling information should be shown
             debug(boolean): True if debugging information should be shown
             errorDebug(boolean): True if debug info should be provided on errors (should not be used for production since it might reveal data)
+            compression(str): the compression to use for JSON Lines cache files: None, "gz" or "zst"
         """
         if cacheRootDir is None:
             home = str(Path.home())
@@ -75,6 +78,7 @@ class StorageConfig(object):
         self.withShowProgress = withShowProgress
         self.debug = debug
         self.errorDebug = errorDebug
+        self.compression = compression
 
     @staticmethod
     def getDefault(debug=False):
@@ -91,6 +95,13 @@ class StorageConfig(object):
         config = StorageConfig(mode=StoreMode.JSON, debug=debug)
         return config
 
+    @staticmethod
+    def getJSONL(debug=False, compression: str = None):
+        config = StorageConfig(
+            mode=StoreMode.JSONL, debug=debug, compression=compression
+        )
+        return config
+
     @staticmethod
     def getJsonPickle(debug=False):
         config = StorageConfig(mode=StoreMode.JSONPICKLE, debug=debug)
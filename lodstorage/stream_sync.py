@@ -0,0 +1,363 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+import csv
+from abc import ABC, abstractmethod
+from itertools import chain
+from typing import Any, Dict, Iterator, Optional
+
+from lodstorage.jsonl import JSONL
+from lodstorage.sql import SQLDB
+from lodstorage.sync import KeySync, SyncPair
+
+
+class SyncSource(ABC):
+    """
+    a side of a synchronization whose records are read as a stream
+
+    the records may be read more than once e.g. for a resync so
+    sources rerun their query or reread their file on each call of records
+    """
+
+    def __init__(self, name: str, key: str):
+        """
+        constructor
+
+        Args:
+            name(str): the name of the side e.g. local or wikidata
+            key(str): the field used as a unique identifier for synchronization
+        """
+        self.name = name
+        self.key = key
+
+    @abstractmethod
+    def records(self) -> Iterator[Dict[str, Any]]:
+        """
+        get my records
+
+        Returns:
+            Iterator[Dict[str, Any]]: a generator of dicts
+        """
+        pass
+
+
+class LoDSource(SyncSource):
+    """
+    a list of dicts (or any iterable that can be iterated repeatedly) as sync source
+    """
+
+    def __init__(self, name: str, key: str, lod):
+        super().__init__(name, key)
+        self.lod = lod
+
+    def records(self) -> Iterator[Dict[str, Any]]:
+        return iter(self.lod)
+
+
+class SQLSource(SyncSource):
+    """
+    an SQL query or table of an SQLDB as sync source
+    """
+
+    def __init__(
+        self,
+        name: str,
+        key: str,
+        sqldb: SQLDB,
+        query: str = None,
+        table_name: str = None,
+        params: tuple = None,
+    ):
+        """
+        constructor
+
+        Args:
+            name(str): the name of the side
+            key(str): the sync key column
+            sqldb(SQLDB): the database
+            query(str): the SQL query to run
+            table_name(str): the table to read if no query is given
+            params(tuple): the query params, if any
+        """
+        super().__init__(name, key)
+        if query is None:
+            query = f"SELECT * FROM {table_name}"
+        self.sqldb = sqldb
+        self.query = query
+        self.params = params
+
+    def records(self) -> Iterator[Dict[str, Any]]:
+        return self.sqldb.queryGen(self.query, self.params)
+
+
+class SPARQLSource(SyncSource):
+    """
+    a SPARQL SELECT query as sync source that is fetched page by page
+    """
+
+    def __init__(
+        self,
+        name: str,
+        key: str,
+        sparql,
+        query: str,
+        page_size: int = 10000,
+        key_var: str = None,
+    ):
+        """
+        constructor
+
+        Args:
+            name(str): the name of the side
+            key(str): the sync key variable
+            sparql(SPARQL): the SPARQL endpoint wrapper
+            query(str): the SPARQL SELECT query
+            page_size(int): the number of records per page
+            key_var(str): a unique variable for keyset pagination - if None LIMIT/OFFSET pagination is used
+        """
+        super().__init__(name, key)
+        self.sparql = sparql
+        self.query = query
+        self.page_size = page_size
+        self.key_var = key_var
+
+    def records(self) -> Iterator[Dict[str, Any]]:
+        return self.sparql.queryGen(
+            self.query, pageSize=self.page_size, keyVar=self.key_var
+        )
+
+
+class CSVSource(SyncSource):
+    """
+    a CSV file as sync source - read with the conventions of CSV.fromCSV
+    """
+
+    def __init__(self, name: str, key: str, path: str, delimiter: str = ","):
+        super().__init__(name, key)
+        self.path = path
+        self.delimiter = delimiter
+
+    def records(self) -> Iterator[Dict[str, Any]]:
+        with open(self.path, newline="") as csvFile:
+            reader = csv.DictReader(
+                csvFile, delimiter=self.delimiter, quoting=csv.QUOTE_NONNUMERIC
+            )
+            for record in reader:
+                # empty csv values are None as in CSV.fixTypes
+                for field_name, value in record.items():
+                    if value == "":
+                        record[field_name] = None
+                yield record
+
+
+class JSONLSource(SyncSource):
+    """
+    a JSON Lines file as sync source
+    """
+
+    def __init__(self, name: str, key: str, path: str):
+        super().__init__(name, key)
+        self.path = path
+
+    def records(self) -> Iterator[Dict[str, Any]]:
+        return JSONL.readLoD(self.path)
+
+
+class StreamSync(KeySync):
+    """
+    synchronization of two sources that do not need to fit into memory
+
+    the sync keys and content hashes of both sides are streamed into the
+    key tables of a temporary sqlite database and the ←/↔/→ partitions are
+    computed by joining these tables. The record level methods of Sync
+    such as get_record_by_key and get_change_set need the records in
+    memory and raise a NotImplementedError.
+    """
+
+    def __init__(
+        self,
+        title: str,
+        l_source: SyncSource,
+        r_source: SyncSource,
+        field_map: Optional[Dict[str, str]] = None,
+        dbname: str = "",
+    ):
+        """
+        constructor
+
+        Args:
+            title(str): the title of the synchronization
+            l_source(SyncSource): the left source
+            r_source(SyncSource): the right source
+            field_map(Dict[str, str]): maps the left fields to the right fields that are compared - if None the fields with the same name in the first records are compared
+            dbname(str): the sqlite database for the key tables - the default "" is a temporary database on disk that is deleted on close
+        """
+        pair = SyncPair(
+            title=title,
+            l_name=l_source.name,
+            r_name=r_source.name,
+            l_data=[],
+            r_data=[],
+            l_key=l_source.key,
+            r_key=r_source.key,
+            field_map=field_map,
+        )
+        super().__init__(pair)
+        self.sources = {"left": l_source, "right": r_source}
+        self.sqldb = SQLDB(dbname)
+        for side in self.sources:
+            self.sqldb.execute(f"DROP TABLE IF EXISTS {side}_keys")
+            self.sqldb.execute(
+                f"CREATE TABLE {side}_keys(key PRIMARY KEY, hash INTEGER) WITHOUT ROWID"
+            )
+        # the first record of each side
+        self.first = {}
+        l_records = self.peek("left")
+        r_records = self.peek("right")
+        if field_map is None:
+            self.field_map = {pair.l_key: pair.r_key}
+            common_fields = self.first["left"].keys() & self.first["right"].keys()
+            for field_name in sorted(common_fields):
+                self.field_map.setdefault(field_name, field_name)
+        self.load("left", l_records)
+        self.load("right", r_records)
+
+    def close(self):
+        """
+        close my key table database
+        """
+        self.sqldb.close()
+
+    def peek(self, side: str) -> Iterator[Dict[str, Any]]:
+        """
+        look at the first record of the given side
+
+        Args:
+            side(str): "left" or "right"
+
+        Returns:
+            Iterator[Dict[str, Any]]: all records of the side including the first one
+        """
+        records = iter(self.sources[side].records())
+        first = next(records, None)
+        self.first[side] = first if first is not None else {}
+        if first is None:
+            return records
+        return chain([first], records)
+
+    def load(self, side: str, records: Iterator[Dict[str, Any]] = None):
+        """
+        stream the sync keys and content hashes of the given records into the key table of the given side
+
+        the first record wins for duplicate keys
+
+        Args:
+            side(str): "left" or "right"
+            records(Iterator[Dict[str, Any]]): the records - if None the records of the source of the side are read
+        """
+        if records is None:
+            records = self.sources[side].records()
+        key = self.sources[side].key
+        fields = self.get_hash_fields(side)
+        content_hash = self.content_hash
+
+        def key_hashes():
+            for record in records:
+                if key in record:
+                    yield record[key], content_hash(record, fields)
+
+        self.sqldb.execute(f"DELETE FROM {side}_keys")
+        # executemany consumes the generator lazily
+        self.sqldb.c.executemany(
+            f"INSERT OR IGNORE INTO {side}_keys VALUES (?,?)", key_hashes()
+        )
+        self.sqldb.c.commit()
+
+    def resync(self, side: str, source: SyncSource = None):
+        """
+        incrementally resynchronize after the records of the given side changed
+
+        only the key table of the changed side is reloaded
+
+        Args:
+            side (str): The side of data source, "←","l" or "left" for left and "→","r" or "right" for right.
+            source(SyncSource): the new source of the side - if None the current source is reread
+        """
+        side = self.get_side(side)
+        if source is not None:
+            self.sources[side] = source
+        self.load(side)
+
+    def count(self, sqlQuery: str) -> int:
+        """
+        get the single count value of the given query
+        """
+        return self.sqldb.c.execute(sqlQuery).fetchone()[0]
+
+    def get_counts(self) -> Dict[str, int]:
+        """
+        get the number of keys for each direction of synchronization
+        """
+        l_count = self.count("SELECT COUNT(*) FROM left_keys")
+        r_count = self.count("SELECT COUNT(*) FROM right_keys")
+        both = self.count("SELECT COUNT(*) FROM left_keys JOIN right_keys USING(key)")
+        counts = {"←": r_count - both, "↔": both, "→": l_count - both}
+        return counts
+
+    def get_diff_count(self) -> int:
+        """
+        get the number of records that are present on both sides but differ in their content
+        """
+        diff_count = self.count(
+            """SELECT COUNT(*) FROM left_keys l JOIN right_keys r USING(key)
+WHERE l.hash != r.hash"""
+        )
+        return diff_count
+
+    def iter_keys(self, direction: str) -> Iterator[Any]:
+        """
+        get the keys for a given direction of synchronization in key order
+
+        Args:
+            direction(str): "←", "↔" or "→"
+
+        Returns:
+            Iterator[Any]: a generator of the keys
+        """
+        if direction == "↔":
+            sqlQuery = (
+                "SELECT key FROM left_keys JOIN right_keys USING(key) ORDER BY key"
+            )
+        elif direction in ("←", "→"):
+            this, other = ("right", "left") if direction == "←" else ("left", "right")
+            sqlQuery = f"""SELECT key FROM {this}_keys
+WHERE key NOT IN (SELECT key FROM {other}_keys) ORDER BY key"""
+        else:
+            self.handle_direction_error(direction)
+        for row in self.sqldb.c.execute(sqlQuery):
+            yield row[0]
+
+    def iter_diff_keys(self) -> Iterator[Any]:
+        """
+        get the keys of the records that are present on both sides but differ in their content
+
+        Returns:
+            Iterator[Any]: a generator of the keys in key order
+        """
+        sqlQuery = """SELECT key FROM left_keys l JOIN right_keys r USING(key)
+WHERE l.hash != r.hash ORDER BY key"""
+        for row in self.sqldb.c.execute(sqlQuery):
+            yield row[0]
+
+    def get_keys(self, direction: str) -> set:
+        """
+        Get the keys for a given direction of synchronization.
+
+        the keys are materialized - use iter_keys for large data sets
+        """
+        return set(self.iter_keys(direction))
+
+    def get_diff_keys(self) -> set:
+        return set(self.iter_diff_keys())
@@ -4,10 +4,11 @@ Created on 2023-12-27
 @author: wf
 """
 
+import hashlib
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
-from tabulate import tabulate
+from lodstorage.table_renderer import TableRenderer
 
 
 @dataclass
@@ -25,6 +26,7 @@ class SyncPair:
            r_key (str): The field name in the right data source dictionaries used as a unique identifier for synchronization.
            l_pkey(str): the primary key field of the left data source
            r_pkey(str): the primary key field of the right data source
+           field_map(Dict[str, str]): maps the fields of the left data source to the fields of the right data source that are compared - if None the fields with the same name and the keys are compared
 
     Example usage:
     l_data = [{'id_l': '1', 'value': 'a'}, {'id_l': '2', 'value': 'b'}]
@@ -43,9 +45,12 @@ class SyncPair:
     r_key: str
     l_pkey: Optional[str] = None
     r_pkey: Optional[str] = None
-    # Add dictionaries for quick primary key access
+    field_map: Optional[Dict[str, str]] = None
+    # Add dictionaries for quick primary key and sync key access
     l_by_pkey: Dict[str, Dict[str, Any]] = field(init=False)
     r_by_pkey: Dict[str, Dict[str, Any]] = field(init=False)
+    l_by_key: Dict[str, Dict[str, Any]] = field(init=False)
+    r_by_key: Dict[str, Dict[str, Any]] = field(init=False)
 
     def __post_init__(self):
         # Set the l_pkey to l_key if not provided
@@ -54,8 +59,163 @@ class SyncPair:
         # Set the r_pkey to r_key if not provided
         if self.r_pkey is None:
             self.r_pkey = self.r_key
-        self.l_by_pkey = {d[self.l_pkey]: d for d in self.l_data if self.l_pkey in d}
-        self.r_by_pkey = {d[self.r_pkey]: d for d in self.r_data if self.r_pkey in d}
+        self.index("left")
+        self.index("right")
+
+    def index(self, side: str):
+        """
+        (re)build the primary key and sync key indexes of the given side
+
+        Args:
+            side(str): "left" or "right"
+        """
+        if side == "left":
+            data, pkey, key = self.l_data, self.l_pkey, self.l_key
+        else:
+            data, pkey, key = self.r_data, self.r_pkey, self.r_key
+        by_pkey = {d[pkey]: d for d in data if pkey in d}
+        if key == pkey and len(by_pkey) == len(data):
+            # all records have a unique key
+            by_key = by_pkey
+        else:
+            # the first record of a duplicate key wins
+            by_key = {}
+            for record in data:
+                if key in record:
+                    by_key.setdefault(record[key], record)
+        if side == "left":
+            self.l_by_pkey, self.l_by_key = by_pkey, by_key
+        else:
+            self.r_by_pkey, self.r_by_key = by_pkey, by_key
+
+
+@dataclass
+class RecordChange:
+    """
+    a change of a single record of a change set
+
+    Attributes:
+        action (str): "insert", "update" or "delete"
+        key (Any): the sync key of the record
+        values (Dict[str, Any]): the new values by target field - all mapped fields for inserts, the differing fields for updates
+        old_values (Dict[str, Any]): the old values of the differing fields for updates - None otherwise
+    """
+
+    action: str
+    key: Any
+    values: Dict[str, Any] = field(default_factory=dict)
+    old_values: Optional[Dict[str, Any]] = None
+
+
+@dataclass
+class ChangeSet:
+    """
+    the changes that bring the target side of a synchronization up to date with the source side
+
+    Attributes:
+        direction (str): "→" if the right side is the target, "←" if the left side is the target
+        target_key (str): the sync key field of the target side
+        changes (List[RecordChange]): the inserts, updates and deletes
+    """
+
+    direction: str
+    target_key: str
+    changes: List[RecordChange] = field(default_factory=list)
+
+    def counts(self) -> Dict[str, int]:
+        """
+        get the number of changes by action
+        """
+        counts = {"insert": 0, "update": 0, "delete": 0}
+        for change in self.changes:
+            counts[change.action] += 1
+        return counts
+
+    def as_lod(self) -> List[Dict[str, Any]]:
+        """
+        get my changes as a list of dicts with one record per changed field for export
+
+        Returns:
+            List[Dict[str, Any]]: records with the keys action, key, field, old and new
+        """
+        lod = []
+        for change in self.changes:
+            old_values = change.old_values or {}
+            if change.action == "delete":
+                lod.append(
+                    {
+                        "action": change.action,
+                        "key": change.key,
+                        "field": None,
+                        "old": None,
+                        "new": None,
+                    }
+                )
+            for field_name, value in change.values.items():
+                lod.append(
+                    {
+                        "action": change.action,
+                        "key": change.key,
+                        "field": field_name,
+                        "old": old_values.get(field_name),
+                        "new": value,
+                    }
+                )
+        return lod
+
+    @staticmethod
+    def quote_identifier(name: str) -> str:
+        """
+        quote the given table or column name for SQL
+
+        Args:
+            name(str): the identifier
+
+        Returns:
+            str: the identifier in double quotes with embedded double quotes doubled
+        """
+        quoted = '"' + name.replace('"', '""') + '"'
+        return quoted
+
+    def apply_to_sqldb(self, sqldb, table_name: str) -> Dict[str, int]:
+        """
+        apply my changes to the given table of the given database
+
+        the columns of the table are the fields of the target side and the
+        sync key column identifies the records
+
+        Args:
+            sqldb(SQLDB): the database
+            table_name(str): the name of the table to apply the changes to
+
+        Returns:
+            Dict[str, int]: the number of changes applied by action
+        """
+        # group the changes by statement to use executemany
+        quote = ChangeSet.quote_identifier
+        table = quote(table_name)
+        target_key = quote(self.target_key)
+        statements = {}
+        for change in self.changes:
+            columns = [quote(column) for column in change.values.keys()]
+            if change.action == "insert":
+                placeholders = ",".join("?" * len(columns))
+                sql = (
+                    f"INSERT INTO {table} ({','.join(columns)}) VALUES ({placeholders})"
+                )
+                params = tuple(change.values.values())
+            elif change.action == "update":
+                assignments = ",".join(f"{column}=?" for column in columns)
+                sql = f"UPDATE {table} SET {assignments} WHERE {target_key}=?"
+                params = (*change.values.values(), change.key)
+            else:
+                sql = f"DELETE FROM {table} WHERE {target_key}=?"
+                params = (change.key,)
+            statements.setdefault(sql, []).append(params)
+        for sql, paramsList in statements.items():
+            sqldb.c.executemany(sql, paramsList)
+        sqldb.c.commit()
+        return self.counts()
 
 
 class Sync:
@@ -71,6 +231,12 @@ class Sync:
         self.sync_dict = self._create_sync_dict()
         self.directions = ["←", "↔", "→"]
         self.sides = {"left": ["←", "l", "left"], "right": ["→", "r", "right"]}
+        if pair.field_map is None:
+            self.field_map = self.get_common_field_map()
+        else:
+            self.field_map = {pair.l_key: pair.r_key, **pair.field_map}
+        # content hashes by sync key - computed on demand
+        self.hashes = {"left": None, "right": None}
 
     def handle_direction_error(self, direction: str):
         invalid_direction_msg = (
@@ -82,16 +248,20 @@ class Sync:
         invalid_side_msg = f"Invalid side '{side}'. Use {', '.join(self.sides['left'])} for left or {', '.join(self.sides['right'])} for right."
         raise ValueError(invalid_side_msg)
 
+    def handle_records_error(self, method_name: str):
+        records_msg = f"{method_name} needs the records which are not available in {self.__class__.__name__}"
+        raise NotImplementedError(records_msg)
+
     def _create_sync_dict(self) -> dict:
         """
         Create a dictionary representing the synchronization state between left and right data sources.
         """
-        l_keys = {d[self.pair.l_key] for d in self.pair.l_data if self.pair.l_key in d}
-        r_keys = {d[self.pair.r_key] for d in self.pair.r_data if self.pair.r_key in d}
+        l_keys = self.pair.l_by_key.keys()
+        r_keys = self.pair.r_by_key.keys()
 
         sync_dict = {
             "←": r_keys - l_keys,  # Present in right but not in left
-            "↔": l_keys.intersection(r_keys),  # Present in both
+            "↔": l_keys & r_keys,  # Present in both
             "→": l_keys - r_keys,  # Present in left but not in right
         }
         return sync_dict
@@ -131,20 +301,221 @@ class Sync:
             ValueError: If the provided direction is invalid.
         """
         record = None
-        if side in ["←", "l", "left"]:
-            record = next(
-                (item for item in self.pair.l_data if item[self.pair.l_key] == key),
-                None,
-            )
-        elif side in ["→", "r", "right"]:
-            record = next(
-                (item for item in self.pair.r_data if item[self.pair.r_key] == key),
-                None,
-            )
+        if side in self.sides["left"]:
+            record = self.pair.l_by_key.get(key)
+        elif side in self.sides["right"]:
+            record = self.pair.r_by_key.get(key)
         else:
             self.handle_side_error(side)
         return record
 
+    def get_side(self, side: str) -> str:
+        """
+        get the normalized name of the given side
+
+        Args:
+            side (str): The side of data source, "←","l" or "left" for left and "→","r" or "right" for right.
+
+        Returns:
+            str: "left" or "right"
+        """
+        for name, aliases in self.sides.items():
+            if side in aliases:
+                return name
+        self.handle_side_error(side)
+
+    def get_common_field_map(self) -> Dict[str, str]:
+        """
+        get the field map for the sync keys and the fields that have the same name on both sides
+
+        Returns:
+            Dict[str, str]: the right field by left field
+        """
+        l_fields = set().union(*self.pair.l_data)
+        r_fields = set().union(*self.pair.r_data)
+        field_map = {self.pair.l_key: self.pair.r_key}
+        for field_name in sorted(l_fields & r_fields):
+            field_map.setdefault(field_name, field_name)
+        return field_map
+
+    def get_hashes(self, side: str) -> Dict[Any, int]:
+        """
+        get the content hashes of the records of the given side by sync key
+
+        the hashes are computed over the values of the mapped fields once
+        and are reused until the side is resynced
+
+        Args:
+            side (str): The side of data source, "←","l" or "left" for left and "→","r" or "right" for right.
+
+        Returns:
+            Dict[Any, int]: the content hash by sync key
+        """
+        side = self.get_side(side)
+        hashes = self.hashes[side]
+        if hashes is None:
+            by_key = self.pair.l_by_key if side == "left" else self.pair.r_by_key
+            fields = self.get_hash_fields(side)
+            content_hash = self.content_hash
+            hashes = {
+                key: content_hash(record, fields) for key, record in by_key.items()
+            }
+            self.hashes[side] = hashes
+        return hashes
+
+    def get_hash_fields(self, side: str) -> List[str]:
+        """
+        get the fields of the given side the content hashes are computed over
+
+        Args:
+            side (str): "left" or "right"
+
+        Returns:
+            List[str]: the mapped fields of the side
+        """
+        if side == "left":
+            fields = list(self.field_map.keys())
+        else:
+            fields = list(self.field_map.values())
+        return fields
+
+    @staticmethod
+    def content_hash(record: Dict[str, Any], fields: List[str]) -> int:
+        """
+        get the content hash of the given record
+
+        the hash is a stable 64 bit blake2b digest of the repr of the values
+        so that - unlike the built-in hash e.g. hash(-1) == hash(-2) -
+        differing values practically never collide and the hashes can be stored.
+        Integral floats are hashed as ints since e.g. 1.0 == 1
+
+        Args:
+            record (Dict[str, Any]): the record
+            fields (List[str]): the fields to hash - missing fields count as None
+
+        Returns:
+            int: the signed 64 bit hash of the values of the fields
+        """
+        # integral floats e.g. from CSV files compare equal to ints
+        values = tuple(
+            int(value) if type(value) is float and value.is_integer() else value
+            for value in map(record.get, fields)
+        )
+        digest = hashlib.blake2b(repr(values).encode(), digest_size=8).digest()
+        return int.from_bytes(digest, "big", signed=True)
+
+    def get_diff_keys(self) -> set:
+        """
+        get the keys of the records that are present on both sides but differ in their content
+
+        Returns:
+            set: the sync keys of the differing records
+        """
+        l_hashes = self.get_hashes("left")
+        r_hashes = self.get_hashes("right")
+        return {key for key in self.sync_dict["↔"] if l_hashes[key] != r_hashes[key]}
+
+    def get_field_diff(self, key: Any) -> Dict[str, Tuple[Any, Any]]:
+        """
+        get the field level differences of the records with the given sync key
+
+        Args:
+            key (Any): the sync key
+
+        Returns:
+            Dict[str, Tuple[Any, Any]]: the left and right value by left field for the differing fields
+        """
+        l_record = self.pair.l_by_key.get(key, {})
+        r_record = self.pair.r_by_key.get(key, {})
+        field_diff = {}
+        for l_field, r_field in self.field_map.items():
+            l_value = l_record.get(l_field)
+            r_value = r_record.get(r_field)
+            if l_value != r_value:
+                field_diff[l_field] = (l_value, r_value)
+        return field_diff
+
+    def get_change_set(
+        self, direction: str, with_update: bool = True, with_delete: bool = False
+    ) -> ChangeSet:
+        """
+        get the changes that bring the target side up to date with the source side
+
+        Args:
+            direction (str): "→" to update the right side from the left side, "←" to update the left side from the right side
+            with_update (bool): if True add updates for the records that differ
+            with_delete (bool): if True add deletes for the records that are only present on the target side
+
+        Returns:
+            ChangeSet: the inserts, updates and deletes in terms of the target fields
+        """
+        if direction == "→":
+            source_by_key, target_by_key = self.pair.l_by_key, self.pair.r_by_key
+            field_pairs = list(self.field_map.items())
+            target_key = self.pair.r_key
+        elif direction == "←":
+            source_by_key, target_by_key = self.pair.r_by_key, self.pair.l_by_key
+            field_pairs = [
+                (r_field, l_field) for l_field, r_field in self.field_map.items()
+            ]
+            target_key = self.pair.l_key
+        else:
+            self.handle_direction_error(direction)
+        change_set = ChangeSet(direction=direction, target_key=target_key)
+        changes = change_set.changes
+        if with_update:
+            l_hashes = self.get_hashes("left")
+            r_hashes = self.get_hashes("right")
+        # a single pass over the source records in their order
+        for key, record in source_by_key.items():
+            if key not in target_by_key:
+                values = {
+                    target_field: record[source_field]
+                    for source_field, target_field in field_pairs
+                    if source_field in record
+                }
+                changes.append(RecordChange("insert", key, values))
+            elif with_update and l_hashes[key] != r_hashes[key]:
+                values = {}
+                old_values = {}
+                for l_field, (l_value, r_value) in self.get_field_diff(key).items():
+                    if direction == "→":
+                        target_field = self.field_map[l_field]
+                        values[target_field], old_values[target_field] = (
+                            l_value,
+                            r_value,
+                        )
+                    else:
+                        values[l_field], old_values[l_field] = r_value, l_value
+                # equal values may have different hashes e.g. nan
+                if values:
+                    changes.append(RecordChange("update", key, values, old_values))
+        if with_delete:
+            for key in target_by_key.keys():
+                if key not in source_by_key:
+                    changes.append(RecordChange("delete", key))
+        return change_set
+
+    def resync(self, side: str, data: List[Dict[str, Any]]):
+        """
+        incrementally resynchronize after the data of the given side changed
+
+        only the indexes and content hashes of the changed side are rebuilt -
+        the ones of the other side are reused
+
+        Args:
+            side (str): The side of data source, "←","l" or "left" for left and "→","r" or "right" for right.
+            data (List[Dict[str, Any]]): the new records of the side
+        """
+        side = self.get_side(side)
+        if side == "left":
+            self.pair.l_data = data
+        else:
+            self.pair.r_data = data
+        self.pair.index(side)
+        self.hashes[side] = None
+        self.sync_dict = self._create_sync_dict()
+
     def get_keys(self, direction: str) -> set:
         """
         Get the keys for a given direction of synchronization.
@@ -154,17 +525,24 @@ class Sync:
         else:
             self.handle_direction_error(direction)
 
-    def status_table(self, tablefmt: str = "grid") -> str:
+    def get_counts(self) -> Dict[str, int]:
         """
-        Create a table representing the synchronization status.
+        get the number of keys for each direction of synchronization
+        """
+        counts = {direction: len(keys) for direction, keys in self.sync_dict.items()}
+        return counts
+
+    def get_status_rows(self) -> List[Dict[str, Any]]:
         """
-        total_records = sum(len(keys) for keys in self.sync_dict.values())
+        get the rows of the synchronization status table
+        """
+        counts = self.get_counts()
+        total_records = sum(counts.values())
         if total_records == 0:  # Avoid division by zero
             total_records = 1
 
         table_data = []
-        for direction, keys in self.sync_dict.items():
-            num_records = len(keys)
+        for direction, num_records in counts.items():
             percentage = (num_records / total_records) * 100
             table_data.append(
                 {
@@ -175,11 +553,46 @@ class Sync:
                     "%": f"{percentage:7.2f}%",
                 }
             )
+        return table_data
 
-        markup = tabulate(
+    def status_table(self, tablefmt: str = "grid") -> str:
+        """
+        Create a table representing the synchronization status.
+        """
+        table_data = self.get_status_rows()
+        colalign = ["right", "center", "left"]
+        colalign.extend(["right"] * (len(table_data[0]) - len(colalign)))
+        markup = TableRenderer.tabulate(
             table_data,
             headers="keys",
             tablefmt=tablefmt,
-            colalign=("right", "center", "left", "right", "right"),
+            colalign=colalign,
         )
         return markup
+
+
+class KeySync(Sync):
+    """
+    base class of the synchronizations that only know the sync keys of
+    both sides but not the records e.g. since they do not fit into memory
+
+    the record level methods of Sync raise a NotImplementedError instead
+    of silently answering for empty sides
+    """
+
+    def get_record_by_pkey(self, side: str, pkey: str) -> Optional[Dict[str, Any]]:
+        self.handle_records_error("get_record_by_pkey")
+
+    def get_record_by_key(self, side: str, key: str) -> dict:
+        self.handle_records_error("get_record_by_key")
+
+    def get_hashes(self, side: str) -> Dict[Any, int]:
+        self.handle_records_error("get_hashes")
+
+    def get_field_diff(self, key: Any) -> Dict[str, Tuple[Any, Any]]:
+        self.handle_records_error("get_field_diff")
+
+    def get_change_set(
+        self, direction: str, with_update: bool = True, with_delete: bool = False
+    ) -> ChangeSet:
+        self.handle_records_error("get_change_set")
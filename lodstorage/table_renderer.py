@@ -0,0 +1,656 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+import math
+import re
+from itertools import chain, islice
+from typing import Iterable, Iterator, TextIO
+
+try:
+    # optional wide-character (CJK) support as used by tabulate
+    import wcwidth
+except ImportError:
+    wcwidth = None
+
+
+class TableLayout:
+    """
+    the column layout of a table: headers, column types, alignments, widths and decimals
+    """
+
+    def __init__(self, keys: list, headers: list, colTypes: list):
+        """
+        constructor
+
+        Args:
+            keys(list): the keys of the dict rows or None for sequence rows
+            headers(list): the header strings - empty for a table without headers
+            colTypes(list): the type rank of each column
+        """
+        self.keys = keys
+        self.headers = headers
+        self.colTypes = colTypes
+        self.aligns = None
+        self.widths = None
+        self.decimals = None
+        self.plain = None
+        # the aligned cells of the rows the layout was derived from by column
+        self.cellColumns = []
+
+
+class TableRenderer:
+    """
+    fast native renderer for the github, grid, latex and mediawiki table formats
+
+    The result is the same as the one of tabulate with the default number
+    parsing and alignment. Each cell is typed once and the column widths
+    are measured in a single pass over the formatted values. With a sample
+    size the layout is derived from the first rows only and the remaining
+    rows are streamed - cells wider than the sampled width are not cut.
+
+    Tables that tabulate would render differently - multiline cells in grid
+    and github tables, ANSI escape codes, bytes, separating lines or options
+    other than headers, floatfmt, missingval and colalign - are rendered
+    with tabulate.
+    """
+
+    formats = ("github", "grid", "latex", "mediawiki")
+    options = ("floatfmt", "missingval", "colalign")
+    # the type ranks in the order of tabulate's _more_generic
+    NONE, BOOL, INT, FLOAT, BYTES, STR = range(6)
+    minPadding = 2
+    thousandsRegex = re.compile(
+        r"^(([+-]?[0-9]{1,3})(?:,([0-9]{3}))*)?(?(1)\.[0-9]*|\.[0-9]+)?$"
+    )
+    numberStart = set("0123456789+-.iInN")
+    # control characters that need tabulate's multiline, ANSI or separating line handling
+    specialRegex = re.compile(r"[\x01\x1b\r\n]")
+    ansiRegex = re.compile(r"[\x01\x1b]")
+    latexEscapes = str.maketrans(
+        {
+            "&": r"\&",
+            "%": r"\%",
+            "$": r"\$",
+            "#": r"\#",
+            "_": r"\_",
+            "^": r"\^{}",
+            "{": r"\{",
+            "}": r"\}",
+            "~": r"\textasciitilde{}",
+            "\\": r"\textbackslash{}",
+            "<": r"\ensuremath{<}",
+            ">": r"\ensuremath{>}",
+        }
+    )
+    latexRegex = re.compile(r"[&%$#_^{}~\\<>]")
+    latexAligns = {"left": "l", "right": "r", "center": "c", "decimal": "r"}
+    mediawikiAligns = {
+        "left": "",
+        "right": 'style="text-align: right;"| ',
+        "center": 'style="text-align: center;"| ',
+        "decimal": 'style="text-align: right;"| ',
+    }
+
+    def __init__(
+        self,
+        tablefmt: str = "github",
+        floatfmt: str = "g",
+        missingval: str = "",
+        colalign: Iterable = None,
+    ):
+        """
+        constructor
+
+        Args:
+            tablefmt(str): the table format - github, grid, latex or mediawiki
+            floatfmt(str): the format for float values
+            missingval(str): the text for missing values
+            colalign(Iterable): the alignment per column - left, right, center, decimal or global
+        """
+        if tablefmt not in self.formats:
+            raise Exception(f"table format {tablefmt} is not supported")
+        self.tablefmt = tablefmt
+        self.floatfmt = floatfmt
+        self.missingval = missingval
+        self.colalign = colalign
+        self.padding = 0 if tablefmt == "mediawiki" else 1
+        # grid and github cells with line breaks are multiline in tabulate
+        self.checkRegex = (
+            self.specialRegex if tablefmt in ("grid", "github") else self.ansiRegex
+        )
+
+    @classmethod
+    def tabulate(
+        cls, tabular_data, headers=(), tablefmt: str = "simple", **kwargs
+    ) -> str:
+        """
+        render the given tabular data natively if possible and with tabulate otherwise
+
+        Args:
+            tabular_data(Iterable): a list of dicts or a list of sequences
+            headers: "keys" or the list of headers
+            tablefmt(str): the table format
+            **kwargs: further tabulate options
+
+        Returns:
+            str: the table markup
+        """
+        rows = tabular_data
+        if tablefmt in cls.formats and all(key in cls.options for key in kwargs):
+            options = dict(kwargs)
+            if (
+                isinstance(options.get("colalign"), str)
+                or not isinstance(options.get("floatfmt", ""), str)
+                or not isinstance(options.get("missingval", ""), str)
+                or hasattr(tabular_data, "keys")
+            ):
+                options = None
+            if options is not None:
+                renderer = cls(tablefmt=tablefmt, **options)
+                rows = list(tabular_data)
+                markup = renderer.render(rows, headers=headers)
+                if markup is not None:
+                    return markup
+        from tabulate import tabulate
+
+        return tabulate(rows, headers=headers, tablefmt=tablefmt, **kwargs)
+
+    @staticmethod
+    def widthOf(text: str) -> int:
+        """
+        get the visible width of the given text - wide characters count twice
+        """
+        if wcwidth is None or (text.isascii() and text.isprintable()):
+            return len(text)
+        return wcwidth.wcswidth(text)
+
+    @classmethod
+    def isNumber(cls, text: str) -> bool:
+        """
+        check whether the given text is a number the way tabulate does
+        """
+        try:
+            number = float(text)
+        except (ValueError, TypeError):
+            return False
+        return not (math.isinf(number) or math.isnan(number)) or text.lower() in (
+            "inf",
+            "-inf",
+            "nan",
+        )
+
+    @classmethod
+    def getStrType(cls, text: str) -> int:
+        """
+        get the type rank of the given string
+        """
+        if not text:
+            return cls.NONE
+        if text == "True" or text == "False":
+            return cls.BOOL
+        stripped = text.lstrip()
+        if (
+            not stripped
+            or stripped[0] not in cls.numberStart
+            and not stripped[0].isdigit()
+        ):
+            return cls.STR
+        try:
+            int(text)
+            return cls.INT
+        except ValueError:
+            pass
+        isThousands = cls.thousandsRegex.match(text) is not None
+        if isThousands and "." not in text:
+            return cls.INT
+        if isThousands or cls.isNumber(text):
+            return cls.FLOAT
+        return cls.STR
+
+    @classmethod
+    def getType(cls, value) -> int:
+        """
+        get the type rank of the given value
+
+        Returns:
+            int: the type rank or None if the value needs tabulate
+        """
+        valueType = type(value)
+        if valueType is str:
+            return cls.getStrType(value)
+        if valueType is int:
+            return cls.INT
+        if valueType is float:
+            return cls.FLOAT
+        if value is None:
+            return cls.NONE
+        if valueType is bool:
+            return cls.BOOL
+        if hasattr(value, "isoformat"):
+            return cls.STR
+        if isinstance(value, (bytes, bytearray)):
+            return None
+        if isinstance(value, str):
+            return cls.getStrType(value)
+        if (hasattr(value, "is_integer") or hasattr(value, "__array__")) and str(
+            valueType
+        ).startswith("<class 'numpy.int"):
+            return cls.INT
+        try:
+            float(value)
+            return cls.FLOAT
+        except (ValueError, TypeError):
+            return cls.STR
+
+    def formatCell(self, value, colType: int) -> str:
+        """
+        format the given value according to the type of its column
+        """
+        if value is None:
+            return self.missingval
+        if colType == self.STR:
+            return f"{value}"
+        if colType == self.FLOAT:
+            if isinstance(value, str):
+                if not value:
+                    return ""
+                if "," in value:
+                    value = value.replace(",", "")
+            try:
+                return format(float(value), self.floatfmt)
+            except (ValueError, TypeError):
+                return f"{value}"
+        if colType == self.INT:
+            return format(value, "")
+        return f"{value}"
+
+    def afterPoint(self, text: str) -> int:
+        """
+        get the number of symbols after the decimal point - -1 if there is none
+        """
+        pos = text.rfind(".")
+        if pos < 0:
+            pos = text.lower().rfind("e")
+            if pos < 0:
+                return -1
+        # a text with a point or exponent is never an integer
+        if self.isNumber(text) or self.thousandsRegex.match(text):
+            return len(text) - pos - 1
+        return -1
+
+    def formatColumn(self, column: list, colType: int, align: str) -> list:
+        """
+        format the given column of values according to its type and alignment
+        """
+        missingval = self.missingval
+        if colType == self.STR:
+            cells = [missingval if value is None else f"{value}" for value in column]
+        elif colType == self.INT:
+            cells = [
+                missingval if value is None else format(value, "") for value in column
+            ]
+        else:
+            cells = [self.formatCell(value, colType) for value in column]
+        if align != "decimal":
+            cells = [cell.strip() for cell in cells]
+        return cells
+
+    def getLayout(self, rows: list, headers="keys") -> TableLayout:
+        """
+        get the layout for the given rows
+
+        Args:
+            rows(list): the rows - dicts or sequences
+            headers: "keys" or the list of headers
+
+        Returns:
+            TableLayout: the layout or None if the table needs tabulate
+        """
+        if not rows:
+            return None
+        isDict = hasattr(rows[0], "keys") and hasattr(rows[0], "values")
+        if isDict:
+            if headers != "keys" and (isinstance(headers, str) or headers):
+                return None
+            keyMap = {}
+            for row in rows:
+                for key in row.keys():
+                    keyMap[key] = True
+            keys = list(keyMap.keys())
+            headerList = [str(key) for key in keys] if headers == "keys" else []
+            columns = [[row.get(key) for row in rows] for key in keys]
+        else:
+            if isinstance(headers, (str, dict)):
+                return None
+            keys = None
+            colCount = max(len(row) for row in rows)
+            if isinstance(rows[0], tuple) and hasattr(rows[0], "_fields"):
+                return None
+            headerList = [str(header) for header in headers]
+            if headerList:
+                headerList = [""] * max(0, len(rows[0]) - len(headerList)) + headerList
+                if len(headerList) < colCount:
+                    return None
+                headerList = headerList[:colCount]
+            columns = [
+                [row[col] if col < len(row) else None for row in rows]
+                for col in range(colCount)
+            ]
+        if not columns:
+            return None
+        for header in headerList:
+            if self.specialRegex.search(header):
+                return None
+        colTypes = []
+        for column in columns:
+            colType = self.BOOL
+            for value in column:
+                if type(value) is str:
+                    # once a column is a text column only the control characters matter
+                    if colType < self.STR:
+                        valueType = self.getStrType(value)
+                        if valueType > colType:
+                            colType = valueType
+                    if self.checkRegex.search(value):
+                        return None
+                else:
+                    valueType = self.getType(value)
+                    if valueType is None:
+                        return None
+                    if valueType > colType:
+                        colType = valueType
+                    if valueType == self.STR and self.checkRegex.search(str(value)):
+                        return None
+            colTypes.append(colType)
+        layout = TableLayout(keys, headerList, colTypes)
+        aligns = [
+            "decimal" if colType in (self.INT, self.FLOAT) else "left"
+            for colType in colTypes
+        ]
+        if self.colalign is not None:
+            for col, align in enumerate(self.colalign):
+                if col >= len(aligns):
+                    break
+                if align != "global":
+                    aligns[col] = align
+        for align in aligns:
+            if align not in self.latexAligns:
+                return None
+        layout.aligns = aligns
+        if headerList:
+            widths = [self.widthOf(header) + self.minPadding for header in headerList]
+        else:
+            widths = [None] * len(colTypes)
+        decimals = [-1] * len(colTypes)
+        plain = [False] * len(colTypes)
+        # single pass over the formatted cells which are kept for the output
+        cellColumns = []
+        for col, align in enumerate(aligns):
+            cells = self.formatColumn(columns[col], colTypes[col], align)
+            if align == "decimal":
+                colDecimals = [self.afterPoint(cell) for cell in cells]
+                maxDecimals = max(colDecimals)
+                decimals[col] = maxDecimals
+                cells = [
+                    cell + (maxDecimals - cellDecimals) * " "
+                    for cell, cellDecimals in zip(cells, colDecimals)
+                ]
+            joined = "".join(cells)
+            # without wide or control characters the width is the length
+            plain[col] = joined.isascii() and joined.isprintable()
+            if plain[col] or wcwidth is None:
+                width = max(map(len, cells))
+            else:
+                width = max(map(self.widthOf, cells))
+            if widths[col] is None or width > widths[col]:
+                widths[col] = width
+            cellColumns.append(cells)
+        layout.decimals = decimals
+        layout.widths = widths
+        layout.plain = plain
+        layout.cellColumns = cellColumns
+        return layout
+
+    def getPaddedCells(self, layout: TableLayout, row, padWidths: list) -> list:
+        """
+        get the formatted and padded cells of the given row with the given layout
+
+        Args:
+            layout(TableLayout): the layout
+            row: the row - a dict or a sequence
+            padWidths(list): the widths to pad the cells to
+
+        Returns:
+            list: the padded cells
+        """
+        if layout.keys is not None:
+            values = [row.get(key) for key in layout.keys]
+        else:
+            values = list(row)
+            values.extend([None] * (len(layout.colTypes) - len(values)))
+        cells = []
+        for value, colType, align, width, maxDecimals in zip(
+            values, layout.colTypes, layout.aligns, padWidths, layout.decimals
+        ):
+            cell = self.formatCell(value, colType)
+            if align == "decimal":
+                decimals = self.afterPoint(cell)
+                if maxDecimals > decimals:
+                    cell += (maxDecimals - decimals) * " "
+            else:
+                cell = cell.strip()
+            if not (cell.isascii() and cell.isprintable()):
+                cell = self.padCell(cell, align, width)
+            elif align == "left":
+                cell = cell.ljust(width)
+            elif align == "center":
+                cell = format(cell, f"^{width}")
+            else:
+                cell = cell.rjust(width)
+            cells.append(cell)
+        return cells
+
+    def padCell(self, cell: str, align: str, width: int) -> str:
+        """
+        pad the given cell to the given visible width
+        """
+        padWidth = width - (self.widthOf(cell) - len(cell))
+        if padWidth <= len(cell):
+            return cell
+        if align == "left":
+            return format(cell, f"<{padWidth}")
+        if align == "center":
+            return format(cell, f"^{padWidth}")
+        return format(cell, f">{padWidth}")
+
+    def decorateColumn(self, cells: list, align: str) -> list:
+        """
+        add the padding, alignment attributes and escapes of the table format to the given padded cells of a column
+        """
+        if self.tablefmt == "mediawiki":
+            prefix = f" {self.mediawikiAligns[align]}"
+            return [f"{prefix}{cell} " for cell in cells]
+        cells = [f" {cell} " for cell in cells]
+        if self.tablefmt == "latex" and self.latexRegex.search("".join(cells)):
+            cells = [cell.translate(self.latexEscapes) for cell in cells]
+        return cells
+
+    def getRowLine(self, cells: list, header: bool = False) -> str:
+        """
+        get the markup line for the given decorated cells
+        """
+        if self.tablefmt == "mediawiki":
+            sep = "!" if header else "|"
+            return (sep + (sep * 2).join(cells)).rstrip()
+        if self.tablefmt == "latex":
+            return ("&".join(cells) + "\\\\").rstrip()
+        return ("|" + "|".join(cells) + "|").rstrip()
+
+    def getRule(self, widths: list, fill: str) -> str:
+        """
+        get a horizontal rule for the github or grid format
+        """
+        widths = [width + 2 * self.padding for width in widths]
+        corner = "+" if self.tablefmt == "grid" else "|"
+        return corner + corner.join(fill * width for width in widths) + corner
+
+    def iterLines(
+        self, tabular_data: Iterable, headers="keys", sample: int = None
+    ) -> Iterator[str]:
+        """
+        render the given rows line by line
+
+        Args:
+            tabular_data(Iterable): the rows - dicts or sequences, may be a generator
+            headers: "keys" or the list of headers
+            sample(int): if set derive the layout from this number of rows only and stream the others
+
+        Returns:
+            Iterator[str]: the lines of the table
+        """
+        iterator = iter(tabular_data)
+        if sample is None:
+            head = list(iterator)
+        else:
+            head = list(islice(iterator, sample))
+        layout = self.getLayout(head, headers=headers)
+        if layout is None:
+            from tabulate import tabulate
+
+            rows = chain(head, iterator)
+            kwargs = {"floatfmt": self.floatfmt, "missingval": self.missingval}
+            if self.colalign is not None:
+                kwargs["colalign"] = self.colalign
+            markup = tabulate(rows, headers=headers, tablefmt=self.tablefmt, **kwargs)
+            if markup:
+                yield from markup.split("\n")
+            return
+        yield from self.iterLayoutLines(layout, chain(head, iterator))
+
+    def iterLayoutLines(self, layout: TableLayout, rows: Iterable) -> Iterator[str]:
+        """
+        render the given rows with the given layout line by line
+        """
+        aligns = layout.aligns
+        widths = layout.widths
+        tablefmt = self.tablefmt
+        if tablefmt == "mediawiki":
+            yield '{| class="wikitable" style="text-align: left;"'
+            yield "|+ <!-- caption -->"
+            yield "|-"
+        elif tablefmt == "latex":
+            colspec = "".join(self.latexAligns[align] for align in aligns)
+            yield f"\\begin{{tabular}}{{{colspec}}}"
+            yield "\\hline"
+        elif tablefmt == "grid" or not layout.headers:
+            yield self.getRule(widths, "-")
+        if layout.headers:
+            headerCells = []
+            for header, align, width in zip(layout.headers, aligns, widths):
+                width += len(header) - self.widthOf(header)
+                if align == "left":
+                    headerCells.append(format(header, f"<{width}"))
+                elif align == "center":
+                    headerCells.append(format(header, f"^{width}"))
+                else:
+                    headerCells.append(format(header, f">{width}"))
+            headerCells = [
+                self.decorateColumn([cell], align)[0]
+                for cell, align in zip(headerCells, aligns)
+            ]
+            yield self.getRowLine(headerCells, header=True)
+            if tablefmt == "mediawiki":
+                yield "|-"
+            elif tablefmt == "latex":
+                yield "\\hline"
+            else:
+                yield self.getRule(widths, "=" if tablefmt == "grid" else "-")
+        if tablefmt == "grid":
+            separator = self.getRule(widths, "-")
+        elif tablefmt == "mediawiki":
+            separator = "|-"
+        else:
+            separator = None
+        # control characters have no width - cells are padded to at least 0 like in tabulate
+        padWidths = [max(width, 0) for width in widths]
+        # the rows the layout was derived from are padded by column
+        paddedColumns = []
+        for cells, align, width, plain in zip(
+            layout.cellColumns, aligns, padWidths, layout.plain
+        ):
+            if not plain:
+                cells = [self.padCell(cell, align, width) for cell in cells]
+            elif align == "left":
+                cells = [cell.ljust(width) for cell in cells]
+            elif align == "center":
+                centerFormat = f"^{width}"
+                cells = [format(cell, centerFormat) for cell in cells]
+            else:
+                cells = [cell.rjust(width) for cell in cells]
+            paddedColumns.append(self.decorateColumn(cells, align))
+        layoutRows = len(paddedColumns[0])
+        rows = iter(rows)
+        for _row in islice(rows, layoutRows):
+            pass
+        streamedRows = (
+            [
+                self.decorateColumn([cell], align)[0]
+                for cell, align in zip(
+                    self.getPaddedCells(layout, row, padWidths), aligns
+                )
+            ]
+            for row in rows
+        )
+        first = True
+        for cells in chain(zip(*paddedColumns), streamedRows):
+            if separator is not None and not first:
+                yield separator
+            first = False
+            yield self.getRowLine(cells)
+        if tablefmt == "grid":
+            yield self.getRule(widths, "-")
+        elif tablefmt == "mediawiki":
+            yield "|}"
+        elif tablefmt == "latex":
+            yield "\\hline"
+            yield "\\end{tabular}"
+
+    def render(self, rows: list, headers="keys") -> str:
+        """
+        render the given rows natively
+
+        Args:
+            rows(list): the rows - dicts or sequences
+            headers: "keys" or the list of headers
+
+        Returns:
+            str: the table markup or None if the table needs tabulate
+        """
+        layout = self.getLayout(rows, headers=headers)
+        if layout is None:
+            return None
+        return "\n".join(self.iterLayoutLines(layout, rows))
+
+    def write(
+        self, stream: TextIO, tabular_data: Iterable, headers="keys", sample: int = None
+    ) -> int:
+        """
+        write the table for the given rows to the given stream line by line
+
+        Args:
+            stream(TextIO): the text stream to write to
+            tabular_data(Iterable): the rows - dicts or sequences, may be a generator
+            headers: "keys" or the list of headers
+            sample(int): if set derive the layout from this number of rows only and stream the others
+
+        Returns:
+            int: the number of lines written
+        """
+        count = 0
+        for line in self.iterLines(tabular_data, headers=headers, sample=sample):
+            stream.write(line)
+            stream.write("\n")
+            count += 1
+        return count
@@ -3,7 +3,7 @@ Created on 2021-06-13
 
 @author: wf
 """
-from tabulate import tabulate
+from lodstorage.table_renderer import TableRenderer
 
 
 class TabulateCounter(object):
@@ -31,5 +31,7 @@ class TabulateCounter(object):
             key, count = bintuple
             binTable.append((i + 1, key, count, count / total * 100.0))
 
-        table = tabulate(binTable, headers=headers, tablefmt=tablefmt, floatfmt=".2f")
+        table = TableRenderer.tabulate(
+            binTable, headers=headers, tablefmt=tablefmt, floatfmt=".2f"
+        )
         return table
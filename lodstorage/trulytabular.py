@@ -8,12 +8,15 @@ import logging
 import os
 import re
 import textwrap
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Union
+from typing import Callable, Union
 
 from lodstorage.query import Endpoint, Query, QueryManager, YamlPath
 from lodstorage.sparql import SPARQL
 from lodstorage.version import Version
+from lodstorage.wikidata_metadata import WikidataMetadataCache
 
 
 class Variable:
@@ -68,7 +71,13 @@ class WikidataProperty:
         return text
 
     @classmethod
-    def getPropertiesByLabels(cls, sparql, propertyLabels: list, lang: str = "en"):
+    def getPropertiesByLabels(
+        cls,
+        sparql,
+        propertyLabels: list,
+        lang: str = "en",
+        metadataCache: WikidataMetadataCache = None,
+    ):
         """
         get a list of Wikidata properties by the given label list
 
@@ -76,24 +85,15 @@ class WikidataProperty:
             sparql(SPARQL): the SPARQL endpoint to use
             propertyLabels(list): a list of labels of the properties
             lang(str): the language of the label
+            metadataCache(WikidataMetadataCache): the metadata cache to use - if None the default cache is used
         """
         # the result dict
         wdProperties = {}
         if len(propertyLabels) > 0:
-            valuesClause = ""
-            for propertyLabel in propertyLabels:
-                valuesClause += f'   "{propertyLabel}"@{lang}\n'
-            query = f"""# get the properties for the given labels
-{WikidataItem.getPrefixes(["rdf","rdfs","wikibase"])}
-SELECT ?property ?propertyLabel ?wbType WHERE {{
-  VALUES ?propertyLabel {{
-{valuesClause}
-  }}
-  ?property rdf:type wikibase:Property;rdfs:label ?propertyLabel.
-  ?property wikibase:propertyType  ?wbType.
-  FILTER(LANG(?propertyLabel) = "{lang}")
-}}"""
-            cls.addPropertiesForQuery(wdProperties, sparql, query)
+            if metadataCache is None:
+                metadataCache = WikidataMetadataCache.getDefault()
+            records = metadataCache.getPropertiesByLabels(sparql, propertyLabels, lang)
+            cls.addPropertiesForRecords(wdProperties, records)
         return wdProperties
 
     @classmethod
@@ -119,7 +119,13 @@ SELECT ?property ?propertyLabel ?wbType WHERE {{
         pass
 
     @classmethod
-    def getPropertiesByIds(cls, sparql, propertyIds: list, lang: str = "en"):
+    def getPropertiesByIds(
+        cls,
+        sparql,
+        propertyIds: list,
+        lang: str = "en",
+        metadataCache: WikidataMetadataCache = None,
+    ):
         """
         get a list of Wikidata properties by the given id list
 
@@ -127,25 +133,54 @@ SELECT ?property ?propertyLabel ?wbType WHERE {{
             sparql(SPARQL): the SPARQL endpoint to use
             propertyIds(list): a list of ids of the properties
             lang(str): the language of the label
+            metadataCache(WikidataMetadataCache): the metadata cache to use - if None the default cache is used
         """
         # the result dict
         wdProperties = {}
         if len(propertyIds) > 0:
-            valuesClause = ""
-            for propertyId in propertyIds:
-                valuesClause += f"   wd:{propertyId}\n"
-            query = f"""
-# get the property for the given property Ids
-{WikidataItem.getPrefixes(["rdf","rdfs","wd","wikibase"])}
-SELECT ?property ?propertyLabel ?wbType WHERE {{
-  VALUES ?property {{
-{valuesClause}
-  }}
-  ?property rdf:type wikibase:Property;rdfs:label ?propertyLabel.
-  ?property wikibase:propertyType  ?wbType.
-  FILTER(LANG(?propertyLabel) = "{lang}")
-}}"""
-            cls.addPropertiesForQuery(wdProperties, sparql, query)
+            if metadataCache is None:
+                metadataCache = WikidataMetadataCache.getDefault()
+            records = metadataCache.getProperties(sparql, propertyIds, lang)
+            cls.addPropertiesForRecords(wdProperties, records)
+        return wdProperties
+
+    @classmethod
+    def fromRecord(cls, pid: str, url: str, plabel: str, wbtype: str):
+        """
+        construct a WikidataProperty from the given metadata
+
+        Args:
+            pid(str): the property id
+            url(str): the url of the property
+            plabel(str): the label of the property
+            wbtype(str): the wikibase property type
+        """
+        prop = WikidataProperty(pid)
+        prop.plabel = plabel
+        prop.wbtype = wbtype
+        prop.url = url
+        prop.varname = Variable.validVarName(prop.plabel)
+        prop.valueVarname = (
+            f"{prop.varname}Item"
+            if "WikibaseItem" in prop.wbtype
+            else "" f"{prop.varname}"
+        )
+        prop.labelVarname = f"{prop.varname}"
+        return prop
+
+    @classmethod
+    def addPropertiesForRecords(cls, wdProperties: dict, records: list):
+        """
+        add properties for the given metadata records to the given wdProperties dict
+
+        Args:
+            wdProperties(dict): the wikidata properties by label
+            records(list): the metadata records of a WikidataMetadataCache
+        """
+        for record in records:
+            url = f"http://www.wikidata.org/entity/{record['id']}"
+            prop = cls.fromRecord(record["id"], url, record["label"], record["wbType"])
+            wdProperties[prop.plabel] = prop
         return wdProperties
 
     @classmethod
@@ -162,19 +197,8 @@ SELECT ?property ?propertyLabel ?wbType WHERE {{
         for record in qLod:
             url = record["property"]
             pid = re.sub(r"http://www.wikidata.org/entity/(.*)", r"\1", url)
-            prop = WikidataProperty(pid)
-            prop.plabel = record["propertyLabel"]
-            prop.wbtype = record["wbType"]
-            prop.url = url
+            prop = cls.fromRecord(pid, url, record["propertyLabel"], record["wbType"])
             wdProperties[prop.plabel] = prop
-            prop.varname = Variable.validVarName(prop.plabel)
-            prop.valueVarname = (
-                f"{prop.varname}Item"
-                if "WikibaseItem" in prop.wbtype
-                else "" f"{prop.varname}"
-            )
-            prop.labelVarname = f"{prop.varname}"
-            pass
         return wdProperties
 
 
@@ -184,7 +208,12 @@ class WikidataItem:
     """
 
     def __init__(
-        self, qid: str, lang: str = "en", sparql: SPARQL = None, debug: bool = False
+        self,
+        qid: str,
+        lang: str = "en",
+        sparql: SPARQL = None,
+        debug: bool = False,
+        metadataCache: WikidataMetadataCache = None,
     ):
         """
         construct me with the given item id, language and optional SPARQL access
@@ -194,6 +223,7 @@ class WikidataItem:
             lang(str): the language to use
             sparql(SPARQL): the sparql access to use
             debug(bool): if True switch on debugging
+            metadataCache(WikidataMetadataCache): the metadata cache to use - if None the default cache is used
         """
         if not qid:
             self.qid = None
@@ -205,9 +235,14 @@ class WikidataItem:
         self.lang = lang
         self.sparql = sparql
         if sparql is not None:
-            self.qlabel, self.description = WikidataItem.getLabelAndDescription(
-                sparql, self.qid, self.lang, debug=debug
-            )
+            if metadataCache is None:
+                metadataCache = WikidataMetadataCache.getDefault()
+            records = metadataCache.getItems(sparql, [self.qid], self.lang)
+            if len(records) != 1:
+                msg = f"getLabelAndDescription failed for wikidata Item {self.qid}"
+                raise Exception(msg)
+            self.qlabel = records[0]["label"]
+            self.description = records[0]["description"]
             self.varname = Variable.validVarName(self.qlabel)
             self.itemVarname = f"{self.varname}Item"
             self.labelVarname = f"{self.varname}"
@@ -382,6 +417,11 @@ class TrulyTabular(object):
     checks "how tabular" a query based on a list of properties of an itemclass is
     """
 
+    # maximum number of concurrent queries per endpoint url
+    endpointConcurrency = 4
+    endpointSemaphores = {}
+    endpointSemaphoresLock = threading.Lock()
+
     def __init__(
         self,
         itemQid,
@@ -392,6 +432,9 @@ class TrulyTabular(object):
         endpointConf=None,
         lang="en",
         debug=False,
+        cache=None,
+        maxWorkers: int = 4,
+        metadataCache: WikidataMetadataCache = None,
     ):
         """
         Constructor
@@ -403,29 +446,49 @@ class TrulyTabular(object):
             subclassPredicate(str): the subclass Predicate to use
             where(str): extra where clause for instance selection (if any)
             endpoint(str): the url of the SPARQL endpoint to be used
+            cache(QueryResultCache): the query result cache to use (if any)
+            maxWorkers(int): the maximum number of property statistics to compute concurrently
+            metadataCache(WikidataMetadataCache): the property and item metadata cache to use - if None the default cache is used
         """
         self.itemQid = itemQid
         self.debug = debug
         if endpointConf is None:
             endpointConf = Endpoint.getDefault()
         self.endpointConf = endpointConf
-        self.sparql = SPARQL(endpointConf.endpoint, method=self.endpointConf.method)
+        self.sparql = SPARQL(
+            endpointConf.endpoint,
+            method=self.endpointConf.method,
+            pooled=True,
+            cache=cache,
+        )
         self.sparql.debug = self.debug
         self.subclassPredicate = subclassPredicate
         self.where = f"\n  {where}" if where is not None else ""
         self.lang = lang
+        if metadataCache is None:
+            metadataCache = WikidataMetadataCache.getDefault()
+        self.metadataCache = metadataCache
         self.item = WikidataItem(
-            itemQid, sparql=self.sparql, lang=lang, debug=self.debug
+            itemQid,
+            sparql=self.sparql,
+            lang=lang,
+            debug=self.debug,
+            metadataCache=metadataCache,
         )
         self.queryManager = TrulyTabular.getQueryManager(debug=self.debug)
         self.properties = WikidataProperty.getPropertiesByIds(
-            self.sparql, propertyIds, lang
+            self.sparql, propertyIds, lang, metadataCache=metadataCache
         )
         self.properties.update(
-            WikidataProperty.getPropertiesByLabels(self.sparql, propertyLabels, lang)
+            WikidataProperty.getPropertiesByLabels(
+                self.sparql, propertyLabels, lang, metadataCache=metadataCache
+            )
         )
         self.isodate = datetime.datetime.now().isoformat()
         self.error = None
+        self.maxWorkers = maxWorkers
+        self.itemCount = None
+        self.countLock = threading.Lock()
 
     def __str__(self):
         """
@@ -434,9 +497,54 @@ class TrulyTabular(object):
         """
         return self.asText(long=False)
 
+    @classmethod
+    def getEndpointSemaphore(cls, url: str) -> threading.BoundedSemaphore:
+        """
+        get the semaphore limiting the concurrent queries for the given endpoint url
+
+        Args:
+            url(str): the url of the endpoint
+
+        Returns:
+            threading.BoundedSemaphore: the semaphore shared by all queries to the endpoint
+        """
+        with cls.endpointSemaphoresLock:
+            semaphore = cls.endpointSemaphores.get(url)
+            if semaphore is None:
+                semaphore = threading.BoundedSemaphore(cls.endpointConcurrency)
+                cls.endpointSemaphores[url] = semaphore
+        return semaphore
+
+    def queryAsListOfDicts(self, query: str) -> list:
+        """
+        run the given query respecting the concurrency limit of my endpoint
+
+        Args:
+            query(str): the SPARQL query to run
+
+        Returns:
+            list: the list of dicts of the query result
+        """
+        with self.getEndpointSemaphore(self.endpointConf.endpoint):
+            qlod = self.sparql.queryAsListOfDicts(query)
+        return qlod
+
     def count(self):
         """
-        get my count
+        get my count - the result of the first successful count query is reused
+        """
+        with self.countLock:
+            if self.itemCount is not None:
+                return self.itemCount
+            count, query = self.queryCount()
+            # failed count queries are not cached
+            if count is not None:
+                self.itemCount = (count, query)
+        return count, query
+
+    def queryCount(self):
+        """
+        query my count
         """
         itemText = self.getItemText()
         query = f"""# Count all items with the given type
@@ -449,7 +557,8 @@ WHERE
   ?item {self.subclassPredicate} wd:{self.item.qid}.{self.where}
 }}"""
         try:
-            count = self.sparql.getValue(query, "count")
+            with self.getEndpointSemaphore(self.endpointConf.endpoint):
+                count = self.sparql.getValue(query, "count")
             # workaround https://github.com/ad-freiburg/qlever/issues/717
             count = int(count)
         except Exception as ex:
@@ -722,7 +831,7 @@ ORDER BY DESC(?count)"""
         query = self.noneTabularQuery(wdProperty)
         if self.debug:
             logging.info(query.query)
-        qlod = self.sparql.queryAsListOfDicts(query.query)
+        qlod = self.queryAsListOfDicts(query.query)
         return qlod
 
     def addStatsColWithPercent(
@@ -782,25 +891,96 @@ ORDER BY DESC(?count)"""
         self.addStatsColWithPercent(statsRow, "non tabular", nttotal, total)
         return statsRow
 
-    def genPropertyStatistics(self):
+    def genWdPropertyStatisticSafe(
+        self, wdProperty: WikidataProperty, itemCount: int, withQuery=True
+    ) -> dict:
+        """
+        generate a property Statistics Row for the given wikidata Property
+        returning an error row instead of raising an exception
+
+        Args:
+            wdProperty(WikidataProperty): the property to get the statistics for
+            itemCount(int): the total number of items to check
+            withQuery(bool): if true include the sparql query
+
+        Returns:
+            dict: a statistics row - with an "error" column if the queries failed
+        """
+        try:
+            statsRow = self.genWdPropertyStatistic(wdProperty, itemCount, withQuery)
+        except Exception as ex:
+            statsRow = {"property": wdProperty.plabel, "error": str(ex)}
+            self.addStatsColWithPercent(statsRow, "total", 0, itemCount)
+        return statsRow
+
+    def genPropertyStatistics(
+        self,
+        withQuery=True,
+        progress: Callable = None,
+        maxWorkers: int = None,
+        inCompletionOrder: bool = False,
+    ):
         """
         generate the property Statistics
 
+        the statistics of the properties are computed concurrently if maxWorkers>1
+        and yielded in property order - or as soon as they are available
+        if inCompletionOrder is True
+
+        Args:
+            withQuery(bool): if true include the sparql queries
+            progress(Callable): callback called with (done,total,statsRow) for each row
+            maxWorkers(int): the maximum number of concurrent property statistics - if None my maxWorkers are used
+            inCompletionOrder(bool): if True yield the rows in order of completion instead of property order
+
         Returns:
             generator: a generator of statistic dict rows
         """
+        if maxWorkers is None:
+            maxWorkers = self.maxWorkers
         itemCount, _itemCountQuery = self.count()
-        for wdProperty in self.properties.values():
-            statsRow = self.genWdPropertyStatistic(wdProperty, itemCount)
-            yield statsRow
-
-    def getPropertyStatistics(self):
+        wdProperties = list(self.properties.values())
+        total = len(wdProperties)
+        if maxWorkers <= 1 or total <= 1:
+            for done, wdProperty in enumerate(wdProperties, start=1):
+                statsRow = self.genWdPropertyStatisticSafe(
+                    wdProperty, itemCount, withQuery
+                )
+                if progress is not None:
+                    progress(done, total, statsRow)
+                yield statsRow
+            return
+        executor = ThreadPoolExecutor(max_workers=min(maxWorkers, total))
+        try:
+            futures = [
+                executor.submit(
+                    self.genWdPropertyStatisticSafe, wdProperty, itemCount, withQuery
+                )
+                for wdProperty in wdProperties
+            ]
+            if inCompletionOrder:
+                futures = as_completed(futures)
+            for done, future in enumerate(futures, start=1):
+                statsRow = future.result()
+                if progress is not None:
+                    progress(done, total, statsRow)
+                yield statsRow
+        finally:
+            # cancel the pending futures if the generator is closed early
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def getPropertyStatistics(self, withQuery=True, progress: Callable = None):
         """
         get the property Statistics
+
+        Args:
+            withQuery(bool): if true include the sparql queries
+            progress(Callable): callback called with (done,total,statsRow) for each row
+
+        Returns:
+            list: the sum row followed by a statistics row per property in property order
         """
         itemCount, _itemCountQuery = self.count()
         lod = [{"property": "∑", "total": itemCount, "total%": 100.0}]
-        for wdProperty in self.properties.values():
-            statsRow = self.genWdPropertyStatistic(wdProperty, itemCount)
-            lod.append(statsRow)
+        lod.extend(self.genPropertyStatistics(withQuery, progress))
         return lod
@@ -0,0 +1,569 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+import os
+import re
+import threading
+import time
+
+from lodstorage.sql import SQLDB
+from lodstorage.storageconfig import StorageConfig
+from lodstorage.yamlbackend import YamlBackend
+
+
+class WikidataMetadataCache:
+    """
+    a cache for the labels, descriptions and types of Wikidata properties and items
+
+    lookups for any number of ids or labels are batched into VALUES clause queries
+    of at most chunkSize entries. The results are kept in a sqlite database keyed
+    by the endpoint url, id and language so that the metadata of other Wikibase
+    instances does not mix with the Wikidata metadata. Records are looked up
+    lazily per id and kept in memory once looked up. Ids and labels that could
+    not be resolved are remembered as misses so that they are not queried again.
+    Records and misses older than maxAge seconds are fetched again. The Wikidata
+    endpoint's records of a bundled snapshot of well known properties are used
+    as a fallback and do not expire.
+
+    The database is in memory unless a dbname is given - the shared default
+    cache only uses a database on disk after enableDiskCache has been called.
+
+    :ivar queries(int): the number of SPARQL queries that have been run
+    """
+
+    tableName = "wikidatametadata"
+    missTableName = "wikidatametadatamiss"
+    columns = ["endpoint", "id", "lang", "label", "description", "wbType", "fetched"]
+    snapshotPath = f"{os.path.dirname(__file__)}/../sampledata/wikidata_metadata.yaml"
+    # the endpoint of the snapshot and of lookups without a SPARQL endpoint
+    wikidataEndpoint = "https://query.wikidata.org/sparql"
+    entityRegex = re.compile(r"http://www.wikidata.org/entity/(.*)")
+    default = None
+    defaultLock = threading.Lock()
+    diskCacheFile = None
+
+    def __init__(
+        self,
+        dbname: str = None,
+        snapshotPath: str = None,
+        chunkSize: int = 200,
+        maxAge: float = 30 * 24 * 3600,
+        debug: bool = False,
+    ):
+        """
+        constructor
+
+        Args:
+            dbname(str): the path of the sqlite database - if None an in memory database is used
+            snapshotPath(str): the path of the yaml snapshot to pre-warm from - if None the bundled snapshot is used
+            chunkSize(int): the maximum number of ids or labels per query
+            maxAge(float): the number of seconds after which fetched records and misses are fetched again - if None they never expire
+            debug(bool): if True show debug information
+        """
+        if dbname is None:
+            dbname = SQLDB.RAM
+        if snapshotPath is None:
+            snapshotPath = WikidataMetadataCache.snapshotPath
+        self.chunkSize = chunkSize
+        self.maxAge = maxAge
+        self.debug = debug
+        self.queries = 0
+        self.lock = threading.RLock()
+        # the records and label lookups by key - None if not in the database
+        self.records = {}
+        self.labelIndex = {}
+        # the fetched timestamps of the misses by key - None if not a miss
+        self.misses = {}
+        self.snapshot = {}
+        self.snapshotLabels = {}
+        if snapshotPath and os.path.isfile(snapshotPath):
+            with open(snapshotPath) as yamlFile:
+                for record in YamlBackend.load(yamlFile) or []:
+                    key = (self.wikidataEndpoint, record["id"], record["lang"])
+                    self.snapshot[key] = record
+                    if record.get("wbType"):
+                        labelKey = (
+                            self.wikidataEndpoint,
+                            record["label"],
+                            record["lang"],
+                        )
+                        self.snapshotLabels[labelKey] = record["id"]
+        self.sqlDB = SQLDB(dbname, check_same_thread=False, debug=debug)
+        tableColumns = [
+            row[1]
+            for row in self.sqlDB.c.execute(f"PRAGMA table_info({self.tableName})")
+        ]
+        if tableColumns and tableColumns != self.columns:
+            # a cache table of an older version without endpoints and timestamps
+            self.sqlDB.execute(f"DROP TABLE {self.tableName}")
+        self.sqlDB.execute(
+            f"""CREATE TABLE IF NOT EXISTS {self.tableName}(
+  endpoint TEXT,
+  id TEXT,
+  lang TEXT,
+  label TEXT,
+  description TEXT,
+  wbType TEXT,
+  fetched REAL,
+  PRIMARY KEY(endpoint,id,lang)
+)"""
+        )
+        self.sqlDB.execute(
+            f"""CREATE TABLE IF NOT EXISTS {self.missTableName}(
+  endpoint TEXT,
+  kind TEXT,
+  value TEXT,
+  lang TEXT,
+  fetched REAL,
+  PRIMARY KEY(endpoint,kind,value,lang)
+)"""
+        )
+        self.sqlDB.c.commit()
+
+    @classmethod
+    def enableDiskCache(cls, dbname: str = None):
+        """
+        keep the metadata of the shared default cache in a sqlite database on disk
+
+        Args:
+            dbname(str): the path of the sqlite database - if None wikidatametadata.db in the default cache directory is used
+        """
+        if dbname is None:
+            cachePath = StorageConfig.getDefault().getCachePath()
+            dbname = f"{cachePath}/wikidatametadata.db"
+        with cls.defaultLock:
+            cls.diskCacheFile = dbname
+            cls.default = None
+
+    @classmethod
+    def getDefault(cls) -> "WikidataMetadataCache":
+        """
+        get the shared default cache
+        """
+        with cls.defaultLock:
+            if cls.default is None:
+                cls.default = WikidataMetadataCache(cls.diskCacheFile)
+        return cls.default
+
+    def getEndpoint(self, sparql) -> str:
+        """
+        get the endpoint url the metadata of the given SPARQL endpoint is cached for
+
+        Args:
+            sparql(SPARQL): the SPARQL endpoint - if None the Wikidata endpoint is assumed
+
+        Returns:
+            str: the endpoint url
+        """
+        if sparql is None:
+            return self.wikidataEndpoint
+        return sparql.url
+
+    def lookup(self, endpoint: str, entityId: str, lang: str) -> dict:
+        """
+        look up the record for the given key in memory, the database and the snapshot
+
+        Args:
+            endpoint(str): the url of the endpoint
+            entityId(str): the id e.g. P31
+            lang(str): the language
+
+        Returns:
+            dict: the record (whether expired or not) or None
+        """
+        key = (endpoint, entityId, lang)
+        with self.lock:
+            if key not in self.records:
+                columnList = ",".join(self.columns)
+                row = self.sqlDB.c.execute(
+                    f"SELECT {columnList} FROM {self.tableName} WHERE endpoint=? AND id=? AND lang=?",
+                    key,
+                ).fetchone()
+                record = self.snapshot.get(key)
+                if row is not None:
+                    record = dict(record or {})
+                    for name, value in zip(self.columns[1:], row[1:]):
+                        if value is not None:
+                            record[name] = value
+                elif record is not None:
+                    record = dict(record)
+                self.records[key] = record
+            return self.records[key]
+
+    def lookupLabel(self, endpoint: str, label: str, lang: str) -> str:
+        """
+        look up the id of the property with the given label
+
+        Args:
+            endpoint(str): the url of the endpoint
+            label(str): the label of the property
+            lang(str): the language
+
+        Returns:
+            str: the property id or None
+        """
+        labelKey = (endpoint, label, lang)
+        with self.lock:
+            if labelKey not in self.labelIndex:
+                row = self.sqlDB.c.execute(
+                    f"SELECT id FROM {self.tableName} WHERE endpoint=? AND label=? AND lang=? AND wbType IS NOT NULL",
+                    labelKey,
+                ).fetchone()
+                pid = row[0] if row is not None else self.snapshotLabels.get(labelKey)
+                self.labelIndex[labelKey] = pid
+            return self.labelIndex[labelKey]
+
+    def isExpired(self, fetched: float) -> bool:
+        """
+        check whether something fetched at the given time has expired
+        """
+        if fetched is None or self.maxAge is None:
+            return False
+        return time.time() - fetched > self.maxAge
+
+    def add(self, endpoint: str, record: dict):
+        """
+        add the given record to my in memory index
+
+        Args:
+            endpoint(str): the url of the endpoint the record was fetched from
+            record(dict): the record with id, lang, label and optionally description, wbType and the fetched timestamp
+        """
+        key = (endpoint, record["id"], record["lang"])
+        with self.lock:
+            cached = dict(self.lookup(*key) or {})
+            # keep the fields already known e.g. the description of a property
+            for name, value in record.items():
+                if value is not None:
+                    cached[name] = value
+            self.records[key] = cached
+            if cached.get("wbType"):
+                labelKey = (endpoint, cached["label"], cached["lang"])
+                self.labelIndex[labelKey] = cached["id"]
+
+    def store(self, endpoint: str, records: list):
+        """
+        add the given records to my index and persist them
+
+        Args:
+            endpoint(str): the url of the endpoint the records were fetched from
+            records(list): the list of records to store
+        """
+        fetched = time.time()
+        rows = []
+        with self.lock:
+            for record in records:
+                self.add(endpoint, {**record, "fetched": fetched})
+                cached = self.records[(endpoint, record["id"], record["lang"])]
+                rows.append(
+                    (
+                        endpoint,
+                        cached["id"],
+                        cached["lang"],
+                        cached.get("label"),
+                        cached.get("description"),
+                        cached.get("wbType"),
+                        fetched,
+                    )
+                )
+            self.sqlDB.c.executemany(
+                f"INSERT OR REPLACE INTO {self.tableName} VALUES (?,?,?,?,?,?,?)",
+                rows,
+            )
+            self.sqlDB.c.commit()
+
+    def isMiss(self, endpoint: str, kind: str, value: str, lang: str) -> bool:
+        """
+        check whether the given value could not be resolved when it was last fetched
+
+        Args:
+            endpoint(str): the url of the endpoint
+            kind(str): the kind of lookup - property, label or item
+            value(str): the id or label
+            lang(str): the language
+
+        Returns:
+            bool: True if the value is a miss that has not expired yet
+        """
+        key = (endpoint, kind, value, lang)
+        with self.lock:
+            if key not in self.misses:
+                row = self.sqlDB.c.execute(
+                    f"SELECT fetched FROM {self.missTableName} WHERE endpoint=? AND kind=? AND value=? AND lang=?",
+                    key,
+                ).fetchone()
+                self.misses[key] = row[0] if row is not None else None
+            fetched = self.misses[key]
+        return fetched is not None and not self.isExpired(fetched)
+
+    def storeMisses(self, endpoint: str, kind: str, values: list, lang: str):
+        """
+        remember the given values as not resolvable
+
+        Args:
+            endpoint(str): the url of the endpoint
+            kind(str): the kind of lookup - property, label or item
+            values(list): the ids or labels that could not be resolved
+            lang(str): the language
+        """
+        if not values:
+            return
+        fetched = time.time()
+        rows = [(endpoint, kind, value, lang, fetched) for value in values]
+        with self.lock:
+            for row in rows:
+                self.misses[row[:4]] = fetched
+            self.sqlDB.c.executemany(
+                f"INSERT OR REPLACE INTO {self.missTableName} VALUES (?,?,?,?,?)",
+                rows,
+            )
+            self.sqlDB.c.commit()
+
+    def get(self, entityId: str, lang: str = "en", endpoint: str = None) -> dict:
+        """
+        get the cached record for the given id and language
+
+        Args:
+            entityId(str): the Wikidata id e.g. P31 or Q5
+            lang(str): the language
+            endpoint(str): the url of the endpoint - if None the Wikidata endpoint
+
+        Returns:
+            dict: the record or None if the id is not cached or the record has expired
+        """
+        if endpoint is None:
+            endpoint = self.wikidataEndpoint
+        record = self.lookup(endpoint, entityId, lang)
+        # snapshot records have no fetched timestamp and do not expire
+        if record is not None and self.isExpired(record.get("fetched")):
+            record = None
+        return record
+
+    def refresh(self, endpoint: str = None):
+        """
+        forget the fetched records and misses so that they are fetched again
+
+        Args:
+            endpoint(str): the url of the endpoint to forget the records of - if None the records of all endpoints are forgotten
+        """
+        with self.lock:
+            for cache in [self.records, self.labelIndex, self.misses]:
+                for key in list(cache):
+                    if endpoint in (None, key[0]):
+                        del cache[key]
+            for tableName in [self.tableName, self.missTableName]:
+                if endpoint is None:
+                    self.sqlDB.c.execute(f"DELETE FROM {tableName}")
+                else:
+                    self.sqlDB.c.execute(
+                        f"DELETE FROM {tableName} WHERE endpoint=?", (endpoint,)
+                    )
+            self.sqlDB.c.commit()
+
+    @staticmethod
+    def chunks(values: list, size: int):
+        """
+        split the given values in chunks of the given size
+        """
+        for index in range(0, len(values), size):
+            yield values[index : index + size]
+
+    @staticmethod
+    def asLiteral(label: str, lang: str) -> str:
+        """
+        get the SPARQL language tagged literal for the given label
+        """
+        escaped = label.replace("\\", "\\\\").replace('"', '\\"')
+        return f'"{escaped}"@{lang}'
+
+    def query(self, sparql, query: str) -> list:
+        """
+        run the given metadata query
+
+        Args:
+            sparql(SPARQL): the SPARQL endpoint to use
+            query(str): the query to run
+
+        Returns:
+            list: the list of dicts of the result
+        """
+        if self.debug:
+            print(query)
+        self.queries += 1
+        qlod = sparql.queryAsListOfDicts(query)
+        return qlod
+
+    def fetchProperties(self, sparql, valuesVar: str, values: list, lang: str):
+        """
+        fetch and store the properties for the given VALUES entries
+
+        Args:
+            sparql(SPARQL): the SPARQL endpoint to use
+            valuesVar(str): the variable of the VALUES clause - property or propertyLabel
+            values(list): the SPARQL terms for the VALUES clause
+            lang(str): the language of the labels
+        """
+        for chunk in self.chunks(values, self.chunkSize):
+            valuesClause = "".join(f"   {value}\n" for value in chunk)
+            query = f"""# get the properties for the given {valuesVar} values
+PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
+PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
+PREFIX wd: <http://www.wikidata.org/entity/>
+PREFIX wikibase: <http://wikiba.se/ontology#>
+SELECT ?property ?propertyLabel ?wbType WHERE {{
+  VALUES ?{valuesVar} {{
+{valuesClause}
+  }}
+  ?property rdf:type wikibase:Property;rdfs:label ?propertyLabel.
+  ?property wikibase:propertyType  ?wbType.
+  FILTER(LANG(?propertyLabel) = "{lang}")
+}}"""
+            records = []
+            for row in self.query(sparql, query):
+                pid = self.entityRegex.sub(r"\1", row["property"])
+                record = {
+                    "id": pid,
+                    "lang": lang,
+                    "label": row["propertyLabel"],
+                    "wbType": row["wbType"],
+                }
+                records.append(record)
+            self.store(self.getEndpoint(sparql), records)
+
+    def getProperties(self, sparql, propertyIds: list, lang: str = "en") -> list:
+        """
+        get the records of the properties with the given ids
+
+        Args:
+            sparql(SPARQL): the SPARQL endpoint to use for the ids that are not cached
+            propertyIds(list): the property ids e.g. ["P31","P279"]
+            lang(str): the language of the labels
+
+        Returns:
+            list: the records of the properties found in the order of the given ids
+        """
+        endpoint = self.getEndpoint(sparql)
+        missing = [
+            pid
+            for pid in dict.fromkeys(propertyIds)
+            if self.get(pid, lang, endpoint) is None
+            and not self.isMiss(endpoint, "property", pid, lang)
+        ]
+        if missing:
+            values = [f"wd:{pid}" for pid in missing]
+            self.fetchProperties(sparql, "property", values, lang)
+            misses = [pid for pid in missing if self.get(pid, lang, endpoint) is None]
+            self.storeMisses(endpoint, "property", misses, lang)
+        records = []
+        for pid in propertyIds:
+            record = self.get(pid, lang, endpoint)
+            if record is not None and record.get("wbType"):
+                records.append(record)
+        return records
+
+    def getPropertiesByLabels(
+        self, sparql, propertyLabels: list, lang: str = "en"
+    ) -> list:
+        """
+        get the records of the properties with the given labels
+
+        Args:
+            sparql(SPARQL): the SPARQL endpoint to use for the labels that are not cached
+            propertyLabels(list): the property labels e.g. ["instance of"]
+            lang(str): the language of the labels
+
+        Returns:
+            list: the records of the properties found in the order of the given labels
+        """
+        endpoint = self.getEndpoint(sparql)
+
+        def getRecord(label: str) -> dict:
+            pid = self.lookupLabel(endpoint, label, lang)
+            if pid is None:
+                return None
+            return self.get(pid, lang, endpoint)
+
+        missing = [
+            label
+            for label in dict.fromkeys(propertyLabels)
+            if getRecord(label) is None
+            and not self.isMiss(endpoint, "label", label, lang)
+        ]
+        if missing:
+            values = [self.asLiteral(label, lang) for label in missing]
+            self.fetchProperties(sparql, "propertyLabel", values, lang)
+            misses = [label for label in missing if getRecord(label) is None]
+            self.storeMisses(endpoint, "label", misses, lang)
+        records = []
+        for label in propertyLabels:
+            record = getRecord(label)
+            if record is not None:
+                records.append(record)
+        return records
+
+    def getItems(self, sparql, itemIds: list, lang: str = "en") -> list:
+        """
+        get the records with label and description of the items with the given ids
+
+        Args:
+            sparql(SPARQL): the SPARQL endpoint to use for the ids that are not cached
+            itemIds(list): the item ids e.g. ["Q5"]
+            lang(str): the language of the labels and descriptions
+
+        Returns:
+            list: the records of the items found in the order of the given ids
+        """
+        endpoint = self.getEndpoint(sparql)
+
+        def hasDescription(qid: str) -> bool:
+            record = self.get(qid, lang, endpoint)
+            return record is not None and record.get("description") is not None
+
+        missing = [
+            qid
+            for qid in dict.fromkeys(itemIds)
+            if not hasDescription(qid) and not self.isMiss(endpoint, "item", qid, lang)
+        ]
+        for chunk in self.chunks(missing, self.chunkSize):
+            valuesClause = "".join(f"    wd:{qid}\n" for qid in chunk)
+            query = f"""# get the labels and descriptions for the given items
+PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
+PREFIX schema: <http://schema.org/>
+PREFIX wd: <http://www.wikidata.org/entity/>
+SELECT ?item ?itemLabel ?itemDescription
+WHERE
+{{
+  VALUES ?item {{
+{valuesClause}
+  }}
+  ?item rdfs:label ?itemLabel.
+  FILTER (LANG(?itemLabel) = "{lang}").
+  ?item schema:description ?itemDescription.
+  FILTER(LANG(?itemDescription) = "{lang}")
+}}"""
+            records = []
+            for row in self.query(sparql, query):
+                record = {
+                    "id": self.entityRegex.sub(r"\1", row["item"]),
+                    "lang": lang,
+                    "label": row["itemLabel"],
+                    "description": row["itemDescription"],
+                }
+                records.append(record)
+            self.store(endpoint, records)
+        misses = [qid for qid in missing if not hasDescription(qid)]
+        self.storeMisses(endpoint, "item", misses, lang)
+        records = []
+        for qid in itemIds:
+            record = self.get(qid, lang, endpoint)
+            if record is not None and record.get("description") is not None:
+                records.append(record)
+        return records
+
+    def close(self):
+        """
+        close my database
+        """
+        self.sqlDB.close()
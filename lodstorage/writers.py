@@ -0,0 +1,281 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+import csv
+from abc import ABC, abstractmethod
+from itertools import islice
+from typing import Iterable, TextIO
+
+from lodstorage.jsonbackend import JsonBackend
+from lodstorage.xml import Lod2Xml
+
+
+class LoDWriter(ABC):
+    """
+    streaming writer for a list of dicts
+
+    the records are consumed one at a time from any iterable e.g. the
+    generator of an SQL or SPARQL query and written incrementally to the
+    given text stream so that the first bytes appear immediately and memory
+    use does not depend on the number of records.
+
+    Formats that need the column names up front (csv, tsv and the tables)
+    derive them from the first lookAhead records - keys that first appear
+    later are ignored.
+    """
+
+    lookAhead = 1000
+
+    def __init__(self, stream: TextIO, fields: list = None):
+        """
+        constructor
+
+        Args:
+            stream(TextIO): the text stream to write to
+            fields(list): the column names - if None they are derived from the records
+        """
+        self.stream = stream
+        self.fields = fields
+
+    @staticmethod
+    def getWriter(formatName: str, stream: TextIO, fields: list = None) -> "LoDWriter":
+        """
+        get the streaming writer for the given format
+
+        Args:
+            formatName(str): the name of the format e.g. csv, tsv, json, jsonl, xml, github or mediawiki
+            stream(TextIO): the text stream to write to
+            fields(list): the column names - if None they are derived from the records
+
+        Returns:
+            LoDWriter: the writer
+        """
+        writerClasses = {
+            "csv": CSVWriter,
+            "tsv": TSVWriter,
+            "json": JSONWriter,
+            "jsonl": JSONLWriter,
+            "xml": XMLWriter,
+            "github": GithubTableWriter,
+            "mediawiki": MediaWikiTableWriter,
+        }
+        if formatName not in writerClasses:
+            raise Exception(f"format {formatName} can not be streamed")
+        writerClass = writerClasses[formatName]
+        return writerClass(stream, fields=fields)
+
+    def peekFields(self, lod: Iterable) -> Iterable:
+        """
+        make sure my fields are known by looking at the first records
+
+        Args:
+            lod(Iterable): the records
+
+        Returns:
+            Iterable: the records including the ones looked at
+        """
+        iterator = iter(lod)
+        if self.fields is not None:
+            return iterator
+        head = list(islice(iterator, self.lookAhead))
+        fields = {}
+        for record in head:
+            for key in record.keys():
+                fields[key] = True
+        self.fields = list(fields.keys())
+
+        def records():
+            yield from head
+            yield from iterator
+
+        return records()
+
+    def write(self, lod: Iterable) -> int:
+        """
+        write the given records
+
+        Args:
+            lod(Iterable): the records to write - may be a generator
+
+        Returns:
+            int: the number of records written
+        """
+        count = 0
+        self.writeStart()
+        for record in lod:
+            self.writeRecord(record, count)
+            count += 1
+        self.writeEnd(count)
+        self.stream.flush()
+        return count
+
+    def writeStart(self):
+        """
+        write the start of the document
+        """
+        pass
+
+    @abstractmethod
+    def writeRecord(self, record: dict, index: int):
+        """
+        write the given record
+
+        Args:
+            record(dict): the record
+            index(int): the index of the record
+        """
+        pass
+
+    def writeEnd(self, count: int):
+        """
+        write the end of the document
+
+        Args:
+            count(int): the number of records written
+        """
+        pass
+
+
+class CSVWriter(LoDWriter):
+    """
+    streaming CSV writer - the output is the same as CSV.toCSV
+    """
+
+    delimiter = ","
+
+    def write(self, lod: Iterable) -> int:
+        lod = self.peekFields(lod)
+        self.dictWriter = csv.DictWriter(
+            self.stream,
+            fieldnames=self.fields,
+            delimiter=self.delimiter,
+            quoting=csv.QUOTE_NONNUMERIC,
+            extrasaction="ignore",
+        )
+        return super().write(lod)
+
+    def writeStart(self):
+        self.dictWriter.writeheader()
+
+    def writeRecord(self, record: dict, index: int):
+        self.dictWriter.writerow(record)
+
+
+class TSVWriter(CSVWriter):
+    """
+    streaming tab separated values writer
+    """
+
+    delimiter = "\t"
+
+
+class JSONWriter(LoDWriter):
+    """
+    streaming JSON writer - the output is the same as
+    JsonBackend.dumps(lod, indent=2, sort_keys=True, default=str, nativeDatetime=False)
+    followed by a newline
+    """
+
+    @staticmethod
+    def dumps(record, indent: int = None) -> str:
+        return JsonBackend.dumps(
+            record, indent=indent, sort_keys=True, default=str, nativeDatetime=False
+        )
+
+    def writeStart(self):
+        self.stream.write("[")
+
+    def writeRecord(self, record: dict, index: int):
+        # JSON text has no raw newlines in strings so each line can be indented
+        jsonStr = self.dumps(record, indent=2).replace("\n", "\n  ")
+        self.stream.write(f"{',' if index else ''}\n  {jsonStr}")
+
+    def writeEnd(self, count: int):
+        self.stream.write("\n]\n" if count else "]\n")
+
+
+class JSONLWriter(JSONWriter):
+    """
+    streaming JSON Lines writer - one record per line
+    """
+
+    def writeStart(self):
+        pass
+
+    def writeRecord(self, record: dict, index: int):
+        self.stream.write(self.dumps(record))
+        self.stream.write("\n")
+
+    def writeEnd(self, count: int):
+        pass
+
+
+class XMLWriter(LoDWriter):
+    """
+    streaming XML writer - the output is the same as Lod2Xml(lod).asXml()
+    """
+
+    def __init__(self, stream: TextIO, fields: list = None):
+        super().__init__(stream, fields=fields)
+        self.lod2xml = Lod2Xml([])
+
+    def writeStart(self):
+        self.lod2xml.writeStart(self.stream)
+
+    def writeRecord(self, record: dict, index: int):
+        self.lod2xml.writeRecord(self.stream, record, index)
+
+    def writeEnd(self, count: int):
+        self.lod2xml.writeEnd(self.stream, count)
+
+
+class TableWriter(LoDWriter):
+    """
+    streaming table writer - the columns are not padded since the widths
+    would only be known after the last record
+    """
+
+    def write(self, lod: Iterable) -> int:
+        lod = self.peekFields(lod)
+        return super().write(lod)
+
+    def getCells(self, record: dict) -> list:
+        cells = []
+        for field in self.fields:
+            value = record.get(field)
+            cells.append("" if value is None else str(value))
+        return cells
+
+
+class GithubTableWriter(TableWriter):
+    """
+    streaming github flavored markdown table writer
+    """
+
+    def writeStart(self):
+        self.stream.write(f"| {' | '.join(self.fields)} |\n")
+        self.stream.write(f"|{'|'.join('---' for _field in self.fields)}|\n")
+
+    def writeRecord(self, record: dict, index: int):
+        cells = [cell.replace("|", "\\|") for cell in self.getCells(record)]
+        self.stream.write(f"| {' | '.join(cells)} |\n")
+
+
+class MediaWikiTableWriter(TableWriter):
+    """
+    streaming mediawiki table writer
+    """
+
+    def writeStart(self):
+        self.stream.write('{| class="wikitable" style="text-align: left;"\n')
+        self.stream.write("|-\n")
+        self.stream.write(f"! {' !! '.join(self.fields)}\n")
+
+    def writeRecord(self, record: dict, index: int):
+        self.stream.write("|-\n")
+        self.stream.write(f"| {' || '.join(self.getCells(record))}\n")
+
+    def writeEnd(self, count: int):
+        self.stream.write("|}\n")
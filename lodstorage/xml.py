@@ -1,23 +1,35 @@
 """
 Created on 2022-06-20
 
-see  
+see
     https://github.com/tyleradams/json-toolkit
     https://stackoverflow.com/questions/36021526/converting-an-array-dict-to-xml-in-python
 
 @author: tyleradams
 @author: wf
 """
-from xml.dom.minidom import parseString
-
-from dicttoxml2 import dicttoxml
+import datetime
+import io
+import re
+from numbers import Number
+from typing import TextIO
+from xml.sax.saxutils import escape
 
 
 class Lod2Xml:
     """
     convert a list of dicts to XML
+
+    the XML is written incrementally record by record so that large lists
+    (or generators) of dicts can be exported directly to a file handle.
+    The structure is the one of dicttoxml with attr_type=False - keys that
+    are not valid XML names are fixed the same way - and the pretty printed
+    layout is the one of xml.dom.minidom's toprettyxml.
     """
 
+    nameRegex = re.compile(r"^[^\W\d][\w.\-]*$")
+    entities = {'"': "&quot;"}
+
     def __init__(
         self, lod, root: str = "root", node_name: callable = (lambda x: "node")
     ):
@@ -41,12 +53,187 @@ class Lod2Xml:
             pretty(bool): if True pretty print the result
 
         """
-        xml = dicttoxml(
-            self.lod, custom_root=self.root, item_func=self.item_name, attr_type=False
-        )
+        stream = io.StringIO()
+        self.write(stream, pretty=pretty)
+        xml = stream.getvalue()
+        if not pretty:
+            xml = xml.encode("utf-8")
+        return xml
+
+    def write(self, stream: TextIO, pretty: bool = True, indent: str = "\t") -> int:
+        """
+        write my list of dicts as XML to the given stream one record at a time
+
+        Args:
+            stream(TextIO): the text stream to write to
+            pretty(bool): if True pretty print the result
+            indent(str): the indentation per level for pretty printing
+
+        Returns:
+            int: the number of records written
+        """
+        self.writeStart(stream, pretty)
+        count = 0
+        for record in self.lod:
+            self.writeRecord(stream, record, count, pretty, indent)
+            count += 1
+        self.writeEnd(stream, count, pretty)
+        return count
+
+    def writeStart(self, stream: TextIO, pretty: bool = True):
+        """
+        write the XML declaration to the given stream
+
+        Args:
+            stream(TextIO): the text stream to write to
+            pretty(bool): if True pretty print the result
+        """
         if pretty:
-            dom = parseString(xml)
-            prettyXml = dom.toprettyxml()
+            stream.write('<?xml version="1.0" ?>\n')
+        else:
+            stream.write('<?xml version="1.0" encoding="UTF-8" ?>')
+
+    def writeRecord(
+        self,
+        stream: TextIO,
+        record: dict,
+        index: int,
+        pretty: bool = True,
+        indent: str = "\t",
+    ):
+        """
+        write the given record - the root element is opened before the first record
+
+        Args:
+            stream(TextIO): the text stream to write to
+            record(dict): the record
+            index(int): the index of the record
+            pretty(bool): if True pretty print the result
+            indent(str): the indentation per level for pretty printing
+        """
+        if index == 0:
+            stream.write(f"<{self.root}>\n" if pretty else f"<{self.root}>")
+        nodeName = self.item_name(self.root)
+        parts = []
+        self.addElement(parts, nodeName, "", record, nodeName, 1, pretty, indent)
+        stream.write("".join(parts))
+
+    def writeEnd(self, stream: TextIO, count: int, pretty: bool = True):
+        """
+        close the root element - an empty one if no record was written
+
+        Args:
+            stream(TextIO): the text stream to write to
+            count(int): the number of records written
+            pretty(bool): if True pretty print the result
+        """
+        if count > 0:
+            stream.write(f"</{self.root}>\n" if pretty else f"</{self.root}>")
+        else:
+            stream.write(
+                f"<{self.root}/>\n" if pretty else f"<{self.root}></{self.root}>"
+            )
+
+    @classmethod
+    def escapeText(cls, text: str) -> str:
+        """
+        escape the given text for XML - line breaks are normalized as an XML parser would do
+        """
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+        return escape(text, cls.entities)
+
+    @classmethod
+    def getXmlName(cls, key) -> tuple:
+        """
+        get a valid XML element name for the given key
+
+        Args:
+            key: the key of a dict
+
+        Returns:
+            tuple: the element name and the attribute string
+        """
+        if isinstance(key, str):
+            if cls.nameRegex.match(key):
+                return key, ""
+            if key.isdigit():
+                return f"n{key}", ""
+            underscored = key.replace(" ", "_")
+            if cls.nameRegex.match(underscored):
+                return underscored, ""
+        elif isinstance(key, int):
+            return f"n{key}", ""
+        return "key", f' name="{cls.escapeText(str(key))}"'
+
+    def addElement(
+        self,
+        parts: list,
+        name: str,
+        attrs: str,
+        value,
+        parent: str,
+        level: int,
+        pretty: bool,
+        indent: str,
+    ):
+        """
+        add the XML markup for the element with the given name and value to the given parts
+
+        Args:
+            parts(list): the list of strings to add to
+            name(str): the element name
+            attrs(str): the attribute string
+            value: the value of the element
+            parent(str): the name to derive the names of list items from
+            level(int): the nesting level for the indentation
+            pretty(bool): if True pretty print
+            indent(str): the indentation per level
+        """
+        prefix = indent * level if pretty else ""
+        newl = "\n" if pretty else ""
+        text = None
+        children = None
+        if value is None:
+            text = ""
+        elif isinstance(value, bool):
+            text = str(value)
+        elif isinstance(value, Number):
+            text = str(value)
+        elif isinstance(value, str):
+            text = self.escapeText(value)
+        elif isinstance(value, (datetime.datetime, datetime.date)):
+            text = value.isoformat()
+        elif isinstance(value, dict):
+            children = []
+            for key, childValue in value.items():
+                childName, childAttrs = self.getXmlName(key)
+                # lists are folded: the items are wrapped by the key element
+                self.addElement(
+                    children,
+                    childName,
+                    childAttrs,
+                    childValue,
+                    childName,
+                    level + 1,
+                    pretty,
+                    indent,
+                )
+        elif isinstance(value, (list, tuple)):
+            children = []
+            itemName = self.item_name(parent)
+            for item in value:
+                self.addElement(
+                    children, itemName, "", item, itemName, level + 1, pretty, indent
+                )
+        else:
+            raise TypeError(f"Unsupported data type: {value} ({type(value).__name__})")
+        if children:
+            parts.append(f"{prefix}<{name}{attrs}>{newl}")
+            parts.extend(children)
+            parts.append(f"{prefix}</{name}>{newl}")
+        elif text:
+            parts.append(f"{prefix}<{name}{attrs}>{text}</{name}>{newl}")
+        elif pretty:
+            parts.append(f"{prefix}<{name}{attrs}/>{newl}")
         else:
-            prettyXml = xml
-        return prettyXml
+            parts.append(f"<{name}{attrs}></{name}>")
@@ -30,46 +30,70 @@ Prompts for the development and extension of the 'YamlAble' class within the 'ya
 11. Adhere to instructions and seek clarification for
     any uncertainties.
 12. Add @lod_storable annotation support that will automatically
-    YamlAble support and add @dataclass and @dataclass_json 
-    prerequisite behavior to a class    
+    YamlAble support and add @dataclass prerequisite behavior
+    to a class - the JSON and dict conversion is done by YamlAble
+    itself via the DataclassCodec
     
 """
+import io
+import json
+import sys
 import urllib.request
 from collections.abc import Iterable, Mapping
-from dataclasses import asdict, dataclass, is_dataclass
+from dataclasses import dataclass, is_dataclass
 from datetime import datetime
-from typing import Any, Generic, Type, TypeVar
+from typing import Any, Generic, Iterator, Optional, TextIO, Type, TypeVar
 
 import yaml
-from dacite import from_dict
-from dataclasses_json import dataclass_json
+
+from lodstorage.dataclass_codec import DataclassCodec
+from lodstorage.yamlbackend import YamlBackend
 
 T = TypeVar("T")
 
 
-def lod_storable(cls):
+def lod_storable(cls=None, *, slots: bool = False):
     """
     Decorator to make a class LoDStorable by
     inheriting from YamlAble.
     This decorator also ensures the class is a
-    dataclass and has JSON serialization/deserialization
-    capabilities.
+    dataclass - the JSON serialization/deserialization
+    capabilities are the ones of YamlAble.
+
+    May be used as @lod_storable or @lod_storable(slots=True)
+
+    Args:
+        cls: the class to decorate
+        slots: if True create a slotted dataclass without per instance __dict__
+            for compact records (needs Python 3.10 or later)
     """
-    cls = dataclass(cls)  # Apply the @dataclass decorator
-    cls = dataclass_json(cls)  # Apply the @dataclass_json decorator
 
-    class LoDStorable(YamlAble, cls):
-        """
-        decorator class
-        """
+    def wrap(cls):
+        if slots:
+            if sys.version_info < (3, 10):
+                raise ValueError("lod_storable(slots=True) needs Python 3.10 or later")
+            # Apply the @dataclass decorator
+            cls = dataclass(cls, slots=True)
+        else:
+            cls = dataclass(cls)  # Apply the @dataclass decorator
+
+        class LoDStorable(YamlAble, cls):
+            """
+            decorator class
+            """
 
-        __qualname__ = cls.__qualname__
-        pass
+            __qualname__ = cls.__qualname__
+            if slots:
+                __slots__ = ()
 
-    LoDStorable.__name__ = cls.__name__
-    LoDStorable.__doc__ = cls.__doc__
+        LoDStorable.__name__ = cls.__name__
+        LoDStorable.__doc__ = cls.__doc__
 
-    return LoDStorable
+        return LoDStorable
+
+    if cls is None:
+        return wrap
+    return wrap(cls)
 
 
 class DateConvert:
@@ -83,31 +107,48 @@ class DateConvert:
         return date
 
 
+class YamlAbleDumper(YamlBackend.getBaseDumper()):
+    """
+    the dumper for YamlAble - a dedicated subclass so that the custom
+    representers do not modify the global yaml.Dumper
+    """
+
+    def ignore_aliases(self, _data) -> bool:
+        return True
+
+
 class YamlAble(Generic[T]):
     """
     An extended YAML handler class for converting dataclass objects to and from YAML format,
     and handling loading from and saving to files and URLs.
     """
 
+    # no per instance state - allows slotted subclasses
+    __slots__ = ()
+    _yaml_dumper = None
+
     def _yaml_setup(self):
         """
         Initializes the YamAble handler, setting up custom representers and preparing it for various operations.
         """
         if not is_dataclass(self):
             raise ValueError("I must be a dataclass instance.")
-        if not hasattr(self, "_yaml_dumper"):
-            self._yaml_dumper = yaml.Dumper
-            self._yaml_dumper.ignore_aliases = lambda *_args: True
-            self._yaml_dumper.add_representer(type(None), self.represent_none)
-            self._yaml_dumper.add_representer(str, self.represent_literal)
-
-    def represent_none(self, _, __) -> yaml.Node:
+        if YamlAble._yaml_dumper is None:
+            # static representers - a bound method would keep this instance alive
+            dumper = YamlAbleDumper
+            dumper.add_representer(type(None), YamlAble.represent_none)
+            dumper.add_representer(str, YamlAble.represent_literal)
+            YamlAble._yaml_dumper = dumper
+
+    @staticmethod
+    def represent_none(dumper: yaml.Dumper, _) -> yaml.Node:
         """
         Custom representer for ignoring None values in the YAML output.
         """
-        return self._yaml_dumper.represent_scalar("tag:yaml.org,2002:null", "")
+        return dumper.represent_scalar("tag:yaml.org,2002:null", "")
 
-    def represent_literal(self, dumper: yaml.Dumper, data: str) -> yaml.Node:
+    @staticmethod
+    def represent_literal(dumper: yaml.Dumper, data: str) -> yaml.Node:
         """
         Custom representer for block scalar style for strings.
         """
@@ -135,11 +176,9 @@ class YamlAble(Generic[T]):
         Returns:
             A string representation of the dataclass object in YAML format.
         """
-        obj_dict = asdict(self)
         self._yaml_setup()
-        clean_dict = self.remove_ignored_values(
-            obj_dict, ignore_none, ignore_underscore
-        )
+        codec = DataclassCodec.forClass(type(self))
+        clean_dict = codec.toCleanDict(self, ignore_none, ignore_underscore)
         yaml_str = yaml.dump(
             clean_dict,
             Dumper=self._yaml_dumper,
@@ -160,10 +199,141 @@ class YamlAble(Generic[T]):
         Returns:
             T: An instance of the dataclass.
         """
-        data: dict[str, Any] = yaml.safe_load(yaml_str)
-        instance: T = cls.from_dict(data)
+        data: dict[str, Any] = YamlBackend.load(yaml_str)
+        instance: T = DataclassCodec.forClass(cls).fromDict(data)
         return instance
 
+    @classmethod
+    def load_all(cls: Type[T], stream) -> Iterator[T]:
+        """
+        Deserializes the documents of a multi document YAML stream
+        to dataclass instances one at a time.
+
+        Args:
+            stream: the YAML text or a file like object
+
+        Returns:
+            Iterator[T]: a generator of instances of the dataclass
+        """
+        codec = DataclassCodec.forClass(cls)
+        for data in YamlBackend.load_all(stream):
+            if data is not None:
+                yield codec.fromDict(data)
+
+    @classmethod
+    def dump_all(
+        cls,
+        instances: Iterable,
+        stream: Optional[TextIO] = None,
+        ignore_none: bool = True,
+        ignore_underscore: bool = True,
+        allow_unicode: bool = True,
+        sort_keys: bool = False,
+    ) -> Optional[str]:
+        """
+        Serializes the given dataclass instances as a multi document YAML stream
+        one instance at a time.
+
+        Args:
+            instances: the instances to serialize - may be a generator
+            stream: the file like object to write to - if None a string is returned
+            ignore_none: Flag to indicate whether None values should be removed from the YAML output.
+            ignore_underscore: Flag to indicate whether attributes starting with an underscore should be excluded from the YAML output.
+            allow_unicode: Flag to indicate whether to allow unicode characters in the output.
+            sort_keys: Flag to indicate whether to sort the dictionary keys in the output.
+
+        Returns:
+            Optional[str]: the YAML text if no stream was given
+        """
+
+        def clean_dicts():
+            for instance in instances:
+                instance._yaml_setup()
+                codec = DataclassCodec.forClass(type(instance))
+                yield codec.toCleanDict(instance, ignore_none, ignore_underscore)
+
+        output = io.StringIO() if stream is None else stream
+        yaml.dump_all(
+            clean_dicts(),
+            output,
+            Dumper=YamlAbleDumper,
+            default_flow_style=False,
+            allow_unicode=allow_unicode,
+            sort_keys=sort_keys,
+        )
+        if stream is None:
+            return output.getvalue()
+        return None
+
+    @classmethod
+    def from_dict(cls: Type[T], kvs: dict, *, infer_missing: bool = False) -> T:
+        """
+        Creates an instance of the dataclass from a dictionary
+        using the compiled codec of the class.
+
+        Args:
+            kvs (dict): the dictionary - keys that are not fields are ignored
+            infer_missing (bool): if True missing fields without default are set to None
+
+        Returns:
+            T: An instance of the dataclass.
+        """
+        instance: T = DataclassCodec.forClass(cls).fromDict(
+            kvs, inferMissing=infer_missing
+        )
+        return instance
+
+    def to_dict(self, encode_json: bool = False) -> dict:
+        """
+        Converts this dataclass object to a dictionary of plain values.
+
+        Args:
+            encode_json (bool): if True encode values json can't handle e.g. datetimes as timestamps
+
+        Returns:
+            dict: the dictionary
+        """
+        obj_dict = DataclassCodec.forClass(type(self)).toDict(self)
+        if encode_json:
+            obj_dict = json.loads(
+                json.dumps(obj_dict, default=DataclassCodec.jsonDefault)
+            )
+        return obj_dict
+
+    @classmethod
+    def from_json(cls: Type[T], json_str: str, **kwargs) -> T:
+        """
+        Deserializes a JSON string to a dataclass instance.
+
+        Args:
+            json_str (str): A string containing JSON formatted data.
+            **kwargs: additional keyword arguments for json.loads
+
+        Returns:
+            T: An instance of the dataclass.
+        """
+        data: dict[str, Any] = json.loads(json_str, **kwargs)
+        instance: T = DataclassCodec.forClass(cls).fromDict(data)
+        return instance
+
+    def to_json(self, *, default=None, **kwargs) -> str:
+        """
+        Converts this dataclass object to a JSON string.
+        Datetimes are encoded as timestamps as done by dataclasses_json.
+
+        Args:
+            default: function to get a serializable version of otherwise unsupported objects
+            **kwargs: additional keyword arguments for json.dumps e.g. indent
+
+        Returns:
+            str: the JSON string
+        """
+        obj_dict = DataclassCodec.forClass(type(self)).toDict(self)
+        json_str = json.dumps(
+            obj_dict, default=default or DataclassCodec.jsonDefault, **kwargs
+        )
+        return json_str
+
     @classmethod
     def load_from_yaml_file(cls: Type[T], filename: str) -> T:
         """
@@ -317,8 +487,13 @@ class YamlAble(Generic[T]):
     def from_dict2(cls: Type[T], data: dict) -> T:
         """
         Creates an instance of a dataclass from a dictionary, typically used in deserialization.
+
+        unlike from_dict the values are strictly checked with dacite e.g. a
+        wrong type raises a WrongTypeError and a missing field a MissingValueError
         """
         if not data:
             return None
+        from dacite import from_dict
+
         instance = from_dict(data_class=cls, data=data)
         return instance
@@ -4,9 +4,6 @@
 import io
 import os
 
-# Yaml persistence
-import yaml
-
 
 class YamlAbleMixin(object):
     """allow reading and writing derived objects from a yaml file"""
@@ -21,6 +18,9 @@ class YamlAbleMixin(object):
             yamlFile = yamlFile + ".yaml"
         # is there a yamlFile for the given name
         if os.path.isfile(yamlFile):
+            # Yaml persistence - imported on first use
+            import yaml
+
             with io.open(yamlFile, "r") as stream:
                 if YamlAbleMixin.debug:
                     print("reading %s" % (yamlFile))
@@ -36,6 +36,8 @@ class YamlAbleMixin(object):
         yamlFile = name
         if not yamlFile.endswith(".yaml"):
             yamlFile = yamlFile + ".yaml"
+        import yaml
+
         with io.open(yamlFile, "w", encoding="utf-8") as stream:
             yaml.dump(self, stream)
             if YamlAbleMixin.debug:
@@ -0,0 +1,198 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+import os
+import pickle
+import threading
+from typing import Iterator
+
+
+class YamlBackend:
+    """
+    YAML loading and dumping using the libyaml based C implementation
+    of PyYAML (CSafeLoader/CDumper) if available and the pure Python
+    implementation otherwise
+
+    PyYAML is only imported on first use so that e.g. the command line
+    does not pay for it when the YAML files are found in the disk cache
+
+    :ivar SafeLoader: the safe loader class in use - None before the first use
+    :ivar BaseDumper: the dumper class in use - None before the first use
+    """
+
+    SafeLoader = None
+    BaseDumper = None
+
+    @classmethod
+    def getSafeLoader(cls):
+        """
+        import PyYAML and select the loader and dumper classes if not done yet
+
+        Returns:
+            the safe loader class in use
+        """
+        if cls.SafeLoader is None:
+            try:
+                from yaml import CDumper as BaseDumper
+                from yaml import CSafeLoader as SafeLoader
+            except ImportError:
+                from yaml import Dumper as BaseDumper
+                from yaml import SafeLoader
+            cls.BaseDumper = BaseDumper
+            cls.SafeLoader = SafeLoader
+        return cls.SafeLoader
+
+    @classmethod
+    def getBaseDumper(cls):
+        """
+        Returns:
+            the dumper class in use
+        """
+        cls.getSafeLoader()
+        return cls.BaseDumper
+
+    @classmethod
+    def name(cls) -> str:
+        """
+        Returns:
+            str: the name of the backend in use
+        """
+        return "libyaml" if cls.getSafeLoader().__name__.startswith("C") else "pyyaml"
+
+    @classmethod
+    def load(cls, stream):
+        """
+        safely load a single YAML document
+
+        Args:
+            stream: the YAML text or a file like object
+
+        Returns:
+            the loaded data
+        """
+        import yaml
+
+        return yaml.load(stream, Loader=cls.getSafeLoader())
+
+    @classmethod
+    def load_all(cls, stream) -> Iterator:
+        """
+        safely load the documents of a multi document YAML stream one at a time
+
+        Args:
+            stream: the YAML text or a file like object
+
+        Returns:
+            Iterator: a generator of the loaded documents
+        """
+        import yaml
+
+        return yaml.load_all(stream, Loader=cls.getSafeLoader())
+
+
+class YamlFileCache:
+    """
+    process wide cache of parsed YAML files
+
+    a file is only parsed again if its modification time or size changed.
+    Optionally the parsed content is also kept in a pickle file on disk so
+    that e.g. command line tools don't need to parse the YAML files on start-up.
+    The cached data is shared - callers must not modify it.
+
+    :ivar parses(int): the number of YAML files that have been parsed
+    """
+
+    entries = {}
+    lock = threading.RLock()
+    diskCacheFile = None
+    diskCacheLoaded = False
+    parses = 0
+
+    @classmethod
+    def enableDiskCache(cls, diskCacheFile: str = None):
+        """
+        enable the disk cache
+
+        Args:
+            diskCacheFile(str): the path of the pickle file - if None yamlcache.pickle in the default cache directory is used
+        """
+        if diskCacheFile is None:
+            from lodstorage.storageconfig import StorageConfig
+
+            cachePath = StorageConfig.getDefault().getCachePath()
+            diskCacheFile = f"{cachePath}/yamlcache.pickle"
+        with cls.lock:
+            cls.diskCacheFile = diskCacheFile
+            cls.diskCacheLoaded = False
+
+    @classmethod
+    def clear(cls):
+        """
+        clear the in memory cache and disable the disk cache
+        """
+        with cls.lock:
+            cls.entries = {}
+            cls.diskCacheFile = None
+            cls.diskCacheLoaded = False
+
+    @classmethod
+    def loadDiskCache(cls):
+        """
+        merge the entries of the disk cache into the in memory cache once
+        """
+        if cls.diskCacheFile is None or cls.diskCacheLoaded:
+            return
+        cls.diskCacheLoaded = True
+        try:
+            with open(cls.diskCacheFile, "rb") as pickleFile:
+                diskEntries = pickle.load(pickleFile)
+            for path, entry in diskEntries.items():
+                cls.entries.setdefault(path, entry)
+        except Exception:
+            # missing or unreadable disk cache - the files will be parsed
+            pass
+
+    @classmethod
+    def storeDiskCache(cls):
+        """
+        write the in memory cache to the disk cache file (if enabled)
+        """
+        if cls.diskCacheFile is None:
+            return
+        tmpFile = f"{cls.diskCacheFile}.{os.getpid()}.tmp"
+        try:
+            with open(tmpFile, "wb") as pickleFile:
+                pickle.dump(cls.entries, pickleFile, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmpFile, cls.diskCacheFile)
+        except OSError:
+            # the cache is an optimization only
+            pass
+
+    @classmethod
+    def load(cls, path: str):
+        """
+        get the parsed content of the given YAML file
+
+        Args:
+            path(str): the path of the YAML file
+
+        Returns:
+            the parsed content - shared, must not be modified
+        """
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        with cls.lock:
+            cls.loadDiskCache()
+            entry = cls.entries.get(path)
+            if entry is not None and entry[0] == signature:
+                return entry[1]
+        with open(path, "r") as stream:
+            data = YamlBackend.load(stream)
+        with cls.lock:
+            cls.parses += 1
+            cls.entries[path] = (signature, data)
+            cls.storeDiskCache()
+        return data
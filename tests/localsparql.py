@@ -0,0 +1,104 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from rdflib import Graph
+
+
+class LocalSPARQLServer:
+    """
+    a minimal local SPARQL endpoint backed by an rdflib graph
+    for testing without network access
+
+    :ivar queries(list): the queries that have been received
+    :ivar connections(int): the number of TCP connections that have been accepted
+    :ivar delay(float): the time in seconds to wait before answering a query
+    :ivar maxActive(int): the maximum number of queries that have been answered concurrently
+    """
+
+    def __init__(self, graph: Graph = None):
+        """
+        construct me for the given graph
+
+        Args:
+            graph(Graph): the rdflib graph to query - an empty graph if None
+        """
+        self.graph = graph if graph is not None else Graph()
+        self.queries = []
+        self.connections = 0
+        self.delay = 0
+        self.active = 0
+        self.maxActive = 0
+        self.lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                with server.lock:
+                    server.connections += 1
+                super().setup()
+
+            def log_message(self, *_args):
+                pass
+
+            def do_GET(self):
+                params = parse_qs(urlparse(self.path).query)
+                self.answer(params["query"][0])
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = self.rfile.read(length).decode()
+                params = parse_qs(body)
+                self.answer(params["query"][0])
+
+            def answer(self, query: str):
+                with server.lock:
+                    server.queries.append(query)
+                    server.active += 1
+                    server.maxActive = max(server.maxActive, server.active)
+                if server.delay:
+                    time.sleep(server.delay)
+                with server.lock:
+                    server.active -= 1
+                    result = server.graph.query(query)
+                payload = result.serialize(format="json")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/sparql-results+json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_port}/sparql"
+
+    def start(self) -> "LocalSPARQLServer":
+        """
+        start serving in a daemon thread
+        """
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        """
+        stop serving
+        """
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    @classmethod
+    def fromTurtle(cls, turtle: str) -> "LocalSPARQLServer":
+        """
+        create a started server for the given turtle content
+        """
+        graph = Graph()
+        graph.parse(data=turtle, format="turtle")
+        return cls(graph).start()
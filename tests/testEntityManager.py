@@ -68,6 +68,8 @@ class TestEntityManager(Basetest):
                 StorageConfig.getDefault(debug=self.debug),
                 StorageConfig.getJSON(debug=self.debug),
                 StorageConfig.getJsonPickle(self.debug),
+                StorageConfig.getJSONL(debug=self.debug),
+                StorageConfig.getJSONL(debug=self.debug, compression="gz"),
             ]:
                 self.configure(config)
                 name = "royal" if i == 0 else "royalorm"
@@ -106,6 +108,34 @@ class TestEntityManager(Basetest):
                     )
             pass
 
+    def testJsonLines(self):
+        """
+        test the JSON Lines store mode with appends and parallel parsing
+        """
+        config = StorageConfig.getJSONL(compression="gz")
+        self.configure(config)
+        em = EntityManager(
+            name="royaljsonl",
+            entityName="Royal",
+            entityPluralName="Royals",
+            clazz=Royal,
+            listName="royals",
+            config=config,
+        )
+        royals = Sample.getRoyals()
+        cacheFile = em.storeLoD(royals[:2])
+        self.assertTrue(cacheFile.endswith(".jsonl.gz"))
+        em.storeLoD(royals[2:], append=True)
+        lod = em.fromStore()
+        self.assertEqual(len(royals), len(lod))
+        # types are fixed from the samples
+        self.assertEqual(royals[0]["born"], lod[0]["born"])
+        self.assertEqual(royals[-1]["name"], em.getList()[-1].name)
+        parsed = list(em.readLodFromJsonLinesFile(cacheFile, chunkSize=1, maxWorkers=2))
+        self.assertEqual(lod, parsed)
+        em.removeCacheFile()
+        self.assertFalse(em.isCached())
+
 
 if __name__ == "__main__":
     # import sys;sys.argv = ['', 'Test.testName']
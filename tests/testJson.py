@@ -8,7 +8,13 @@ import tempfile
 import time
 import unittest
 
-from lodstorage.jsonable import JSONAble, JSONAbleList, Types
+from lodstorage.jsonable import (
+    HydrationPlan,
+    JSONAble,
+    JSONAbleBase,
+    JSONAbleList,
+    Types,
+)
 from lodstorage.sample import Cities, Royal, Royals, RoyalsORMList
 from tests.basetest import Basetest
 
@@ -18,6 +24,35 @@ class ServerConfig(JSONAble):
         pass
 
 
+class Temperature(JSONAble):
+    """
+    a class with a property and a default set in the constructor
+    """
+
+    def __init__(self):
+        self.unit = "C"
+
+    @property
+    def celsius(self):
+        return self.value
+
+    @celsius.setter
+    def celsius(self, value):
+        self.value = float(value)
+
+
+class CompactRoyal(JSONAbleBase):
+    """
+    a slotted Royal without per instance __dict__
+    """
+
+    __slots__ = ("name", "born", "numberInLine")
+
+    @classmethod
+    def getSamples(cls):
+        return Royal.getSamples()[:2]
+
+
 class TestJsonAble(Basetest):
     """
     test JSON serialization with JsonAble mixin
@@ -314,6 +349,89 @@ class TestJsonAble(Basetest):
         actualJSON = royal.toJSON(limitToSampleFields=True)
         self.assertEqual(actualJSON, expectedJSON)
 
+    def testBulkHydration(self):
+        """
+        test the bulk creation of instances from a list of dicts
+        """
+        royals = RoyalsORMList()
+        lod = Royal.getSamples()
+        errors = royals.fromLoD(lod, append=False)
+        self.assertEqual(0, len(errors))
+        self.assertTrue(HydrationPlan.forClass(Royal).bulk)
+        self.assertEqual(lod[1]["name"], royals.royals[1].name)
+        # the instances do not share the record dicts
+        self.assertFalse(royals.royals[0].__dict__ is lod[0])
+        temperatures = JSONAbleList("temperatures", clazz=Temperature)
+        lod = [
+            {"celsius": "21.5"},
+            None,
+            {"value": 3.0},
+            {1: "invalid key"},
+            {"value": 4.0, "unit": "K"},
+        ]
+        errors = temperatures.fromLoD(lod)
+        self.assertEqual(2, len(errors))
+        values = [(t.value, t.unit) for t in temperatures.temperatures]
+        # the property setter is used and the order is kept
+        self.assertEqual([(21.5, "C"), (3.0, "C"), (4.0, "K")], values)
+        if self.doProfile:
+            lod = [{"name": f"royal {i}", "age": i} for i in range(100000)]
+            for bulk in [False, True]:
+                HydrationPlan.forClass(Royal).bulk = bulk
+                starttime = time.time()
+                royals.fromLoD(lod, append=False)
+                print(
+                    f"fromLoD bulk={bulk} for {len(lod)} records took {time.time()-starttime:5.2f} s"
+                )
+
+    def testHydrationPlan(self):
+        """
+        test that the plan does not create instances and that its cache is bounded
+        """
+        created = []
+
+        class Counted(JSONAble):
+            def __init__(self):
+                created.append(self)
+
+        plan = HydrationPlan(Counted)
+        self.assertTrue(plan.bulk)
+        self.assertEqual(0, len(created))
+        self.assertFalse(HydrationPlan(CompactRoyal).bulk)
+        maxPlans = HydrationPlan.maxPlans
+        try:
+            HydrationPlan.maxPlans = 2
+            for _i in range(3):
+                HydrationPlan.forClass(type("Dynamic", (JSONAble,), {}))
+            self.assertLessEqual(len(HydrationPlan.plans), 2)
+        finally:
+            HydrationPlan.maxPlans = maxPlans
+
+    def testSlots(self):
+        """
+        test JSON serialization of slotted records
+        """
+        lod = [
+            {"name": royal["name"], "born": royal["born"], "numberInLine": i}
+            for i, royal in enumerate(Royal.getSamples())
+        ]
+        royals = JSONAbleList("royals", clazz=CompactRoyal)
+        errors = royals.fromLoD(lod)
+        self.assertEqual(0, len(errors))
+        royal = royals.royals[1]
+        self.assertFalse(hasattr(royal, "__dict__"))
+        self.assertEqual(lod[1], JSONAble.getAttrs(royal))
+        jsonStr = royals.toJSON()
+        jsonLod = json.loads(jsonStr)["royals"]
+        self.assertEqual(lod[1]["name"], jsonLod[1]["name"])
+        self.assertEqual(lod[1]["born"].isoformat(), jsonLod[1]["born"])
+        self.assertIn('"numberInLine": 1', royal.asJSON())
+        limitedJson = json.loads(royal.toJSON(limitToSampleFields=True))
+        self.assertEqual(1, limitedJson["numberInLine"])
+        # unknown attributes can't be set on slotted records
+        errors = royals.fromLoD([{"name": "Test", "unknown": 1}])
+        self.assertEqual(1, len(errors))
+
 
 if __name__ == "__main__":
     # import sys;sys.argv = ['', 'Test.testName']
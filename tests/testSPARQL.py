@@ -11,10 +11,11 @@ import warnings
 from SPARQLWrapper import SPARQLExceptions
 
 from lodstorage.lod import LOD
-from lodstorage.query import Query
+from lodstorage.query import Endpoint, Query
 from lodstorage.sample import Sample
 from lodstorage.sparql import SPARQL
 from tests.basetest import Basetest
+from tests.localsparql import LocalSPARQLServer
 
 
 class TestSPARQL(Basetest):
@@ -456,6 +457,57 @@ ORDER BY DESC (?frequency)
 """
         lod = wd.queryAsListOfDicts(sparql_query)
 
+    def testPooledSession(self):
+        """
+        test that pooled SPARQL instances share a keep-alive session
+        """
+        server = LocalSPARQLServer.fromTurtle(
+            """@prefix ex: <http://example.org/> .
+ex:a ex:value 1 .
+ex:b ex:value 2 .
+ex:c ex:value "three" ."""
+        )
+        try:
+            sparql1 = SPARQL(server.url, pooled=True)
+            sparql2 = SPARQL(server.url, pooled=True)
+            self.assertIs(sparql1.session, sparql2.session)
+            query = """PREFIX ex: <http://example.org/>
+SELECT ?s ?value WHERE { ?s ex:value ?value } ORDER BY ?s"""
+            for method in ["POST", "GET"]:
+                for sparql in [sparql1, sparql2]:
+                    sparql.method = method
+                    lod = sparql.queryAsListOfDicts(query)
+                    self.assertEqual(3, len(lod))
+                    self.assertEqual(1, lod[0]["value"])
+                    self.assertEqual("three", lod[2]["value"])
+            self.assertEqual(4, len(server.queries))
+            self.assertEqual(1, server.connections)
+        finally:
+            server.stop()
+
+    def testQueryType(self):
+        """
+        test the detection of the query type and the pooled sessions of endpoint configurations
+        """
+        for queryString, expected in [
+            ("PREFIX ex: <http://example.org/#>\n# comment\nselect * {}", "SELECT"),
+            ("BASE <http://example.org/>\nCONSTRUCT {} WHERE {}", "CONSTRUCT"),
+            ("# SELECT\nASK { ?s ?p ?o }", "ASK"),
+            ("", None),
+        ]:
+            self.assertEqual(expected, SPARQL.getQueryType(queryString), queryString)
+        endpointConf = Endpoint()
+        endpointConf.endpoint = "http://localhost:1/sparql"
+        sparql = SPARQL.fromEndpointConf(endpointConf, pooled=False)
+        self.assertIsNone(sparql.session)
+        sparql = SPARQL.fromEndpointConf(endpointConf)
+        self.assertIs(sparql.session, SPARQL.fromEndpointConf(endpointConf).session)
+        SPARQL.closeSessions(endpointConf.endpoint)
+        self.assertNotIn(endpointConf.endpoint, SPARQL.sessions)
+        other = SPARQL.fromEndpointConf(endpointConf)
+        self.assertIsNot(sparql.session, other.session)
+        SPARQL.closeSessions(endpointConf.endpoint)
+
 
 if __name__ == "__main__":
     # import sys;sys.argv = ['', 'Test.testName']
@@ -0,0 +1,252 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+import datetime
+import enum
+import sys
+import time
+import unittest
+from dataclasses import asdict, field
+from typing import Dict, List, Optional, Tuple, Union
+
+import dacite
+import yaml
+from dacite import MissingValueError, WrongTypeError
+from dataclasses_json.core import _decode_dataclass
+
+from lodstorage.dataclass_codec import DataclassCodec
+from lodstorage.sample2 import Countries, Country, Royals
+from lodstorage.yamlable import YamlAble, lod_storable
+from tests.basetest import Basetest
+
+
+class Color(enum.Enum):
+    RED = "red"
+    GREEN = "green"
+
+
+@lod_storable
+class Point:
+    x: float
+    y: float
+    label: Optional[str] = None
+
+
+@lod_storable
+class Shape:
+    name: str
+    points: List[Point] = field(default_factory=list)
+    center: Optional[Point] = None
+    anchors: Dict[str, Point] = field(default_factory=dict)
+    color: Optional[Color] = None
+    created: Optional[datetime.datetime] = None
+    tags: List[str] = field(default_factory=list)
+    _hidden: Optional[str] = None
+    meta: dict = field(default_factory=dict)
+
+
+@lod_storable
+class Circle:
+    radius: float
+
+
+@lod_storable
+class Figure:
+    shape: Union[Circle, Point]
+    shapes: List[Union[Point, Circle]] = field(default_factory=list)
+    label: Union[List[str], str, None] = None
+
+
+class TestDataclassCodec(Basetest):
+    """
+    test the compiled dataclass codec
+    """
+
+    def getShape(self) -> Shape:
+        shape = Shape(
+            name="triangle",
+            points=[Point(0, 0), Point(1, 0, "right"), Point(0, 1)],
+            center=Point(0.3, 0.3),
+            anchors={"top": Point(0, 1)},
+            color=Color.RED,
+            created=datetime.datetime(
+                2026, 10, 19, 12, 30, tzinfo=datetime.timezone.utc
+            ),
+            _hidden="secret",
+            meta={"empty": [], "nested": {"none": None, "value": 1}},
+        )
+        return shape
+
+    def getCountries(self, count: int = 2000) -> Countries:
+        countries = Countries(
+            countries=[
+                Country(
+                    name=f"Country {i}",
+                    country_code=f"C{i}",
+                    capital=None if i % 3 == 0 else f"Capital {i}",
+                    timezones=[f"Europe/Zone{i}"],
+                    latlng=[i * 0.5, i * 0.25],
+                )
+                for i in range(count)
+            ]
+        )
+        return countries
+
+    def testCleanDict(self):
+        """
+        test that the single pass cleaning is equivalent to asdict and remove_ignored_values
+        """
+        samples = [self.getShape(), Shape(name="empty"), self.getCountries(20)]
+        samples.extend(Royals.get_samples().values())
+        for sample in samples:
+            codec = DataclassCodec.forClass(type(sample))
+            for ignore_none in [True, False]:
+                for ignore_underscore in [True, False]:
+                    expected = YamlAble.remove_ignored_values(
+                        asdict(sample), ignore_none, ignore_underscore
+                    )
+                    actual = codec.toCleanDict(sample, ignore_none, ignore_underscore)
+                    self.assertEqual(expected, actual)
+
+    def testRoundTrip(self):
+        """
+        test YAML and JSON round trips of nested dataclasses
+        """
+        shape = self.getShape()
+        # enums are not supported by the YAML dumper
+        shape.color = None
+        yaml_str = shape.to_yaml()
+        self.assertNotIn("_hidden", yaml_str)
+        loaded = Shape.from_yaml(yaml_str)
+        self.assertIsInstance(loaded.points[1], Point)
+        self.assertIsInstance(loaded.anchors["top"], Point)
+        self.assertEqual(shape.created, loaded.created)
+        self.assertEqual(shape.points, loaded.points)
+        shape.color = Color.RED
+        json_str = shape.to_json(indent=2)
+        self.assertIn('"color": "red"', json_str)
+        loaded = Shape.from_json(json_str)
+        shape._hidden = loaded._hidden
+        self.assertEqual(shape, loaded)
+        # compatible with dataclasses_json
+        self.assertEqual(shape, _decode_dataclass(Shape, shape.to_dict(), False))
+        for royals in Royals.get_samples().values():
+            loaded = Royals.from_yaml(royals.to_yaml())
+            self.assertEqual(royals.members[0].name, loaded.members[0].name)
+            self.assertEqual(royals.members[1].age, loaded.members[1].age)
+
+    def testFromDict(self):
+        """
+        test default handling and lenient decoding
+        """
+        shape = Shape.from_dict({"name": "dot", "unknown": 1})
+        self.assertEqual([], shape.points)
+        self.assertIsNone(shape.center)
+        point = Point.from_dict({"x": 1}, infer_missing=True)
+        self.assertIsNone(point.y)
+        with self.assertRaises(TypeError):
+            Point.from_dict({"x": 1})
+        self.assertIsNone(Point.from_dict2({}))
+
+    def testUnion(self):
+        """
+        test that union values are decoded to the first member type that fits
+        """
+        data = {
+            "shape": {"x": 1, "y": 2},
+            "shapes": [{"radius": 1.5}, {"x": 0, "y": 0}],
+            "label": "plain",
+        }
+        expected = dacite.from_dict(data_class=Figure, data=data)
+        figure = Figure.from_dict(data)
+        self.assertEqual(expected, figure)
+        self.assertEqual(Point(1, 2), figure.shape)
+        self.assertEqual([Circle(1.5), Point(0, 0)], figure.shapes)
+        self.assertEqual("plain", figure.label)
+        figure = Figure.from_dict({"shape": {"radius": 2.0}, "label": ["a", "b"]})
+        self.assertEqual(Circle(2.0), figure.shape)
+        self.assertEqual(["a", "b"], figure.label)
+
+    @unittest.skipIf(sys.version_info < (3, 10), "PEP 604 unions need python 3.10")
+    def testPep604Union(self):
+        """
+        test that X | None and X | Y are decoded like Optional and Union
+        """
+
+        @lod_storable
+        class Drawing:
+            center: Point | None = None
+            shape: Circle | Point | None = None
+
+        drawing = Drawing.from_dict(
+            {"center": {"x": 1, "y": 2}, "shape": {"radius": 3.0}}
+        )
+        self.assertEqual(Point(1, 2), drawing.center)
+        self.assertEqual(Circle(3.0), drawing.shape)
+        self.assertTrue(DataclassCodec.isInstance(None, Point | None))
+
+    def testTuples(self):
+        """
+        test that fixed length tuples are converted per position
+        """
+        converter = DataclassCodec.getConverter(Tuple[Point, Color])
+        value = converter(({"x": 1, "y": 2}, "red"))
+        self.assertEqual((Point(1, 2), Color.RED), value)
+        converter = DataclassCodec.getConverter(Tuple[Color, ...])
+        self.assertEqual((Color.RED, Color.GREEN), converter(["red", "green"]))
+        self.assertIs(tuple, DataclassCodec.getConverter(Tuple[int, str]))
+
+    def testFromDict2(self):
+        """
+        test the strict checks of from_dict2
+        """
+        self.assertEqual(Point(1.0, 2.0), Point.from_dict2({"x": 1.0, "y": 2.0}))
+        with self.assertRaises(WrongTypeError):
+            Point.from_dict2({"x": "one", "y": 2.0})
+        with self.assertRaises(MissingValueError):
+            Point.from_dict2({"x": 1.0})
+
+    def testPerformance(self):
+        """
+        compare the codec with dacite and dataclasses_json
+        """
+        countries = self.getCountries()
+        data = yaml.safe_load(countries.to_yaml())
+        start = time.time()
+        expected = dacite.from_dict(data_class=Countries, data=data)
+        daciteTime = time.time() - start
+        start = time.time()
+        expected2 = _decode_dataclass(Countries, data, False)
+        dataclassesJsonTime = time.time() - start
+        start = time.time()
+        actual = Countries.from_dict(data)
+        codecTime = time.time() - start
+        self.assertEqual(expected, actual)
+        self.assertEqual(expected2, actual)
+        if self.debug:
+            print(
+                f"decoding {len(countries.countries)} countries: dacite {daciteTime:.3f}s dataclasses_json {dataclassesJsonTime:.3f}s codec {codecTime:.3f}s"
+            )
+
+    def testIntrospectionCache(self):
+        """
+        test the shared per-class introspection of the codec
+        """
+        codec = DataclassCodec.forClass(Shape)
+        self.assertIs(codec, DataclassCodec.forClass(Shape))
+        hints = {field.name: codec.getHint(field) for field in codec.fields}
+        self.assertEqual(List[Point], hints["points"])
+        _description, attributes = DataclassCodec.forClass(Royals).getDocumentation()
+        self.assertIn("members", attributes)
+        self.assertIs(attributes, DataclassCodec.forClass(Royals).getDocumentation()[1])
+        calls = []
+
+        def factory(factory_codec):
+            calls.append(factory_codec)
+            return len(factory_codec.fields)
+
+        for _i in range(3):
+            self.assertEqual(len(codec.fieldNames), codec.getPlan("test", factory))
+        self.assertEqual([codec], calls)
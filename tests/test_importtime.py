@@ -0,0 +1,94 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+import json
+import subprocess
+import sys
+
+from tests.basetest import Basetest
+
+
+class TestImportTime(Basetest):
+    """
+    regression benchmark for the import time of the core modules and the command line
+    """
+
+    heavyModules = [
+        "SPARQLWrapper",
+        "dacite",
+        "dataclasses_json",
+        "dicttoxml2",
+        "jsonpickle",
+        "matplotlib",
+        "multiprocessing",
+        "numpy",
+        "pygments",
+        "pylatexenc",
+        "rdflib",
+        "requests",
+        "tabulate",
+        "yaml",
+    ]
+    # generous upper bound of the cumulative import time in microseconds
+    # e.g. importing matplotlib.pyplot alone takes about a second
+    maxMicros = 500_000
+
+    def importInFreshProcess(self, modules: list) -> tuple:
+        """
+        import the given modules in a fresh python process
+
+        Args:
+            modules(list): the names of the modules to import
+
+        Returns:
+            tuple: the list of heavy modules that got imported and the import time in microseconds
+        """
+        code = f"""
+import json, sys
+{"; ".join(f"import {module}" for module in modules)}
+print(json.dumps([m for m in {self.heavyModules!r} if m in sys.modules]))
+"""
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", code],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        loaded = json.loads(result.stdout)
+        micros = 0
+        for line in result.stderr.splitlines():
+            # import time: self [us] | cumulative | imported package
+            parts = line.split("|")
+            if len(parts) == 3 and parts[2].strip() in modules:
+                micros += int(parts[1].strip())
+        return loaded, micros
+
+    def testCoreImports(self):
+        """
+        test that the core modules and the command line don't import heavy dependencies
+        """
+        for modules in [
+            ["lodstorage.sql", "lodstorage.lod", "lodstorage.csv"],
+            ["lodstorage.jsonable", "lodstorage.entity"],
+            ["lodstorage.querymain"],
+            ["lodstorage.plot"],
+        ]:
+            loaded, micros = self.importInFreshProcess(modules)
+            if self.debug:
+                print(f"{modules}: {micros/1000:.1f} ms")
+            self.assertEqual([], loaded, f"{modules}")
+            self.assertLess(micros, self.maxMicros, f"{modules}")
+
+    def testLazyImportsWork(self):
+        """
+        test that the deferred imports are available when needed
+        """
+        loaded, _micros = self.importInFreshProcess(["lodstorage.sparql"])
+        self.assertIn("requests", loaded)
+        # lod_storable does not need dataclasses_json
+        loaded, _micros = self.importInFreshProcess(["lodstorage.sample2"])
+        self.assertNotIn("dataclasses_json", loaded)
+        loaded, _micros = self.importInFreshProcess(["lodstorage.yamlable"])
+        self.assertIn("yaml", loaded)
@@ -0,0 +1,90 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+import datetime
+import enum
+import json
+from dataclasses import dataclass
+
+from lodstorage.jsonable import JSONAble
+from lodstorage.jsonbackend import JsonBackend
+from lodstorage.sample import Royals
+from tests.basetest import Basetest
+
+
+class Color(enum.Enum):
+    RED = 1
+
+
+@dataclass
+class Pixel:
+    x: int
+    color: Color = Color.RED
+
+
+class TestJsonBackend(Basetest):
+    """
+    test the pluggable JSON backend
+    """
+
+    def testSameAsStdlib(self):
+        """
+        test that the backend creates the same JSON text as the standard library
+        """
+        royals = Royals(load=True)
+        data = {"royals": royals.royals, "count": 4}
+        data["empty"] = {"list": [], "dict": {}}
+        toJsonAbleValue = JSONAble().toJsonAbleValue
+        for indent in [None, 2, 4]:
+            expected = json.dumps(
+                data, indent=indent, sort_keys=True, default=toJsonAbleValue
+            )
+            actual = JsonBackend.dumps(
+                data, indent=indent, sort_keys=True, default=toJsonAbleValue
+            )
+            if indent is not None:
+                self.assertEqual(expected, actual, f"indent {indent}")
+            self.assertEqual(json.loads(expected), JsonBackend.loads(actual))
+
+    def testDefaultHook(self):
+        """
+        test that dataclasses and enums are passed to the default function
+        """
+
+        def default(value):
+            if isinstance(value, enum.Enum):
+                return value.name
+            return {"pixel": value.x, "color": value.color}
+
+        for data in [Color.RED, {"c": [Color.RED]}, {"p": Pixel(1)}]:
+            expected = json.dumps(data, default=default)
+            self.assertEqual(expected, JsonBackend.dumps(data, default=default))
+        floats = [1e16, 1e-7, 0.1]
+        self.assertEqual(floats, JsonBackend.loads(JsonBackend.dumps(floats)))
+
+    def testDatetime(self):
+        """
+        test the datetime handling
+        """
+        record = {"when": datetime.datetime(2022, 9, 8, 15, 30, 0)}
+        jsonStr = JsonBackend.dumps(record, default=str, nativeDatetime=False)
+        self.assertEqual("2022-09-08 15:30:00", JsonBackend.loads(jsonStr)["when"])
+        jsonStr = JsonBackend.dumps(record)
+        self.assertEqual("2022-09-08T15:30:00", JsonBackend.loads(jsonStr)["when"])
+
+    def testFallback(self):
+        """
+        test the fallback to the standard library
+        """
+        bigInt = 2**70
+        self.assertEqual(str(bigInt), JsonBackend.dumps(bigInt))
+        self.assertTrue(JsonBackend.loads("NaN") != JsonBackend.loads("NaN"))
+        useFast = JsonBackend.useFast
+        try:
+            JsonBackend.useFast = False
+            self.assertEqual("json", JsonBackend.name())
+            self.assertEqual('{"a": 1}', JsonBackend.dumps({"a": 1}))
+        finally:
+            JsonBackend.useFast = useFast
@@ -3,8 +3,13 @@ Created on 2024-01-21
 
 @author: wf
 """
+import io
+
+from rdflib import Graph
+from rdflib.compare import isomorphic
 from rdflib.namespace import XSD
 
+from lodstorage.dataclass_codec import DataclassCodec
 from lodstorage.linkml_gen import LinkMLGen, Schema
 from lodstorage.rdf import RDFDumper
 from lodstorage.sample2 import Royals, Sample
@@ -45,6 +50,18 @@ class TestLinkMLConversion(Basetest):
         linkml_schema = linkml_gen.gen_schema(Royals)
         return linkml_schema
 
+    def test_cached_schema_generation(self):
+        """
+        test that the cached introspection plans give the same schema
+        """
+        first_yaml = self.get_linkml_schema().to_yaml()
+        for _i in range(3):
+            self.assertEqual(first_yaml, self.get_linkml_schema().to_yaml())
+        codec = DataclassCodec.forClass(Royals)
+        slot_plans = codec.plans["linkml"]
+        self.assertEqual(["members"], [slot_plan.name for slot_plan in slot_plans])
+        self.assertEqual("Royal", slot_plans[0].range)
+
     def test_yaml_schema_generation(self):
         """
         Test the generation of a LinkML YAML schema from Python data models.
@@ -101,3 +118,24 @@ class TestLinkMLConversion(Basetest):
         # Optionally, save the RDF graph to a file
         with open("/tmp/royals_rdf_output.ttl", "w") as rdf_file:
             rdf_file.write(rdf_output)
+
+    def test_rdf_dumper_write(self):
+        """
+        test streaming the triples of the RDF Dumper without an rdflib Graph
+        """
+        linkml_schema = self.get_linkml_schema()
+        rdf_dumper = RDFDumper(linkml_schema, self.royals)
+        rdf_dumper.convert_to_rdf()
+        for rdf_format in ["nt", "turtle"]:
+            stream = io.StringIO()
+            triple_count = RDFDumper(linkml_schema, self.royals).write(
+                stream, rdf_format
+            )
+            rdf_output = stream.getvalue()
+            if self.debug:
+                print(rdf_output)
+            graph = Graph().parse(data=rdf_output, format=rdf_format)
+            self.assertEqual(len(rdf_dumper.graph), triple_count)
+            self.assertTrue(isomorphic(rdf_dumper.graph, graph), rdf_format)
+        with self.assertRaises(ValueError):
+            rdf_dumper.write(io.StringIO(), "xml")
@@ -0,0 +1,88 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+import datetime
+import io
+import unittest
+from xml.dom.minidom import parseString
+
+from lodstorage.sample import Sample
+from lodstorage.xml import Lod2Xml
+from tests.basetest import Basetest
+
+try:
+    from dicttoxml2 import dicttoxml
+except ImportError:
+    dicttoxml = None
+
+
+class TestLod2Xml(Basetest):
+    """
+    test the streaming list of dicts to XML conversion
+    """
+
+    def getSamples(self) -> list:
+        """
+        get list of dicts samples for the XML conversion
+        """
+        royals = [{k: str(v) for k, v in r.items()} for r in Sample.getRoyals()]
+        samples = [
+            royals,
+            [],
+            [{}],
+            [{"none": None, "empty": "", "blank": "  ", "flag": True, "float": 1.5}],
+            [
+                {
+                    "text": "a<b>&\"c'd\r\ne",
+                    "1": 1,
+                    2: "two",
+                    "a b": "x",
+                    "a:b": "y",
+                    "a b&": "z",
+                    "größe": "ü",
+                }
+            ],
+            [
+                {
+                    "nested": {"x": 1, "y": {"z": [1, 2, {"q": None}]}, "e": {}},
+                    "lists": [[1, 2], [], ["a"]],
+                    "when": datetime.datetime(2020, 1, 2, 3, 4, 5),
+                }
+            ],
+            [1, "s", None, [1, 2, [3]]],
+        ]
+        return samples
+
+    @unittest.skipIf(dicttoxml is None, "dicttoxml2 is not installed")
+    def testSameAsDictToXml(self):
+        """
+        test that the output is the same as the one of dicttoxml + minidom pretty printing
+        """
+        for node_name in [lambda _x: "node", lambda x: f"{x}_item"]:
+            for lod in self.getSamples():
+                xml = dicttoxml(
+                    lod, custom_root="root", item_func=node_name, attr_type=False
+                )
+                expected = parseString(xml).toprettyxml()
+                actual = Lod2Xml(lod, node_name=node_name).asXml()
+                self.assertEqual(expected, actual)
+
+    def testStreaming(self):
+        """
+        test writing a generator of records to a stream
+        """
+        records = ({"id": i, "name": f"record {i}"} for i in range(1000))
+        stream = io.StringIO()
+        count = Lod2Xml(records, root="records").write(stream, indent="  ")
+        self.assertEqual(1000, count)
+        xml = stream.getvalue()
+        self.assertIn("<records>\n  <node>\n    <id>0</id>\n", xml)
+        document = parseString(xml)
+        self.assertEqual(1000, len(document.getElementsByTagName("node")))
+        compact = Lod2Xml([{"a": 1, "b": None}]).asXml(pretty=False)
+        self.assertEqual(
+            b'<?xml version="1.0" encoding="UTF-8" ?><root><node><a>1</a><b></b></node></root>',
+            compact,
+        )
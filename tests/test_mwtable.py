@@ -0,0 +1,97 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+import io
+
+from lodstorage.mwTable import MediaWikiTable
+from tests.basetest import Basetest
+
+
+class TestMediaWikiTable(Basetest):
+    """
+    test the MediaWiki table markup
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+        self.lod = [
+            {"name": "Elizabeth", "born": 1926, "ratio": 0.5},
+            {"name": "Charles", "born": 1948, "ratio": 0.25},
+            {"name": "50%", "pair": (1, 2)},
+        ]
+
+    def testMarkup(self):
+        """
+        test the markup with and without new lines
+        """
+        expectedByNewLines = {
+            False: """{|class="wikitable sortable"
+|+
+!name!!born!!ratio
+|-
+||[[Elizabeth]]||1926||0.50
+|-
+||[[Charles]]||1948||0.25
+|-
+||[[50%]]||(1, 2)
+|}
+""",
+            True: """{|class="wikitable sortable"
+|+
+!name
+!born
+!ratio
+|-
+|[[Elizabeth]]
+|1926
+|0.50
+|-
+|[[Charles]]
+|1948
+|0.25
+|-
+|[[50%]]
+|(1, 2)
+|}
+""",
+        }
+        for withNewLines, expected in expectedByNewLines.items():
+            colFormats = {"name": "[[%s]]", "ratio": "%.2f"}
+            mwTable = MediaWikiTable(withNewLines=withNewLines, colFormats=colFormats)
+            mwTable.fromListOfDicts(self.lod)
+            markup = mwTable.asWikiMarkup()
+            if self.debug:
+                print(markup)
+            self.assertEqual(expected, markup)
+            # one row template per distinct tuple of keys
+            self.assertEqual(2, len(mwTable.rowTemplates))
+
+    def testStreaming(self):
+        """
+        test writing the markup of a generator of records to a stream
+        """
+        mwTable = MediaWikiTable()
+        mwTable.fromListOfDicts(self.lod)
+        expected = mwTable.asWikiMarkup()
+        streamed = MediaWikiTable()
+        stream = io.StringIO()
+        count = streamed.writeWikiMarkup(stream, (record for record in self.lod))
+        self.assertEqual(expected, stream.getvalue())
+        self.assertEqual(len(expected), count)
+        # the streamed rows are not buffered
+        self.assertEqual("", streamed.content)
+        self.assertEqual(
+            '{|class="wikitable sortable"\n\n|}\n', MediaWikiTable().asWikiMarkup()
+        )
+
+    def testPerformance(self):
+        """
+        test that the markup of a large table is built in linear time
+        """
+        lod = [{"id": i, "name": f"name {i}", "value": i * 0.5} for i in range(50000)]
+        mwTable = MediaWikiTable(colFormats={"value": "%.1f"})
+        mwTable.fromListOfDicts(lod)
+        markup = mwTable.asWikiMarkup()
+        self.assertTrue(markup.endswith("||49999||name 49999||24999.5\n|}\n"))
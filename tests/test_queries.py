@@ -7,8 +7,10 @@ import copy
 import io
 import json
 import os
+import re
+import tempfile
 import unittest
-from contextlib import redirect_stdout
+from contextlib import redirect_stderr, redirect_stdout
 
 import tests.testSqlite3
 from lodstorage.query import (
@@ -22,6 +24,7 @@ from lodstorage.query import (
 from lodstorage.querymain import QueryMain
 from lodstorage.querymain import main as queryMain
 from lodstorage.sparql import SPARQL
+from lodstorage.yamlbackend import YamlFileCache
 from tests.basetest import Basetest
 
 
@@ -277,6 +280,127 @@ class TestQueries(Basetest):
                     lod[2]["wikidata"],
                 )
 
+    def testValueFormatterPipeline(self):
+        """
+        test the compiled value formatting pipeline against formatting every cell
+        with uncompiled regular expressions
+        """
+        regexps = [
+            r"(?P<value>(Q|Property:P)[0-9]+)",
+            r"http(s)?://.*/(?P<value>(Q|Property:P)[0-9]+)",
+        ]
+        formatString = "https://www.wikidata.org/wiki/{value}"
+
+        def formatCell(value, tablefmt):
+            # reference implementation without compiled patterns
+            original = value
+            doformat = False
+            for regexp in regexps:
+                vmatch = re.match(regexp, value)
+                if vmatch:
+                    doformat = True
+                    value = vmatch.group("value")
+            if not doformat:
+                return original
+            link = formatString.format(value=value)
+            return {
+                "github": f"[{value}]({link})",
+                "mediawiki": f"[{link} {value}]",
+                "latex": f"\\href{{{link}}}{{{value}}}",
+            }.get(tablefmt, original)
+
+        qlod = []
+        for i in range(2000):
+            record = {
+                "item": f"http://www.wikidata.org/entity/Q{i % 50}",
+                "label": f"label {i % 7}",
+                "prop": "Property:P31",
+                "count": i,
+            }
+            if i % 3 == 0:
+                record["extra"] = "Q42"
+            qlod.append(record)
+        query = Query(name="formats", query="", formats=["*:wikidata", "label:doi"])
+        for tablefmt in ["github", "mediawiki", "latex", "simple"]:
+            lod = copy.deepcopy(qlod)
+            query.formatWithValueFormatters(lod, tablefmt)
+            for record, expected in zip(lod, qlod):
+                for key, value in expected.items():
+                    if isinstance(value, str):
+                        value = formatCell(value, tablefmt)
+                        if key == "label" and tablefmt != "simple":
+                            link = f"http://dx.doi.org/{value}"
+                            value = {
+                                "github": f"[{value}]({link})",
+                                "mediawiki": f"[{link} {value}]",
+                                "latex": f"\\href{{{link}}}{{{value}}}",
+                            }[tablefmt]
+                    self.assertEqual(value, record[key], f"{tablefmt}:{key}")
+        vf = ValueFormatter(name="wikidata", regexps=regexps, formatString=formatString)
+        self.assertIsNotNone(vf.quickReject)
+        self.assertIsNone(vf.formatValue("no item", "github"))
+        vf.formatValue("Q1", "github")
+        self.assertIn(("github", "Q1"), vf.memo)
+        # invalid regular expressions are reported once and skipped
+        with redirect_stderr(io.StringIO()) as stderr:
+            invalid = ValueFormatter(
+                name="invalid",
+                regexps=["(?P<value>Q[0-9]+", "(?P<value>Q[0-9]+)"],
+                formatString="{value}",
+            )
+        self.assertIn("Invalid regular expression", stderr.getvalue())
+        self.assertEqual(1, len(invalid.compiledRegexps))
+        self.assertEqual("[Q1 Q1]", invalid.formatValue("Q1", "mediawiki"))
+        # regular expressions without a value group are reported and skipped
+        with redirect_stderr(io.StringIO()) as stderr:
+            novalue = ValueFormatter(
+                name="x", formatString="https://x/{value}", regexps=[r"Q\d+"]
+            )
+        self.assertIn("missing group", stderr.getvalue())
+        self.assertIsNone(novalue.formatValue("Q5", "github"))
+
+    def testDocumentQueryResultKeepsRecords(self):
+        """
+        test that documenting a query result formats overlays and leaves the records untouched
+        """
+        qlod = [
+            {"item": f"http://www.wikidata.org/entity/Q{i}", "label": f"label {i}"}
+            for i in range(20)
+        ]
+        original = copy.deepcopy(qlod)
+        query = Query(name="items", query="SELECT ?item", formats=["item:wikidata"])
+
+        def upper(record, key, value, tablefmt):
+            if key == "label":
+                record[key] = value.upper()
+
+        query.addFormatCallBack(upper)
+        from tabulate import tabulate
+
+        for tablefmt in ["mediawiki", "github", "latex", "simple"]:
+            for limit in [None, 5]:
+                doc = query.documentQueryResult(
+                    qlod, limit=limit, tablefmt=tablefmt, withSourceCode=False
+                )
+                self.assertEqual(original, qlod)
+                # the same as formatting a copy in place
+                lod = copy.deepcopy(qlod[:limit] if limit else qlod)
+                query.preFormatWithCallBacks(lod, tablefmt)
+                query.formatWithValueFormatters(lod, tablefmt)
+                self.assertIn(
+                    tabulate(lod, headers="keys", tablefmt=tablefmt), str(doc)
+                )
+        rows = list(query.formatRows((record for record in qlod), "mediawiki", limit=2))
+        self.assertEqual(2, len(rows))
+        self.assertEqual("LABEL 0", rows[0]["label"])
+        self.assertEqual(
+            "[https://www.wikidata.org/wiki/Q0 Q0]",
+            rows[0]["item"],
+        )
+        # without formatting the records themselves are used
+        plainQuery = Query(name="plain", query="")
+        self.assertIs(qlod[0], next(plainQuery.formatRows(qlod, "mediawiki")))
+
     def testIssue73ReadFormats(self):
         """
         test reading the valueFormatters
@@ -284,6 +408,42 @@ class TestQueries(Basetest):
         vfs = ValueFormatter.getFormats(ValueFormatter.formatsPath)
         self.assertTrue("wikidata" in vfs)
 
+    def testQueryRegistryCache(self):
+        """
+        test that query YAML files are only parsed again if they change
+        """
+        with tempfile.TemporaryDirectory() as tmpdir:
+            queriesPath = os.path.join(tmpdir, "queries.yaml")
+            with open(queriesPath, "w") as yamlFile:
+                yamlFile.write("cities:\n  sql: SELECT * FROM city\n")
+            parses = YamlFileCache.parses
+            for _i in range(3):
+                qm = QueryManager(lang="sql", queriesPath=queriesPath)
+                self.assertEqual("SELECT * FROM city", qm.queriesByName["cities"].query)
+            self.assertEqual(parses + 1, YamlFileCache.parses)
+            # a modified file is parsed again
+            with open(queriesPath, "w") as yamlFile:
+                yamlFile.write("cities:\n  sql: SELECT name FROM city\n")
+            qm = QueryManager(lang="sql", queriesPath=queriesPath)
+            self.assertEqual("SELECT name FROM city", qm.queriesByName["cities"].query)
+            self.assertEqual(parses + 2, YamlFileCache.parses)
+            # the disk cache avoids parsing in a fresh process
+            diskCacheFile = os.path.join(tmpdir, "yamlcache.pickle")
+            try:
+                YamlFileCache.clear()
+                YamlFileCache.enableDiskCache(diskCacheFile)
+                YamlFileCache.load(queriesPath)
+                self.assertEqual(parses + 3, YamlFileCache.parses)
+                YamlFileCache.clear()
+                YamlFileCache.enableDiskCache(diskCacheFile)
+                qm = QueryManager(lang="sql", queriesPath=queriesPath)
+                self.assertEqual(
+                    "SELECT name FROM city", qm.queriesByName["cities"].query
+                )
+                self.assertEqual(parses + 3, YamlFileCache.parses)
+            finally:
+                YamlFileCache.clear()
+
     def testIssue111(self):
         """
         https://github.com/WolfgangFahl/pyLoDStorage/issues/111
@@ -0,0 +1,144 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+import datetime
+import os
+import tempfile
+import time
+
+from lodstorage.query_cache import QueryResultCache
+from lodstorage.sparql import SPARQL
+from tests.basetest import Basetest
+from tests.localsparql import LocalSPARQLServer
+
+
+class TestQueryResultCache(Basetest):
+    """
+    test the persistent query result cache
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.dbname = os.path.join(self.tmpdir.name, "querycache.db")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+        Basetest.tearDown(self)
+
+    def testKey(self):
+        """
+        test the content addressed keys
+        """
+        q1 = "SELECT ?s\nWHERE { ?s ?p ?o }\n"
+        q2 = "\n  SELECT ?s\nWHERE { ?s ?p ?o }  \n\n"
+        key1 = QueryResultCache.getKey("http://ep", q1)
+        self.assertEqual(key1, QueryResultCache.getKey("http://ep", q2))
+        # whitespace within the query e.g. in multi-line literals is significant
+        q3 = 'SELECT ?s WHERE { ?s ?p """a\n  b""" }'
+        q4 = 'SELECT ?s WHERE { ?s ?p """a\nb""" }'
+        self.assertNotEqual(
+            QueryResultCache.getKey("http://ep", q3),
+            QueryResultCache.getKey("http://ep", q4),
+        )
+        self.assertNotEqual(key1, QueryResultCache.getKey("http://ep2", q1))
+        self.assertNotEqual(key1, QueryResultCache.getKey("http://ep", q1, "GET"))
+
+    def testHitMissAndTypes(self):
+        """
+        test cache hits and misses and the round trip of python types
+        """
+        cache = QueryResultCache(self.dbname, ttl=60)
+        lod = [
+            {
+                "name": "Elizabeth",
+                "born": datetime.date(1926, 4, 21),
+                "age": 95.8,
+                "numberInLine": 0,
+                "ofAge": True,
+            }
+        ]
+        calls = []
+
+        def queryFunc():
+            calls.append(1)
+            return lod
+
+        for _i in range(3):
+            result = cache.getOrQuery("http://ep", "SELECT 1", queryFunc)
+            self.assertEqual(lod, result)
+        self.assertEqual(1, len(calls))
+        stats = cache.getStats()
+        self.assertEqual(2, stats["hits"])
+        self.assertEqual(1, stats["misses"])
+        # persistent
+        cache.close()
+        cache = QueryResultCache(self.dbname, ttl=60)
+        result = cache.getOrQuery("http://ep", "SELECT 1", queryFunc)
+        self.assertEqual(lod, result)
+        self.assertEqual(1, len(calls))
+
+    def testTTLAndStale(self):
+        """
+        test expiry and stale-while-revalidate
+        """
+        cache = QueryResultCache(self.dbname, ttl=0.05, staleTTL=60)
+        calls = []
+
+        def queryFunc():
+            calls.append(1)
+            return [{"call": len(calls)}]
+
+        cache.getOrQuery("http://ep", "SELECT 1", queryFunc)
+        time.sleep(0.1)
+        # stale entry is returned and refreshed in the background
+        result = cache.getOrQuery("http://ep", "SELECT 1", queryFunc)
+        self.assertEqual([{"call": 1}], result)
+        self.assertEqual(1, cache.staleHits)
+        for _i in range(50):
+            if not cache.refreshing:
+                break
+            time.sleep(0.01)
+        self.assertEqual(2, len(calls))
+        # without stale period an expired entry is queried again
+        cache.staleTTL = 0
+        time.sleep(0.1)
+        result = cache.getOrQuery("http://ep", "SELECT 1", queryFunc)
+        self.assertEqual([{"call": 3}], result)
+
+    def testEviction(self):
+        """
+        test the LRU eviction
+        """
+        cache = QueryResultCache(self.dbname, maxEntries=3)
+        for i in range(5):
+            cache.getOrQuery("http://ep", f"SELECT {i}", lambda: [{"i": i}])
+        self.assertEqual(3, cache.size())
+        key0 = QueryResultCache.getKey("http://ep", "SELECT 0")
+        key4 = QueryResultCache.getKey("http://ep", "SELECT 4")
+        self.assertIsNone(cache.get(key0))
+        self.assertIsNotNone(cache.get(key4))
+
+    def testSPARQLCache(self):
+        """
+        test using the cache for SPARQL queries
+        """
+        server = LocalSPARQLServer.fromTurtle(
+            """@prefix ex: <http://example.org/> .
+ex:a ex:value 1 .
+ex:b ex:value 2 ."""
+        )
+        try:
+            cache = QueryResultCache(self.dbname)
+            sparql = SPARQL(server.url, pooled=True, cache=cache)
+            query = """PREFIX ex: <http://example.org/>
+SELECT ?s ?value WHERE { ?s ex:value ?value } ORDER BY ?s"""
+            lod1 = sparql.queryAsListOfDicts(query)
+            lod2 = sparql.queryAsListOfDicts(query)
+            self.assertEqual(lod1, lod2)
+            self.assertEqual(2, lod2[1]["value"])
+            self.assertEqual(1, len(server.queries))
+        finally:
+            server.stop()
@@ -0,0 +1,111 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+from lodstorage.query_cache import QueryResultCache
+from lodstorage.remote_sync import RemoteSync, SPARQLKeyProbe
+from lodstorage.sparql import SPARQL
+from lodstorage.sql import SQLDB
+from tests.basetest import Basetest
+from tests.localsparql import LocalSPARQLServer
+
+
+class TestRemoteSync(Basetest):
+    """
+    test probing local keys against a local Wikidata-like endpoint
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+        turtle = """@prefix wd: <http://www.wikidata.org/entity/> .
+@prefix wdt: <http://www.wikidata.org/prop/direct/> .
+"""
+        for i in range(100, 120):
+            turtle += f'wd:Q{i} wdt:P31 wd:Q5 ; wdt:P496 "0000-{i}" .\n'
+        self.server = LocalSPARQLServer.fromTurtle(turtle)
+        self.local_data = [
+            {"qid": f"Q{i}", "orcid": f"0000-{i}", "name": f"person {i}"}
+            for i in range(110, 130)
+        ]
+
+    def tearDown(self):
+        self.server.stop()
+        Basetest.tearDown(self)
+
+    def testProbeItems(self):
+        """
+        test probing Wikidata ids in concurrent batches
+        """
+        sparql = SPARQL(self.server.url, pooled=True)
+        probe = SPARQLKeyProbe(
+            sparql,
+            "?key wdt:P31 wd:Q5.",
+            prefix="http://www.wikidata.org/entity/",
+            chunk_size=4,
+            max_workers=2,
+            debug=self.debug,
+        )
+        self.server.delay = 0.05
+        sync = RemoteSync("humans", "local", "wikidata", self.local_data, "qid", probe)
+        if self.debug:
+            print(sync.status_table())
+        expected = {f"Q{i}" for i in range(110, 120)}
+        self.assertEqual(expected, sync.get_keys("↔"))
+        self.assertEqual({f"Q{i}" for i in range(120, 130)}, sync.get_keys("→"))
+        self.assertEqual(set(), sync.get_keys("←"))
+        self.assertEqual(5, probe.queries)
+        self.assertEqual(5, len(self.server.queries))
+        self.assertLessEqual(self.server.maxActive, 2)
+        # only the local records whose keys are missing remotely are inserted
+        change_set = sync.get_change_set("→")
+        self.assertEqual({"insert": 10, "update": 0, "delete": 0}, change_set.counts())
+        self.assertEqual(
+            sync.get_keys("→"), {change.key for change in change_set.changes}
+        )
+        for call in [
+            lambda: sync.get_change_set("←"),
+            lambda: sync.get_change_set("→", with_update=True),
+            lambda: sync.get_record_by_key("right", "Q110"),
+            lambda: sync.get_diff_keys(),
+        ]:
+            with self.assertRaises(NotImplementedError):
+                call()
+        self.assertEqual("person 110", sync.get_record_by_key("left", "Q110")["name"])
+        # the inserts are mapped with the given field map
+        sync = RemoteSync(
+            "humans",
+            "local",
+            "wikidata",
+            self.local_data,
+            "qid",
+            probe,
+            field_map={"name": "label", "orcid": "P496"},
+        )
+        change = sync.get_change_set("→").changes[0]
+        self.assertEqual(
+            {"key": "Q120", "label": "person 120", "P496": "0000-120"}, change.values
+        )
+        # known keys are not probed again
+        all_keys = [f"Q{i}" for i in range(100, 130)]
+        self.assertEqual({f"Q{i}" for i in range(100, 120)}, probe.probe(all_keys))
+        self.assertEqual(8, probe.queries)
+
+    def testProbeLiterals(self):
+        """
+        test probing external identifiers with the query result cache
+        """
+        cache = QueryResultCache(SQLDB.RAM)
+        for _run in range(2):
+            sparql = SPARQL(self.server.url, cache=cache)
+            probe = SPARQLKeyProbe(sparql, "?item wdt:P496 ?key.", chunk_size=50)
+            sync = RemoteSync(
+                "orcids", "local", "wikidata", self.local_data, "orcid", probe
+            )
+            self.assertEqual(
+                {"↔": 10, "→": 10, "←": 0},
+                {direction: len(sync.get_keys(direction)) for direction in "↔→←"},
+            )
+        # the second run is answered by the cache
+        self.assertEqual(1, len(self.server.queries))
+        self.assertEqual(1, cache.hits)
@@ -0,0 +1,117 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+import json
+import os
+import tempfile
+import time
+
+from lodstorage.entity import EntityManager
+from lodstorage.sample import Royal, Sample
+from lodstorage.sketch import HyperLogLog, SketchSync
+from lodstorage.storageconfig import StorageConfig
+from lodstorage.sync import Sync, SyncPair
+from tests.basetest import Basetest
+
+
+class TestSketch(Basetest):
+    """
+    test the HyperLogLog sketches and the approximate synchronization statistics
+    """
+
+    def testHyperLogLog(self):
+        """
+        test the accuracy, merging and serialization of sketches
+        """
+        for n in [0, 10, 1000, 100_000]:
+            sketch = HyperLogLog.of(f"Q{i}" for i in range(n))
+            estimate = sketch.count()
+            if self.debug:
+                print(f"{n}: {estimate:.0f}")
+            self.assertLessEqual(abs(estimate - n), 4 * sketch.standard_error * n + 1)
+        # duplicates don't count
+        self.assertEqual(10, len(HyperLogLog.of(["a", "b"] * 5 + list(range(8)))))
+        left = HyperLogLog.of(f"Q{i}" for i in range(50_000))
+        right = HyperLogLog.of(f"Q{i}" for i in range(50_000, 100_000))
+        self.assertEqual(sketch, left.merge(right))
+        self.assertEqual(sketch, HyperLogLog.from_bytes(sketch.to_bytes()))
+        record = json.loads(json.dumps(sketch.to_dict()))
+        self.assertEqual(sketch, HyperLogLog.from_dict(record))
+        with self.assertRaises(ValueError):
+            left.merge(HyperLogLog(precision=10))
+
+    def testSketchSync(self):
+        """
+        test the estimated status against the exact one
+        """
+        n = 60_000
+        l_data = [{"qid": f"Q{i}"} for i in range(n)]
+        r_data = [{"qid": f"Q{i}"} for i in range(n // 3, n + n // 3)]
+        sync = Sync(
+            SyncPair("sketch", "local", "wikidata", l_data, r_data, "qid", "qid")
+        )
+        sketch_sync = SketchSync.of_sync(sync)
+        start = time.time()
+        estimates = sketch_sync.get_estimates()
+        elapsed = time.time() - start
+        status_table = sketch_sync.status_table()
+        if self.debug:
+            print(sync.status_table())
+            print(status_table)
+            print(f"estimated in {elapsed*1000:.1f} ms")
+        for direction, (estimate, error) in estimates.items():
+            exact = len(sync.get_keys(direction))
+            self.assertLessEqual(abs(estimate - exact), 4 * error, direction)
+        self.assertIn("±", status_table)
+        self.assertLess(elapsed, 0.5)
+
+    def testEntityManagerSketch(self):
+        """
+        test the sketch kept next to the cache of an entity manager
+        """
+        with tempfile.TemporaryDirectory() as tmpdir:
+            config = StorageConfig.getDefault()
+            config.cacheRootDir = tmpdir
+            config.cacheDirName = "lodstorage-test"
+            em = EntityManager(
+                name="royalsketch",
+                entityName="Royal",
+                entityPluralName="Royals",
+                clazz=Royal,
+                listName="royals",
+                config=config,
+            )
+            em.fromLoD(Sample.getRoyals())
+            sketch = em.getKeySketch("name")
+            self.assertTrue(os.path.isfile(em.getKeySketchFile("name")))
+            self.assertEqual(len(Sample.getRoyals()), len(sketch))
+            self.assertEqual(sketch, em.getKeySketch("name"))
+            # a sketch older than the cache file is recreated
+            cacheFile = em.getCacheFile(mode=em.config.mode)
+            with open(cacheFile, "w") as cache:
+                cache.write("")
+            sketchFile = em.getKeySketchFile("name")
+            mtime = os.path.getmtime(cacheFile)
+            os.utime(sketchFile, (mtime - 10, mtime - 10))
+            em.getList().pop()
+            sketch = em.getKeySketch("name")
+            self.assertEqual(len(Sample.getRoyals()) - 1, len(sketch))
+            self.assertGreaterEqual(os.path.getmtime(sketchFile), mtime)
+
+    def testSketchSyncKeys(self):
+        """
+        test that the key and record level methods are not available for sketches
+        """
+        sketch = HyperLogLog.of(["Q1", "Q2"])
+        sketch_sync = SketchSync("keys", "left", "right", sketch, sketch)
+        for call in [
+            lambda: sketch_sync.get_keys("→"),
+            lambda: sketch_sync.get_diff_keys(),
+            lambda: sketch_sync.get_record_by_key("left", "Q1"),
+            lambda: sketch_sync.get_change_set("→"),
+            lambda: sketch_sync.resync("left", []),
+        ]:
+            with self.assertRaises(NotImplementedError):
+                call()
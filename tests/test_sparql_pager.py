@@ -0,0 +1,170 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+from lodstorage.sparql import SPARQL
+from lodstorage.sparql_pager import SPARQLPager
+from tests.basetest import Basetest
+from tests.localsparql import LocalSPARQLServer
+
+
+class TestSPARQLPager(Basetest):
+    """
+    test paginated SPARQL query execution
+    """
+
+    query = """PREFIX ex: <http://example.org/>
+# all items
+SELECT ?item ?value WHERE {
+  ?item ex:value ?value
+}
+ORDER BY ?value"""
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+        turtle = "@prefix ex: <http://example.org/> .\n"
+        for i in range(25):
+            turtle += f"ex:item{i:02d} ex:value {i} .\n"
+        self.server = LocalSPARQLServer.fromTurtle(turtle)
+
+    def tearDown(self):
+        self.server.stop()
+        Basetest.tearDown(self)
+
+    def testSplitQuery(self):
+        """
+        test splitting off LIMIT and OFFSET modifiers
+        """
+        query, limit, offset = SPARQLPager.splitQuery(
+            "SELECT ?s WHERE { ?s ?p ?o }\nLIMIT 10\nOFFSET 5\n"
+        )
+        self.assertEqual("SELECT ?s WHERE { ?s ?p ?o }", query)
+        self.assertEqual(10, limit)
+        self.assertEqual(5, offset)
+        query, limit, offset = SPARQLPager.splitQuery(self.query)
+        self.assertEqual(self.query, query)
+        self.assertIsNone(limit)
+        self.assertEqual(0, offset)
+        prologue, body = SPARQLPager.splitPrologue(self.query)
+        self.assertTrue(prologue.startswith("PREFIX ex:"))
+        self.assertTrue(body.startswith("SELECT"))
+
+    def testOffsetPaging(self):
+        """
+        test LIMIT/OFFSET paging sequentially and concurrently
+        """
+        for pooled in [False, True]:
+            for maxWorkers in [1, 4]:
+                sparql = SPARQL(self.server.url, pooled=pooled)
+                lod = list(
+                    sparql.queryGen(self.query, pageSize=7, maxWorkers=maxWorkers)
+                )
+                values = [record["value"] for record in lod]
+                self.assertEqual(list(range(25)), values, f"{pooled} {maxWorkers}")
+
+    def testKeysetPaging(self):
+        """
+        test keyset paging over an IRI and over a numeric variable
+        """
+        sparql = SPARQL(self.server.url, pooled=True)
+        for keyVar in ["item", "?value"]:
+            self.server.queries.clear()
+            lod = list(sparql.queryGen(self.query, pageSize=10, keyVar=keyVar))
+            values = sorted(record["value"] for record in lod)
+            self.assertEqual(list(range(25)), values)
+            self.assertEqual(["item", "value"], sorted(lod[0].keys()))
+            self.assertEqual(3, len(self.server.queries))
+            # every page is ordered by the same key expression
+            orderBys = {
+                query[query.index("ORDER BY") :].split("\n")[0]
+                for query in self.server.queries
+            }
+            self.assertEqual(1, len(orderBys))
+        # numeric keys keep their numeric order
+        lod = list(sparql.queryGen(self.query, pageSize=4, keyVar="value"))
+        self.assertEqual(list(range(25)), [record["value"] for record in lod])
+
+    def testKeysetShape(self):
+        """
+        test that the key filter is added to the WHERE clause of simple queries
+        and that other queries fall back to LIMIT/OFFSET
+        """
+        sparql = SPARQL(self.server.url, pooled=True)
+        pager = SPARQLPager(sparql, self.query, pageSize=10, keyVar="value")
+        pageQuery = pager.keysetQuery(9, 10)
+        self.assertEqual(1, pageQuery.count("SELECT"))
+        self.assertIn("SELECT ?item ?value ?pagerKey WHERE {", pageQuery)
+        self.assertIn("FILTER(?pagerKey > 9)", pageQuery)
+        for query, keyVar in [
+            ("SELECT ?item WHERE { ?item ?p ?o }", "value"),
+            ("SELECT (?item AS ?key) WHERE { ?item ?p ?o }", "key"),
+            ("SELECT ?item WHERE { ?item ?p ?o } GROUP BY ?item", "item"),
+            ("SELECT * WHERE { ?item ?p ?o } VALUES ?p { <x:p> }", "item"),
+        ]:
+            self.assertIsNone(SPARQLPager.splitSelect(query, keyVar), query)
+        self.assertIsNotNone(
+            SPARQLPager.splitSelect('SELECT * WHERE { ?s ?p "}" }', "s")
+        )
+        query = """PREFIX ex: <http://example.org/>
+SELECT ?item (SUM(?value) AS ?total) WHERE {
+  ?item ex:value ?value
+}
+GROUP BY ?item"""
+        self.server.queries.clear()
+        lod = list(sparql.queryGen(query, pageSize=10, keyVar="item"))
+        self.assertEqual(25, len(lod))
+        self.assertEqual(3, len(self.server.queries))
+        for pageQuery in self.server.queries:
+            self.assertIn("ORDER BY ?item", pageQuery)
+            self.assertIn("OFFSET", pageQuery)
+
+    def testOrderByRequired(self):
+        """
+        test that LIMIT/OFFSET pagination needs an ORDER BY clause
+        """
+        sparql = SPARQL(self.server.url, pooled=True)
+        query = "SELECT ?item ?value WHERE { ?item <http://example.org/value> ?value }"
+        with self.assertRaises(ValueError):
+            list(sparql.queryGen(query, pageSize=5))
+        lod = list(sparql.queryGen(query, pageSize=5, keyVar="item"))
+        self.assertEqual(25, len(lod))
+
+    def testLimitCap(self):
+        """
+        test that the LIMIT and OFFSET of the original query are honored
+        """
+        sparql = SPARQL(self.server.url, pooled=True)
+        query = f"{self.query}\nLIMIT 12\nOFFSET 3"
+        for keyVar in [None, "value"]:
+            lod = list(sparql.queryGen(query, pageSize=5, keyVar=keyVar))
+            values = [record["value"] for record in lod]
+            self.assertEqual(list(range(3, 15)), values, keyVar)
+
+    def testResume(self):
+        """
+        test resuming after an error
+        """
+        sparql = SPARQL(self.server.url, pooled=True)
+        pager = SPARQLPager(sparql, self.query, pageSize=5, retries=0)
+        original = sparql.queryAsListOfDicts
+        calls = []
+
+        def failingQuery(queryString):
+            calls.append(queryString)
+            if len(calls) == 3:
+                raise Exception("timeout")
+            return original(queryString)
+
+        sparql.queryAsListOfDicts = failingQuery
+        lod = []
+        try:
+            for record in pager.generate():
+                lod.append(record)
+        except Exception as ex:
+            self.assertEqual("timeout", str(ex))
+        self.assertEqual(10, pager.count)
+        self.assertEqual(10, pager.offset)
+        lod.extend(pager.generate())
+        values = [record["value"] for record in lod]
+        self.assertEqual(list(range(25)), values)
@@ -0,0 +1,166 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+import os
+import tempfile
+import tracemalloc
+
+from lodstorage.csv import CSV
+from lodstorage.jsonl import JSONL
+from lodstorage.sql import SQLDB
+from lodstorage.stream_sync import (
+    CSVSource,
+    JSONLSource,
+    LoDSource,
+    SQLSource,
+    StreamSync,
+    SyncSource,
+)
+from lodstorage.sync import Sync, SyncPair
+from tests.basetest import Basetest
+
+
+class RangeSource(SyncSource):
+    """
+    a generated source that is never materialized
+    """
+
+    def __init__(self, name: str, start: int, end: int, changed: int = 100):
+        super().__init__(name, "qid")
+        self.start = start
+        self.end = end
+        self.changed = changed
+
+    def records(self):
+        for i in range(self.start, self.end):
+            label = f"label {i}" if i % self.changed else f"{self.name} {i}"
+            yield {"qid": f"Q{i}", "label": label, "count": i}
+
+
+class TestStreamSync(Basetest):
+    """
+    test the synchronization of streamed sources
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+        self.local_data = [
+            {"qid": "Q1", "label": "Berlin", "population": 3_600_000},
+            {"qid": "Q2", "label": "Paris", "population": 2_100_000},
+            {"qid": "Q3", "label": "Rome", "population": None},
+            {"qid": "Q4", "label": "Atlantis", "population": 0},
+        ]
+        self.wikidata_data = [
+            {"qid": "Q1", "label": "Berlin", "population": 3_600_000},
+            {"qid": "Q2", "label": "Paris", "population": 2_200_000},
+            {"qid": "Q3", "label": "Roma", "population": 2_800_000},
+            {"qid": "Q5", "label": "Madrid", "population": 3_300_000},
+        ]
+
+    def testSources(self):
+        """
+        test that all kinds of sources give the same status as the in memory sync
+        """
+        pair = SyncPair(
+            "cities",
+            "local",
+            "wikidata",
+            self.local_data,
+            self.wikidata_data,
+            "qid",
+            "qid",
+        )
+        sync = Sync(pair)
+        expected = sync.status_table()
+        sqlDB = SQLDB()
+        entityInfo = sqlDB.createTable(
+            self.local_data, "City", "qid", sampleRecordCount=-1
+        )
+        sqlDB.store(self.local_data, entityInfo)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            jsonlPath = os.path.join(tmpdir, "wikidata.jsonl")
+            JSONL.writeLoD(jsonlPath, self.wikidata_data)
+            csvPath = os.path.join(tmpdir, "wikidata.csv")
+            CSV.storeToCSVFile(self.wikidata_data, csvPath, withPostfix=True)
+            l_sources = [
+                LoDSource("local", "qid", self.local_data),
+                SQLSource("local", "qid", sqlDB, table_name="City"),
+            ]
+            r_sources = [
+                LoDSource("wikidata", "qid", self.wikidata_data),
+                JSONLSource("wikidata", "qid", jsonlPath),
+                CSVSource("wikidata", "qid", csvPath),
+            ]
+            for l_source in l_sources:
+                for r_source in r_sources:
+                    stream_sync = StreamSync("cities", l_source, r_source)
+                    status_table = stream_sync.status_table()
+                    if self.debug:
+                        print(status_table)
+                    self.assertEqual(expected, status_table)
+                    for direction in stream_sync.directions:
+                        self.assertEqual(
+                            sync.get_keys(direction), stream_sync.get_keys(direction)
+                        )
+                    self.assertEqual(sync.get_diff_keys(), stream_sync.get_diff_keys())
+                    self.assertEqual(2, stream_sync.get_diff_count())
+                    stream_sync.close()
+            # incremental resync of the changed side only
+            stream_sync = StreamSync("cities", l_sources[1], r_sources[1])
+            JSONL.writeLoD(jsonlPath, self.local_data)
+            stream_sync.resync("right")
+            self.assertEqual({"←": 0, "↔": 4, "→": 0}, stream_sync.get_counts())
+            self.assertEqual(0, stream_sync.get_diff_count())
+            with self.assertRaises(ValueError):
+                list(stream_sync.iter_keys("invalid direction"))
+            stream_sync.close()
+
+    def testCollisionsAndRecords(self):
+        """
+        test that values with colliding built-in hashes are counted as changes
+        and that the record level methods are not available
+        """
+        l_source = LoDSource("l", "id", [{"id": "a", "v": -1}, {"id": "b", "v": 1}])
+        r_source = LoDSource("r", "id", [{"id": "a", "v": -2}, {"id": "b", "v": 1.0}])
+        stream_sync = StreamSync("collide", l_source, r_source)
+        self.assertEqual(1, stream_sync.get_diff_count())
+        self.assertEqual(["a"], list(stream_sync.iter_diff_keys()))
+        for call in [
+            lambda: stream_sync.get_change_set("→"),
+            lambda: stream_sync.get_record_by_key("left", "a"),
+            lambda: stream_sync.get_field_diff("a"),
+            lambda: stream_sync.get_hashes("left"),
+        ]:
+            with self.assertRaises(NotImplementedError):
+                call()
+        stream_sync.close()
+
+    def testOutOfCore(self):
+        """
+        test that the records of the sources are not kept in memory
+        """
+        n = 200_000
+        l_source = RangeSource("local", 0, n)
+        r_source = RangeSource("wikidata", n // 2, n + n // 2)
+        tracemalloc.start()
+        stream_sync = StreamSync("range", l_source, r_source)
+        counts = stream_sync.get_counts()
+        diff_count = stream_sync.get_diff_count()
+        _current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        if self.debug:
+            print(stream_sync.status_table())
+            print(f"peak memory: {peak/1024/1024:.1f} MB")
+        self.assertEqual({"←": n // 2, "↔": n // 2, "→": n // 2}, counts)
+        self.assertEqual(n // 200, diff_count)
+        first_keys = []
+        for key in stream_sync.iter_keys("→"):
+            first_keys.append(key)
+            if len(first_keys) == 3:
+                break
+        self.assertEqual(["Q0", "Q1", "Q10"], first_keys)
+        # the records alone would need well above 50 MB
+        self.assertLess(peak, 10 * 1024 * 1024)
+        stream_sync.close()
@@ -3,7 +3,10 @@ Created on 2023-12-27
 
 @author: wf
 """
-from lodstorage.sync import Sync, SyncPair
+import sqlite3
+
+from lodstorage.sql import SQLDB
+from lodstorage.sync import ChangeSet, RecordChange, Sync, SyncPair
 from tests.basetest import Basetest
 
 
@@ -123,3 +126,144 @@ class TestSync(Basetest):
         except ValueError as e:
             if debug:
                 print(f"Caught expected ValueError for direction: {str(e)}")
+
+    def test_change_set(self):
+        """
+        test the field level diff, applying the change set to a database table and the incremental resync
+        """
+        local_data = [
+            {"qid": "Q1", "label": "Berlin", "population": 3_600_000},
+            {"qid": "Q2", "label": "Paris", "population": 2_100_000},
+            {"qid": "Q3", "label": "Rome", "population": None},
+            {"qid": "Q4", "label": "Atlantis", "population": 0},
+        ]
+        wikidata_data = [
+            {"qid": "Q1", "label": "Berlin", "population": 3_600_000},
+            {"qid": "Q2", "label": "Paris", "population": 2_200_000},
+            {"qid": "Q3", "label": "Roma", "population": 2_800_000},
+            {"qid": "Q5", "label": "Madrid", "population": 3_300_000, "extra": 1},
+        ]
+        pair = SyncPair(
+            title="cities",
+            l_name="local",
+            r_name="wikidata",
+            l_data=local_data,
+            r_data=wikidata_data,
+            l_key="qid",
+            r_key="qid",
+        )
+        sync = Sync(pair)
+        self.assertEqual(
+            {"qid": "qid", "label": "label", "population": "population"},
+            sync.field_map,
+        )
+        self.assertEqual({"Q2", "Q3"}, sync.get_diff_keys())
+        self.assertEqual(
+            {"label": ("Rome", "Roma"), "population": (None, 2_800_000)},
+            sync.get_field_diff("Q3"),
+        )
+        change_set = sync.get_change_set("←", with_delete=True)
+        self.assertEqual({"insert": 1, "update": 2, "delete": 1}, change_set.counts())
+        lod = change_set.as_lod()
+        if self.debug:
+            print(sync.status_table())
+            for record in lod:
+                print(record)
+        self.assertIn(
+            {
+                "action": "update",
+                "key": "Q2",
+                "field": "population",
+                "old": 2_100_000,
+                "new": 2_200_000,
+            },
+            lod,
+        )
+        # apply the change set to the local database
+        sqlDB = SQLDB()
+        entityInfo = sqlDB.createTable(local_data, "City", "qid", sampleRecordCount=-1)
+        sqlDB.store(local_data, entityInfo)
+        counts = change_set.apply_to_sqldb(sqlDB, "City")
+        self.assertEqual(change_set.counts(), counts)
+        cities = sqlDB.query("SELECT * FROM City ORDER BY qid")
+        expected = [
+            {key: record[key] for key in ["qid", "label", "population"]}
+            for record in wikidata_data
+        ]
+        self.assertEqual(expected, cities)
+        # the other direction without deletes
+        change_set = sync.get_change_set("→")
+        self.assertEqual({"insert": 1, "update": 2, "delete": 0}, change_set.counts())
+        # incremental resync after only the right side changed
+        left_hashes = sync.get_hashes("left")
+        sync.resync("right", cities)
+        self.assertIs(left_hashes, sync.get_hashes("left"))
+        self.assertEqual({"Q2", "Q3"}, sync.get_diff_keys())
+        sync.resync("left", [dict(record) for record in cities])
+        self.assertEqual(set(), sync.get_diff_keys())
+        self.assertEqual(
+            {"insert": 0, "update": 0, "delete": 0},
+            sync.get_change_set("←", with_delete=True).counts(),
+        )
+
+    def test_apply_quoted_identifiers(self):
+        """
+        test that table and column names are quoted when applying a change set
+        """
+        sqlDB = SQLDB()
+        sqlDB.c.execute('CREATE TABLE "my ""table""" ("order" TEXT, "a b" TEXT)')
+        change_set = ChangeSet(direction="→", target_key="order")
+        change_set.changes = [
+            RecordChange("insert", "1", {"order": "1", "a b": "x"}),
+            RecordChange("insert", "2", {"order": "2", "a b": "y"}),
+            RecordChange("update", "1", {"a b": "z"}, {"a b": "x"}),
+            RecordChange("delete", "2"),
+        ]
+        change_set.apply_to_sqldb(sqlDB, 'my "table"')
+        rows = sqlDB.query('SELECT * FROM "my ""table"""')
+        self.assertEqual([{"order": "1", "a b": "z"}], rows)
+        # the name is used as a whole instead of injecting a statement
+        with self.assertRaises(sqlite3.OperationalError):
+            ChangeSet(
+                direction="→",
+                target_key="order",
+                changes=[RecordChange("delete", "1")],
+            ).apply_to_sqldb(sqlDB, "x; DROP TABLE y")
+
+    def test_hash_collisions_and_duplicates(self):
+        """
+        test that values with colliding built-in hashes are detected as changes
+        and that the first record of a duplicate key wins
+        """
+        l_data = [{"id": "a", "v": -1}, {"id": "b", "v": 1}, {"id": "b", "v": 2}]
+        r_data = [{"id": "a", "v": -2}, {"id": "b", "v": 1}]
+        self.assertEqual(hash(-1), hash(-2))
+        sync = Sync(SyncPair("collide", "l", "r", l_data, r_data, "id", "id"))
+        self.assertEqual({"a"}, sync.get_diff_keys())
+        change_set = sync.get_change_set("→")
+        self.assertEqual({"insert": 0, "update": 1, "delete": 0}, change_set.counts())
+        self.assertEqual({"v": -1}, change_set.changes[0].values)
+        self.assertEqual(1, sync.get_record_by_key("left", "b")["v"])
+
+    def test_sync_performance(self):
+        """
+        test that syncing large data sets is done with indexes
+        """
+        n = 200_000
+        local_data = [{"id": f"Q{i}", "label": f"label {i}"} for i in range(n)]
+        wikidata_data = [
+            {"id": f"Q{i}", "label": f"label {i}" if i % 100 else f"new {i}"}
+            for i in range(n // 2, n + n // 2)
+        ]
+        pair = SyncPair(
+            "perf", "local", "wikidata", local_data, wikidata_data, "id", "id"
+        )
+        sync = Sync(pair)
+        for i in range(0, n, 1000):
+            key = f"Q{i}"
+            self.assertEqual(key, sync.get_record_by_key("left", key)["id"])
+        change_set = sync.get_change_set("←", with_delete=True)
+        self.assertEqual(
+            {"insert": n // 2, "update": n // 200, "delete": n // 2},
+            change_set.counts(),
+        )
@@ -0,0 +1,176 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+import datetime
+import io
+import random
+import time
+from collections import Counter
+
+from tabulate import tabulate
+
+from lodstorage.sample import Sample
+from lodstorage.sync import Sync, SyncPair
+from lodstorage.table_renderer import TableRenderer
+from lodstorage.tabulateCounter import TabulateCounter
+from tests.basetest import Basetest
+
+
+class TestTableRenderer(Basetest):
+    """
+    test the native table renderer against tabulate
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+        self.royals = Sample.getRoyals()
+
+    def checkSame(self, rows, headers="keys", **kwargs):
+        """
+        check that the native rendering is the same as the one of tabulate
+        """
+        for tablefmt in TableRenderer.formats:
+            expected = tabulate(rows, headers=headers, tablefmt=tablefmt, **kwargs)
+            renderer = TableRenderer(tablefmt=tablefmt, **kwargs)
+            markup = renderer.render(rows, headers=headers)
+            if self.debug:
+                print(markup)
+            self.assertIsNotNone(markup, tablefmt)
+            self.assertEqual(expected, markup, tablefmt)
+
+    def testSamples(self):
+        """
+        test the sample tables and the tables of the modules using the renderer
+        """
+        self.checkSame(self.royals)
+        self.checkSame(self.royals, floatfmt=".2f", missingval="?")
+        countries = ["DE", "FR", "US", "DE", "IT", "US", "DE", "NL", "ES", "PL"] * 7
+        counter = Counter(countries + ["AT", "CH", "BE"])
+        tabulateCounter = TabulateCounter(counter)
+        for tablefmt in ["latex", "grid", "mediawiki", "github", "pretty"]:
+            table = tabulateCounter.mostCommonTable(tablefmt=tablefmt, limit=7)
+            binTable = [("total", len(counter), sum(counter.values()))]
+            for i, (key, count) in enumerate(counter.most_common(7)):
+                binTable.append((i + 1, key, count, count / binTable[0][2] * 100.0))
+            expected = tabulate(
+                binTable,
+                headers=["#", "key", "count", "%"],
+                tablefmt=tablefmt,
+                floatfmt=".2f",
+            )
+            self.assertEqual(expected, table)
+        pair = SyncPair(
+            title="sync",
+            l_name="local",
+            r_name="wikidata",
+            l_data=[{"id": "1", "v": "a"}, {"id": "2", "v": "b"}],
+            r_data=[{"id": "1", "v": "a"}, {"id": "3", "v": "c"}],
+            l_key="v",
+            r_key="v",
+        )
+        statusTable = Sync(pair).status_table()
+        self.assertIn("|  local |", statusTable)
+        self.assertTrue(statusTable.startswith("+--------+-----+"))
+
+    def testSpecialValues(self):
+        """
+        test values that need tabulate's type inference and alignment rules
+        """
+        lod = [
+            {"a": "1,000", "b": 1.5, "c": "x_y&z", "d": None, "e": "日本語"},
+            {"a": "12", "b": 1e20, "c": " pad ", "d": True, "e": "Ärger"},
+            {
+                "a": "3.25",
+                "b": "nan",
+                "c": 3,
+                "d": False,
+                "f": datetime.date(2024, 1, 2),
+            },
+            {"a": None, "b": "", "c": [1, 2], "e": "inf", "f": "tab\there"},
+        ]
+        self.checkSame(lod)
+        self.checkSame(lod, colalign=("right", "center", "decimal", "global", "left"))
+        rows = [("total", 3, 10), (1, "a", 7, 70.0), (2, "b", 3, 30.0)]
+        self.checkSame(rows, headers=["#", "key", "count", "%"], floatfmt=".2f")
+        self.checkSame(rows, headers=())
+
+    def testRandomTables(self):
+        """
+        test random tables against tabulate
+        """
+        random.seed(2026)
+        pool = [None, "", 0, -5, 3.14159, 1e20, "12", "1,000", "3.0", "abc"]
+        pool += ["Ärger", " pad ", "True", True, "nan", "1e5", "-0.5", ".5", "a&b_%"]
+        for _i in range(200):
+            keys = [f"k{col}" for col in range(random.randint(1, 5))]
+            lod = [
+                {key: random.choice(pool) for key in keys if random.random() < 0.9}
+                for _row in range(random.randint(1, 6))
+            ]
+            if not any(lod):
+                continue
+            self.checkSame(lod)
+
+    def testFallback(self):
+        """
+        test that tables the native renderer doesn't handle are rendered by tabulate
+        """
+        lod = [{"text": "line\nbreak", "n": 1}, {"text": "\x1b[31mred\x1b[0m", "n": 2}]
+        renderer = TableRenderer(tablefmt="grid")
+        self.assertIsNone(renderer.render(lod))
+        for tablefmt in ["grid", "github", "pretty", "simple"]:
+            expected = tabulate(lod, headers="keys", tablefmt=tablefmt)
+            markup = TableRenderer.tabulate(
+                (record for record in lod), headers="keys", tablefmt=tablefmt
+            )
+            self.assertEqual(expected, markup)
+        with self.assertRaises(Exception):
+            TableRenderer(tablefmt="pretty")
+
+    def testStreaming(self):
+        """
+        test writing a table to a stream with and without sampling
+        """
+        lod = [{"id": i, "name": f"name {i % 10}", "value": i / 8} for i in range(1000)]
+        for tablefmt in TableRenderer.formats:
+            expected = tabulate(lod, headers="keys", tablefmt=tablefmt)
+            renderer = TableRenderer(tablefmt=tablefmt)
+            for sample in [None, 1000, 10]:
+                stream = io.StringIO()
+                count = renderer.write(stream, iter(lod), sample=sample)
+                markup = stream.getvalue()
+                self.assertEqual(count, markup.count("\n"))
+                if sample is None or sample >= len(lod):
+                    self.assertEqual(f"{expected}\n", markup)
+                else:
+                    # the layout of the sample is used for all rows
+                    self.assertEqual(
+                        len(expected.splitlines()), len(markup.splitlines())
+                    )
+                    self.assertIn("name 9", markup)
+
+    def testPerformance(self):
+        """
+        test that large tables are rendered much faster than with tabulate
+        """
+        lod = [
+            {
+                "item": f"http://www.wikidata.org/entity/Q{i}",
+                "label": f"label {i}",
+                "count": i,
+                "ratio": i / 7,
+            }
+            for i in range(20000)
+        ]
+        start = time.time()
+        markup = TableRenderer(tablefmt="github").render(lod)
+        nativeTime = time.time() - start
+        start = time.time()
+        expected = tabulate(lod, headers="keys", tablefmt="github")
+        tabulateTime = time.time() - start
+        if self.debug:
+            print(f"native: {nativeTime:.2f} s tabulate: {tabulateTime:.2f} s")
+        self.assertEqual(expected, markup)
+        self.assertLess(nativeTime, tabulateTime)
@@ -0,0 +1,119 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+from lodstorage.query import Endpoint
+from lodstorage.sql import SQLDB
+from lodstorage.trulytabular import TrulyTabular
+from lodstorage.wikidata_metadata import WikidataMetadataCache
+from tests.basetest import Basetest
+from tests.localsparql import LocalSPARQLServer
+
+
+class TestTrulyTabularParallel(Basetest):
+    """
+    test the parallel property statistics of TrulyTabular
+    against a local Wikidata-like endpoint
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+        turtle = """@prefix wd: <http://www.wikidata.org/entity/> .
+@prefix wdt: <http://www.wikidata.org/prop/direct/> .
+@prefix wikibase: <http://wikiba.se/ontology#> .
+@prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .
+@prefix schema: <http://schema.org/> .
+wd:Q5 rdfs:label "human"@en ; schema:description "common name of Homo sapiens"@en .
+"""
+        self.pids = [f"P{i}" for i in range(1, 7)]
+        for pid in self.pids:
+            turtle += f"""wd:{pid} a wikibase:Property ; rdfs:label "property {pid}"@en ;
+  wikibase:propertyType wikibase:String .
+"""
+        for i in range(100, 110):
+            turtle += f'wd:Q{i} wdt:P31 wd:Q5 ; rdfs:label "item {i}"@en .\n'
+            for pid in self.pids:
+                turtle += f'wd:Q{i} wdt:{pid} "value {i}" .\n'
+        # one non tabular entry
+        turtle += 'wd:Q100 wdt:P1 "other value" .\n'
+        self.server = LocalSPARQLServer.fromTurtle(turtle)
+        self.endpointConf = Endpoint()
+        self.endpointConf.endpoint = self.server.url
+        self.endpointConf.database = "jena"
+
+    def tearDown(self):
+        self.server.stop()
+        Basetest.tearDown(self)
+
+    def getTrulyTabular(self, maxWorkers: int) -> TrulyTabular:
+        tt = TrulyTabular(
+            "Q5",
+            propertyIds=self.pids,
+            endpointConf=self.endpointConf,
+            maxWorkers=maxWorkers,
+            metadataCache=WikidataMetadataCache(SQLDB.RAM),
+        )
+        return tt
+
+    def testParallelStatistics(self):
+        """
+        test that the parallel statistics are the same as the sequential ones
+        """
+        sequential = self.getTrulyTabular(maxWorkers=1).getPropertyStatistics()
+        self.server.delay = 0.05
+        self.server.maxActive = 0
+        tt = self.getTrulyTabular(maxWorkers=6)
+        queriesBefore = len(self.server.queries)
+        progressCalls = []
+        parallel = tt.getPropertyStatistics(
+            progress=lambda done, total, row: progressCalls.append((done, total))
+        )
+        self.assertEqual(sequential, parallel)
+        self.assertEqual(10, parallel[0]["total"])
+        self.assertEqual(2, parallel[1]["maxf"])
+        self.assertEqual(10.0, parallel[1]["non tabular%"])
+        self.assertEqual(6, len(progressCalls))
+        self.assertEqual((6, 6), progressCalls[-1])
+        # the endpoint concurrency limit is respected
+        self.assertTrue(self.server.maxActive > 1)
+        self.assertTrue(self.server.maxActive <= TrulyTabular.endpointConcurrency)
+        # the count query is run only once
+        countQueries = [
+            query
+            for query in self.server.queries[queriesBefore:]
+            if "COUNT (DISTINCT" in query
+        ]
+        self.assertEqual(1, len(countQueries))
+
+    def testStatisticsOrder(self):
+        """
+        test that the parallel statistics are generated in property order by default
+        """
+        self.server.delay = 0.02
+        tt = self.getTrulyTabular(maxWorkers=6)
+        labels = [wdProperty.plabel for wdProperty in tt.properties.values()]
+        rows = list(tt.genPropertyStatistics(withQuery=False))
+        self.assertEqual(labels, [row["property"] for row in rows])
+        rows = list(tt.genPropertyStatistics(withQuery=False, inCompletionOrder=True))
+        self.assertEqual(sorted(labels), sorted(row["property"] for row in rows))
+
+    def testErrorRows(self):
+        """
+        test that failing property statistics show up as error rows
+        """
+        tt = self.getTrulyTabular(maxWorkers=3)
+        original = tt.noneTabular
+
+        def failingNoneTabular(wdProperty):
+            if wdProperty.pid == "P2":
+                raise Exception("timeout")
+            return original(wdProperty)
+
+        tt.noneTabular = failingNoneTabular
+        stats = tt.getPropertyStatistics(withQuery=False)
+        self.assertEqual(7, len(stats))
+        errorRows = [row for row in stats if "error" in row]
+        self.assertEqual(1, len(errorRows))
+        self.assertEqual("property P2", errorRows[0]["property"])
+        self.assertEqual("timeout", errorRows[0]["error"])
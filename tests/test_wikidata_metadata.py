@@ -0,0 +1,173 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+import os
+import tempfile
+
+from lodstorage.query import Endpoint
+from lodstorage.sparql import SPARQL
+from lodstorage.sql import SQLDB
+from lodstorage.trulytabular import TrulyTabular, WikidataProperty
+from lodstorage.wikidata_metadata import WikidataMetadataCache
+from tests.basetest import Basetest
+from tests.localsparql import LocalSPARQLServer
+
+
+class TestWikidataMetadataCache(Basetest):
+    """
+    test the batched and cached Wikidata metadata lookup
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+        turtle = """@prefix wd: <http://www.wikidata.org/entity/> .
+@prefix wdt: <http://www.wikidata.org/prop/direct/> .
+@prefix wikibase: <http://wikiba.se/ontology#> .
+@prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .
+@prefix schema: <http://schema.org/> .
+wd:Q5 rdfs:label "human"@en ; schema:description "common name of Homo sapiens"@en .
+"""
+        self.pids = [f"P90{i}" for i in range(5)]
+        for pid in self.pids:
+            turtle += f"""wd:{pid} a wikibase:Property ; rdfs:label "property {pid}"@en, "Eigenschaft {pid}"@de ;
+  wikibase:propertyType wikibase:ExternalId .
+"""
+        self.server = LocalSPARQLServer.fromTurtle(turtle)
+        self.sparql = SPARQL(self.server.url, pooled=True)
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.dbname = os.path.join(self.tmpdir.name, "wikidatametadata.db")
+
+    def tearDown(self):
+        self.server.stop()
+        self.tmpdir.cleanup()
+        Basetest.tearDown(self)
+
+    def testSnapshot(self):
+        """
+        test that the bundled snapshot avoids queries for well known properties
+        """
+        cache = WikidataMetadataCache(SQLDB.RAM)
+        records = cache.getProperties(None, ["P31", "P279"])
+        self.assertEqual(["instance of", "subclass of"], [r["label"] for r in records])
+        records = cache.getPropertiesByLabels(None, ["country"])
+        self.assertEqual("P17", records[0]["id"])
+        self.assertEqual(0, cache.queries)
+
+    def testBatchingAndPersistence(self):
+        """
+        test batched lookups and the persistence of the cache
+        """
+        cache = WikidataMetadataCache(self.dbname, chunkSize=2)
+        records = cache.getProperties(self.sparql, self.pids + ["P9999"])
+        self.assertEqual(5, len(records))
+        self.assertEqual(3, cache.queries)
+        records = cache.getProperties(self.sparql, self.pids, lang="de")
+        self.assertEqual("Eigenschaft P900", records[0]["label"])
+        self.assertEqual(6, cache.queries)
+        records = cache.getPropertiesByLabels(self.sparql, ["property P903"])
+        self.assertEqual("P903", records[0]["id"])
+        items = cache.getItems(self.sparql, ["Q5"])
+        self.assertEqual("human", items[0]["label"])
+        self.assertEqual(7, cache.queries)
+        cache.close()
+        # a new cache on the same database does not need any query
+        cache = WikidataMetadataCache(self.dbname)
+        records = cache.getProperties(self.sparql, self.pids)
+        self.assertEqual(5, len(records))
+        items = cache.getItems(self.sparql, ["Q5"])
+        self.assertEqual("common name of Homo sapiens", items[0]["description"])
+        wdProperties = WikidataProperty.getPropertiesByIds(
+            self.sparql, ["P901"], metadataCache=cache
+        )
+        self.assertEqual("P901", wdProperties["property P901"].pid)
+        self.assertEqual(0, cache.queries)
+        # the metadata of the local endpoint is not used for Wikidata
+        self.assertIsNone(cache.get("P901"))
+        self.assertIsNotNone(cache.get("P901", endpoint=self.sparql.url))
+        self.assertEqual("human", cache.get("Q5", endpoint=self.server.url)["label"])
+        self.assertIsNone(cache.get("Q5"))
+        # records are looked up lazily per id - the german records are not loaded
+        self.assertEqual([], [key for key in cache.records if key[2] == "de"])
+        cache.close()
+
+    def testMisses(self):
+        """
+        test that ids and labels that can not be resolved are not fetched again
+        """
+        cache = WikidataMetadataCache(self.dbname)
+        for _i in range(2):
+            self.assertEqual([], cache.getProperties(self.sparql, ["P9999"]))
+            self.assertEqual([], cache.getPropertiesByLabels(self.sparql, ["unknown"]))
+            self.assertEqual([], cache.getItems(self.sparql, ["Q9999"]))
+            self.assertEqual(3, cache.queries)
+        cache.close()
+        cache = WikidataMetadataCache(self.dbname)
+        cache.getProperties(self.sparql, ["P9999"])
+        self.assertEqual(0, cache.queries)
+        cache.refresh()
+        cache.getProperties(self.sparql, ["P9999"])
+        self.assertEqual(1, cache.queries)
+        cache.close()
+
+    def testDefault(self):
+        """
+        test that the default cache is only kept on disk when enabled
+        """
+        try:
+            WikidataMetadataCache.default = None
+            cache = WikidataMetadataCache.getDefault()
+            self.assertEqual(SQLDB.RAM, cache.sqlDB.dbname)
+            self.assertIs(cache, WikidataMetadataCache.getDefault())
+            WikidataMetadataCache.enableDiskCache(self.dbname)
+            cache = WikidataMetadataCache.getDefault()
+            self.assertEqual(self.dbname, cache.sqlDB.dbname)
+            cache.close()
+        finally:
+            WikidataMetadataCache.diskCacheFile = None
+            WikidataMetadataCache.default = None
+
+    def testExpiryAndRefresh(self):
+        """
+        test that expired or refreshed records are fetched again
+        """
+        cache = WikidataMetadataCache(self.dbname, maxAge=3600)
+        cache.getProperties(self.sparql, self.pids)
+        self.assertEqual(1, cache.queries)
+        cache.getProperties(self.sparql, self.pids)
+        self.assertEqual(1, cache.queries)
+        cache.close()
+        # the records of the database are older than maxAge=0
+        cache = WikidataMetadataCache(self.dbname, maxAge=0)
+        cache.getProperties(self.sparql, self.pids)
+        self.assertEqual(1, cache.queries)
+        cache.refresh(self.sparql.url)
+        # the snapshot is kept
+        self.assertEqual("P31", cache.get("P31")["id"])
+        cache.maxAge = None
+        cache.getPropertiesByLabels(self.sparql, ["property P900"])
+        self.assertEqual(2, cache.queries)
+        cache.close()
+
+    def testTrulyTabular(self):
+        """
+        test that constructing a TrulyTabular needs no queries once the metadata is cached
+
+        the Wikidata snapshot e.g. "official website" is not used for the local endpoint
+        """
+        endpointConf = Endpoint()
+        endpointConf.endpoint = self.server.url
+        cache = WikidataMetadataCache(SQLDB.RAM)
+        for _i in range(2):
+            queriesBefore = len(self.server.queries)
+            tt = TrulyTabular(
+                "Q5",
+                propertyIds=self.pids[:3],
+                propertyLabels=["property P904"],
+                endpointConf=endpointConf,
+                metadataCache=cache,
+            )
+            self.assertEqual("human", tt.item.qlabel)
+            self.assertEqual(4, len(tt.properties))
+        self.assertEqual(0, len(self.server.queries) - queriesBefore)
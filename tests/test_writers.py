@@ -0,0 +1,139 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+import io
+import json
+import os
+import tempfile
+from argparse import Namespace
+
+import yaml
+
+from lodstorage.csv import CSV
+from lodstorage.jsonbackend import JsonBackend
+from lodstorage.query import Format, Query
+from lodstorage.querymain import QueryMain
+from lodstorage.querymain import main as queryMain
+from lodstorage.sample import Sample
+from lodstorage.sql import SQLDB
+from lodstorage.writers import LoDWriter
+from lodstorage.xml import Lod2Xml
+from lodstorage.yamlbackend import YamlFileCache
+from tests.basetest import Basetest
+
+
+class TestWriters(Basetest):
+    """
+    test the streaming list of dicts writers
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+        self.lod = Sample.getRoyals()
+
+    def write(self, formatName: str, lod, fields: list = None) -> str:
+        """
+        write the given lod with the streaming writer for the given format
+        """
+        stream = io.StringIO()
+        writer = LoDWriter.getWriter(formatName, stream, fields=fields)
+        # use a generator to make sure the writers don't need a list
+        count = writer.write(record for record in lod)
+        self.assertEqual(len(lod), count)
+        return stream.getvalue()
+
+    def testSameAsNonStreaming(self):
+        """
+        test that the streamed output is the same as the one of the non streaming converters
+        """
+        self.assertEqual(CSV.toCSV(self.lod), self.write("csv", self.lod))
+        self.assertEqual(
+            CSV.toCSV(self.lod, delimiter="\t"), self.write("tsv", self.lod)
+        )
+        for lod in [self.lod, [], [{}]]:
+            expected = JsonBackend.dumps(
+                lod, indent=2, sort_keys=True, default=str, nativeDatetime=False
+            )
+            self.assertEqual(f"{expected}\n", self.write("json", lod))
+            # dicttoxml doesn't support dates
+            xmlLod = [{k: str(v) for k, v in record.items()} for record in lod]
+            self.assertEqual(Lod2Xml(xmlLod).asXml(), self.write("xml", xmlLod))
+        lines = self.write("jsonl", self.lod).splitlines()
+        self.assertEqual(len(self.lod), len(lines))
+        self.assertEqual(self.lod[0]["name"], json.loads(lines[0])["name"])
+
+    def testTables(self):
+        """
+        test the streamed tables
+        """
+        lod = [{"name": "a|b", "value": 1}, {"name": "c", "value": None}]
+        markdown = self.write("github", lod)
+        self.assertEqual(
+            "| name | value |\n|---|---|\n| a\\|b | 1 |\n| c |  |\n", markdown
+        )
+        wiki = self.write("mediawiki", lod, fields=["value"])
+        self.assertIn("! value\n|-\n| 1\n", wiki)
+        self.assertTrue(wiki.endswith("|}\n"))
+        with self.assertRaises(Exception):
+            LoDWriter.getWriter("latex", io.StringIO())
+
+    def testStreamedTableFormats(self):
+        """
+        test that the format call backs of the query are applied to streamed tables
+        """
+
+        def upper(record, key, value, tablefmt):
+            if isinstance(value, str):
+                record[key] = value.upper()
+
+        query = Query(name="names", query="SELECT name FROM Royals", lang="sql")
+        query.addFormatCallBack(upper)
+        lod = [{"name": "a"}, {"name": "b"}]
+        args = Namespace(format=Format.github, stream=True)
+        output = io.StringIO()
+        QueryMain.showResult(args, query, iter(lod), output)
+        self.assertEqual("| name |\n|---|\n| A |\n| B |\n", output.getvalue())
+        # the records are not modified
+        self.assertEqual("a", lod[0]["name"])
+
+    def testStreamingCommandLine(self):
+        """
+        test the --stream and --outputFile command line options
+        """
+        with tempfile.TemporaryDirectory() as tmpdir:
+            dbPath = os.path.join(tmpdir, "royals.db")
+            sqlDB = SQLDB(dbPath)
+            entityInfo = sqlDB.createTable(self.lod, "Royals", "name")
+            sqlDB.store(self.lod, entityInfo)
+            sqlDB.close()
+            endpointPath = os.path.join(tmpdir, "endpoints.yaml")
+            with open(endpointPath, "w") as yamlFile:
+                yaml.dump(
+                    {
+                        "royaldb": {
+                            "lang": "sql",
+                            "endpoint": dbPath,
+                            "website": "",
+                            "database": "sqlite3",
+                        }
+                    },
+                    yamlFile,
+                )
+            outputs = {}
+            for stream in [False, True]:
+                outputFile = os.path.join(tmpdir, f"royals{stream}.csv")
+                args = ["-l", "sql", "-ep", endpointPath, "-en", "royaldb"]
+                args += ["-q", "SELECT * FROM Royals", "-f", "csv"]
+                args += ["-o", outputFile]
+                if stream:
+                    args.append("--stream")
+                queryMain(args)
+                with open(outputFile, newline="") as csvFile:
+                    outputs[stream] = csvFile.read()
+            # the YAML disk cache is opt-in via --yamlCache
+            self.assertIsNone(YamlFileCache.diskCacheFile)
+            # the non streaming output is printed with a trailing newline
+            self.assertEqual(outputs[False], f"{outputs[True]}\n")
+            self.assertEqual(len(self.lod) + 1, outputs[True].count("\r\n"))
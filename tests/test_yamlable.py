@@ -7,10 +7,17 @@ Prompts:
 - Implement a YAML conversion class for dataclasses with specific handling for multi-line strings and omission of None values.
 - Create a test suite for the YAML conversion class, ensuring proper formatting and functionality.
 """
+import gc
 import os
+import sys
 import tempfile
+import types
+import unittest
+import weakref
 
-from lodstorage.yamlable import lod_storable
+import yaml
+
+from lodstorage.yamlable import YamlAble, YamlAbleDumper, lod_storable
 from tests.basetest import Basetest
 
 
@@ -109,6 +116,21 @@ class TestYamlAble(Basetest):
             "The description should be included as a block scalar.",
         )
 
+    def test_representers_keep_no_instance(self) -> None:
+        """
+        Test that the dumper setup does not keep the first instance alive.
+        """
+        YamlAble._yaml_dumper = None
+        first = MockDataClass(name="first", id=1)
+        first_ref = weakref.ref(first)
+        first.to_yaml()
+        del first
+        gc.collect()
+        self.assertIsNone(first_ref())
+        representer = YamlAbleDumper.yaml_representers[str]
+        self.assertIs(YamlAble.represent_literal, representer)
+        self.assertIn("|-", self.check_yaml())
+
     def test_save_to_yaml_file(self) -> None:
         """
         Test saving a dataclass instance to a YAML file.
@@ -134,3 +156,56 @@ class TestYamlAble(Basetest):
             self.assertEqual(loaded_instance.id, self.mock_data.id)
             # Clean up the temp file
             os.remove(temp_file.name)
+
+    @unittest.skipIf(sys.version_info < (3, 10), "slotted dataclasses need Python 3.10")
+    def test_slots(self) -> None:
+        """
+        Test the compact slotted records of lod_storable(slots=True).
+        """
+
+        @lod_storable(slots=True)
+        class SlottedDataClass:
+            name: str
+            id: int
+            description: str = None
+            flag: bool = True
+
+        data = SlottedDataClass(name="Example", id=123, description="a\nb")
+        self.assertFalse(hasattr(data, "__dict__"))
+        yaml_str = data.to_yaml()
+        self.assertIn("|-", yaml_str)
+        loaded = SlottedDataClass.from_yaml(yaml_str)
+        self.assertEqual(data, loaded)
+        self.assertEqual(data, SlottedDataClass.from_json(data.to_json()))
+        self.assertEqual(
+            data,
+            SlottedDataClass.from_dict2(
+                {"name": "Example", "id": 123, "description": "a\nb"}
+            ),
+        )
+        # the per instance memory drops by more than half
+        unslotted = self.mock_data
+        unslottedSize = sys.getsizeof(unslotted) + sys.getsizeof(unslotted.__dict__)
+        self.assertLess(sys.getsizeof(data) * 2, unslottedSize)
+
+    def test_load_dump_all(self) -> None:
+        """
+        Test streaming multi document YAML serialization.
+        """
+        items = (
+            MockDataClass(name=f"Example {i}", id=i, description=f"line 1\nline {i}")
+            for i in range(100)
+        )
+        with tempfile.NamedTemporaryFile(mode="w+", suffix=".yaml") as stream:
+            MockDataClass.dump_all(items, stream)
+            stream.seek(0)
+            loaded = MockDataClass.load_all(stream)
+            self.assertIsInstance(loaded, types.GeneratorType)
+            first = next(loaded)
+            self.assertEqual("line 1\nline 0", first.description)
+            self.assertEqual(99, len(list(loaded)))
+        yaml_str = MockDataClass.dump_all([self.mock_data, self.mock_data])
+        self.assertEqual(2, yaml_str.count("name: Example"))
+        self.assertEqual(yaml_str.split("---\n")[0], self.mock_data.to_yaml())
+        # the custom representers don't leak into the global yaml.Dumper
+        self.assertEqual("null\n...\n", yaml.dump(None))